@@ -0,0 +1,212 @@
+import datetime
+import os
+import sqlite3
+import threading
+
+from utils.region_loader import normalize_key
+
+# Minimum cosine similarity between a new question and a stored one to reuse its answer
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ECHOATLAS_ANSWER_CACHE_THRESHOLD", "0.95"))
+# Stored answers older than this (seconds) are not served
+ANSWER_CACHE_TTL = float(os.getenv("ECHOATLAS_ANSWER_CACHE_TTL", str(7 * 24 * 3600)))
+# Invalidations are persisted here, so a restart does not serve invalidated answers again
+ANSWER_CACHE_PATH = os.path.join("memory_store", "answer_cache.sqlite3")
+
+
+def _scope_key(region: str, location: str | None, context: str | None) -> tuple[str, str, str]:
+    return (region or "", location or "", context or "")
+
+
+class SemanticAnswerCache:
+    """
+    Semantic answer cache on top of the memory store.
+
+    Every stored interaction already has an embedding of the question and
+    the answer it got, so a lookup needs no extra embedding or query: it
+    scans the memories recalled for the new question (which carry a cosine
+    `score`) and returns the best one that is similar enough, fresh enough
+    and has an answer. Scopes are (region, location, context).
+
+    Freshness is measured from `answered_at`, when the LLM produced the
+    answer (older memories fall back to `timestamp`). Repeats of a question
+    do not renew it, so a popular answer is regenerated once it expires.
+
+    Canonical answers (e.g. for the FAQ prompt library) can be registered
+    with add_canonical() for the scope they were generated in; a question
+    matching one exactly (after normalization) in that scope is answered
+    without any recall. They expire after the same TTL as stored answers.
+
+    invalidate() marks everything answered in a scope up to now as stale, so
+    later answers are served again only once they are re-generated. With a
+    `path`, invalidations are kept in a SQLite file and survive restarts.
+    """
+
+    def __init__(
+        self,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        ttl: float = ANSWER_CACHE_TTL,
+        path: str | None = None,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.path = path
+        self._lock = threading.Lock()
+        self._invalidated: dict[tuple[str, str, str], str] = {}
+        self._stats: dict[tuple[str, str, str], dict] = {}
+        self._canonical: dict[tuple[str, str, str, str], dict] = {}
+        self._conn: sqlite3.Connection | None = None
+        # Nothing is created on disk until the first invalidation
+        if path and os.path.exists(path):
+            for region, location, context, at in self._db().execute(
+                "SELECT region, location, context, invalidated_at FROM invalidations"
+            ):
+                self._invalidated[(region, location, context)] = at
+
+    def _db(self) -> sqlite3.Connection:
+        """The invalidation file, opened (and created) on first use."""
+        if self._conn is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS invalidations (
+                    region         TEXT NOT NULL,
+                    location       TEXT NOT NULL,
+                    context        TEXT NOT NULL,
+                    invalidated_at TEXT NOT NULL,
+                    PRIMARY KEY (region, location, context)
+                )
+                """
+            )
+            self._conn.commit()
+        return self._conn
+
+    def _invalidated_at(self, key: tuple[str, str, str]) -> str:
+        """Latest invalidation covering this scope (including region/location-wide ones)."""
+        region, location, context = key
+        candidates = [
+            self._invalidated.get((region, location, context), ""),
+            self._invalidated.get((region, location, ""), ""),
+            self._invalidated.get((region, "", ""), ""),
+        ]
+        return max(candidates)
+
+    def add_canonical(
+        self,
+        region: str,
+        location: str | None,
+        context: str | None,
+        question: str,
+        answer: str,
+        timestamp: str | None = None,
+    ) -> None:
+        """Register a precomputed answer for an exact question in a scope (answered at `timestamp`)."""
+        with self._lock:
+            self._canonical[(*_scope_key(region, location, context), normalize_key(question))] = {
+                "phrase": question,
+                "answer": answer,
+                "score": 1.0,
+                "timestamp": timestamp or datetime.datetime.utcnow().isoformat(),
+                "canonical": True,
+            }
+
+    def lookup_canonical(
+        self,
+        region: str,
+        location: str | None,
+        context: str | None,
+        question: str,
+    ) -> dict | None:
+        """Precomputed answer for exactly this question, without needing a recall."""
+        key = _scope_key(region, location, context)
+        now = datetime.datetime.utcnow()
+        oldest = (now - datetime.timedelta(seconds=self.ttl)).isoformat()
+        with self._lock:
+            entry = self._canonical.get((*key, normalize_key(question)))
+            if entry is not None and (
+                entry["timestamp"] < oldest or entry["timestamp"] <= self._invalidated_at(key)
+            ):
+                entry = None
+            if entry is not None:
+                stats = self._stats.setdefault(key, {"lookups": 0, "hits": 0})
+                stats["lookups"] += 1
+                stats["hits"] += 1
+        return entry
+
+    def lookup(
+        self,
+        region: str,
+        location: str | None,
+        context: str | None,
+        memories: list[dict],
+    ) -> dict | None:
+        """Best cached memory for the question the `memories` were recalled for, or None."""
+        key = _scope_key(region, location, context)
+        now = datetime.datetime.utcnow()
+        oldest = (now - datetime.timedelta(seconds=self.ttl)).isoformat()
+
+        with self._lock:
+            invalidated_at = self._invalidated_at(key)
+            best = None
+            for memory in memories:
+                score = memory.get("score")
+                # When the answer was generated; repeats of the question do not renew it
+                timestamp = memory.get("answered_at") or memory.get("timestamp", "")
+                if (
+                    score is not None
+                    and score >= self.threshold
+                    and memory.get("answer")
+                    # Compaction digests summarize many questions; never serve one as an answer
+                    and memory.get("kind") != "digest"
+                    and timestamp >= oldest
+                    and timestamp > invalidated_at
+                    and (best is None or score > best["score"])
+                ):
+                    best = memory
+
+            stats = self._stats.setdefault(key, {"lookups": 0, "hits": 0})
+            stats["lookups"] += 1
+            if best is not None:
+                stats["hits"] += 1
+        return best
+
+    def invalidate(self, region: str, location: str | None = None, context: str | None = None) -> None:
+        """Stop serving answers stored so far in a scope (location/context optional)."""
+        with self._lock:
+            key = _scope_key(region, location, None if not location else context)
+            self._invalidated[key] = datetime.datetime.utcnow().isoformat()
+            if self.path:
+                self._db().execute(
+                    "INSERT OR REPLACE INTO invalidations (region, location, context, invalidated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (*key, self._invalidated[key]),
+                )
+                self._conn.commit()
+
+    def stats(self) -> list[dict]:
+        """Per-scope lookups, hits and hit rate."""
+        with self._lock:
+            rows = [
+                {
+                    "region": region,
+                    "location": location,
+                    "context": context,
+                    **counts,
+                    "hit_rate": counts["hits"] / counts["lookups"] if counts["lookups"] else 0.0,
+                }
+                for (region, location, context), counts in sorted(self._stats.items())
+            ]
+        return rows
+
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Process-wide cache shared by every session
+answer_cache = SemanticAnswerCache(path=ANSWER_CACHE_PATH)
@@ -0,0 +1,340 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from openai import OpenAI
+
+from utils.region_loader import normalize_key
+
+CULTURE_PROFILE_MODEL = "gpt-4o-mini"
+
+# Process-wide, on-disk profile cache shared by every session
+CULTURE_PROFILE_CACHE_PATH = os.path.join("memory_store", "culture_profile_cache.sqlite3")
+CULTURE_PROFILE_TTL = float(os.getenv("ECHOATLAS_CULTURE_PROFILE_TTL", str(7 * 24 * 3600)))
+CULTURE_PROFILE_MAX_ITEMS = int(os.getenv("ECHOATLAS_CULTURE_PROFILE_MAX_ITEMS", "1000"))
+# Cache hits write their access times to disk at most this often (seconds)
+CULTURE_PROFILE_ACCESS_FLUSH_INTERVAL = 30.0
+
+
+def profile_key(region: str, location: str) -> str:
+    """Cache key for a place: normalized region + normalized location."""
+    return f"{normalize_key(region)}|{normalize_key(location)}"
+
+
+class _Flight:
+    """One in-progress profile generation that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: dict | None = None
+        self.error: BaseException | None = None
+
+
+class CultureProfileCache:
+    """
+    TTL + size-bounded LRU cache for generated culture profiles.
+
+    - Memory tier: OrderedDict in LRU order, shared by all sessions in the process.
+    - Disk tier: optional SQLite file, so profiles survive restarts.
+    - get_or_create() is single-flight: concurrent misses for the same key
+      wait for one factory call instead of each calling the LLM.
+
+    Entries older than `ttl` seconds are treated as misses and regenerated.
+    Both tiers hold at most `max_items` entries, evicting the least recently used.
+    Hits record their access time in memory; it reaches the disk tier in one
+    batch before a disk eviction, on close(), and at most every
+    `access_flush_interval` seconds, so a hit costs no disk write.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl: float = CULTURE_PROFILE_TTL,
+        max_items: int = CULTURE_PROFILE_MAX_ITEMS,
+        access_flush_interval: float = CULTURE_PROFILE_ACCESS_FLUSH_INTERVAL,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_items = max_items
+        self.access_flush_interval = access_flush_interval
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._flights: dict[str, _Flight] = {}
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "generated": 0, "coalesced": 0}
+        self._conn: sqlite3.Connection | None = None
+        # key -> last access time not yet written to the disk tier
+        self._accessed: dict[str, float] = {}
+        self._accessed_flushed = time.monotonic()
+
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS profiles (
+                    key         TEXT PRIMARY KEY,
+                    profile     TEXT NOT NULL,
+                    created     REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_profiles_last_access ON profiles (last_access)"
+            )
+            self._conn.commit()
+
+    # ---------------------------------
+    # Internal helpers (caller holds _lock)
+    # ---------------------------------
+    def _fresh(self, created: float) -> bool:
+        return time.time() - created < self.ttl
+
+    def _remember(self, key: str, profile: dict, created: float) -> None:
+        self._lru[key] = (profile, created)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
+
+    def _flush_accessed(self) -> None:
+        """Write pending access times to the disk tier (the caller commits)."""
+        if self._accessed:
+            self._conn.executemany(
+                "UPDATE profiles SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+        self._accessed_flushed = time.monotonic()
+
+    def _lookup(self, key: str) -> dict | None:
+        entry = self._lru.get(key)
+        if entry is None and self._conn is not None:
+            row = self._conn.execute(
+                "SELECT profile, created FROM profiles WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                entry = (json.loads(row[0]), row[1])
+                self._remember(key, *entry)
+
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        profile, created = entry
+        if not self._fresh(created):
+            self._stats["expired"] += 1
+            self._lru.pop(key, None)
+            return None
+
+        self._lru.move_to_end(key)
+        if self._conn is not None:
+            self._accessed[key] = time.time()
+            if time.monotonic() - self._accessed_flushed >= self.access_flush_interval:
+                self._flush_accessed()
+                self._conn.commit()
+        self._stats["hits"] += 1
+        return dict(profile)
+
+    def _store(self, key: str, profile: dict) -> None:
+        now = time.time()
+        self._remember(key, dict(profile), now)
+        if self._conn is not None:
+            self._accessed.pop(key, None)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO profiles (key, profile, created, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(profile, ensure_ascii=False), now, now),
+            )
+            # Size bound on disk: drop the least recently used beyond max_items,
+            # with the hits since the last flush counted
+            self._flush_accessed()
+            self._conn.execute(
+                "DELETE FROM profiles WHERE key IN ("
+                "SELECT key FROM profiles ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_items,),
+            )
+            self._conn.commit()
+
+    # ---------------------------------
+    # Public API
+    # ---------------------------------
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            return self._lookup(key)
+
+    def put(self, key: str, profile: dict) -> None:
+        with self._lock:
+            self._store(key, profile)
+
+    def get_or_create(self, key: str, factory: Callable[[], dict]) -> dict:
+        """
+        Return the cached profile, or call `factory` once to create it.
+
+        Concurrent callers missing on the same key share that one call (and
+        its exception, if it fails; failures are not cached).
+        """
+        with self._lock:
+            cached = self._lookup(key)
+            if cached is not None:
+                return cached
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return dict(flight.value)
+
+        try:
+            flight.value = factory()
+            with self._lock:
+                self._store(key, flight.value)
+                self._stats["generated"] += 1
+            return dict(flight.value)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._lru)
+            if self._conn is not None:
+                stats["disk_items"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM profiles"
+                ).fetchone()[0]
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._flush_accessed()
+                self._conn.commit()
+                self._conn.close()
+                self._conn = None
+
+
+# ---------------------------------
+# LLM profile generation
+# ---------------------------------
+_client: OpenAI | None = None
+_cache: CultureProfileCache | None = None
+_init_lock = threading.Lock()
+
+
+def _get_client() -> OpenAI:
+    global _client
+    with _init_lock:
+        if _client is None:
+            _client = OpenAI()
+        return _client
+
+
+def get_profile_cache() -> CultureProfileCache:
+    """Process-wide profile cache, opened on first use."""
+    global _cache
+    with _init_lock:
+        if _cache is None:
+            _cache = CultureProfileCache(path=CULTURE_PROFILE_CACHE_PATH)
+        return _cache
+
+
+def fallback_culture_profile(location: str) -> dict:
+    """Generic profile used when the LLM call fails (never cached)."""
+    return {
+        "phrase": f"Hello, could you please help me here in {location}?",
+        "gesture": "Smile gently and be respectful.",
+        "tone": "Polite and friendly",
+        "custom": f"Be respectful and observe how locals behave in {location}.",
+    }
+
+
+def fetch_culture_profile(region: str, location: str) -> dict:
+    """
+    Call the LLM for a culture profile of (region, location).
+
+    Uncached, no Streamlit calls, safe to run in a worker thread. Raises on failure.
+    """
+    prompt = f"""
+You are a cultural communication expert.
+
+For the following place:
+- Country or State/Region: {region}
+- City/Area: {location}
+
+Generate a short, practical profile for how a visitor should speak and behave.
+Return ONLY valid JSON with these keys:
+- "phrase": a short example phrase for politely asking for something (in English or local language).
+- "gesture": a one-sentence description of an appropriate gesture/body language.
+- "tone": 2–5 words describing the recommended tone of voice.
+- "custom": 1–2 sentences of a key cultural tip for everyday interactions.
+
+Example output:
+{{
+  "phrase": "Can I get a coffee, please?",
+  "gesture": "Smile and make brief eye contact.",
+  "tone": "Friendly and polite",
+  "custom": "Start with a short greeting before making your request."
+}}
+    """.strip()
+
+    completion = _get_client().chat.completions.create(
+        model=CULTURE_PROFILE_MODEL,
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a cultural communication expert. Return ONLY compact JSON.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.4,
+    )
+
+    content = completion.choices[0].message.content.strip()
+
+    # Sometimes models wrap JSON in ```json ... ``` fences – strip them
+    if content.startswith("```"):
+        content = content.strip("`")
+        if content.lower().startswith("json"):
+            content = content.split("\n", 1)[1]
+
+    data = json.loads(content)
+    fallback = fallback_culture_profile(location)
+    return {
+        field: (data.get(field) or "").strip() or fallback[field]
+        for field in ("phrase", "gesture", "tone", "custom")
+    }
+
+
+def get_culture_profile(region: str, location: str) -> dict:
+    """
+    Culture profile for (region, location), from the shared cache when possible.
+
+    Profiles are keyed by normalized (region, location), shared across
+    sessions and persisted to disk; concurrent requests for the same new
+    place trigger a single LLM call. Raises if generation fails.
+    """
+    return get_profile_cache().get_or_create(
+        profile_key(region, location),
+        lambda: fetch_culture_profile(region, location),
+    )
+
+
+def culture_profile_cache_stats() -> dict:
+    return get_profile_cache().stats()
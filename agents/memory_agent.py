@@ -1,10 +1,34 @@
 import os
+import sys
+import atexit
 import datetime
+import functools
+import unicodedata
 import uuid
 from dotenv import load_dotenv
 import chromadb
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+import numpy as np
 import streamlit as st
+from utils.embedding_cache import EmbeddingCache, CachedEmbedder
+from utils.embedding_backends import (
+    DEFAULT_EMBEDDING_BACKEND,
+    check_collection_backend,
+    create_embedding_backend,
+)
+from agents.memory_compactor import (
+    COMPACTION_INTERVAL_HOURS,
+    COMPACTION_MIN_AGE_DAYS,
+    COMPACTION_MIN_GROUP,
+    DIGEST_KIND,
+    CompactionJob,
+    Summarizer,
+    compaction_cutoff,
+    compaction_report,
+    plan_compaction,
+)
+from agents.memory_index import MemoryIndex, reciprocal_rank_fusion, search_terms
+from agents.memory_partitions import CollectionRouter, partition_key, partition_name
+from agents.memory_writer import WriteBehindQueue
 
 # ---------------------------------
 # Environment & Chroma setup
@@ -15,8 +39,69 @@ if not openai_api_key:
     raise RuntimeError("OPENAI_API_KEY not found in environment variables.")
 
 CHROMA_PATH = "memory_store"
-COLLECTION_NAME = "echoatlas_memory"
-EMBEDDING_MODEL_NAME = "text-embedding-3-small"
+
+# Embedding backend: "openai" (text-embedding-3-small over the network) or
+# "local-minilm" (int8 all-MiniLM-L6-v2 on CPU, offline). Each backend gets its
+# own collection and sidecar files, since vectors from different models
+# cannot share an index.
+EMBEDDING_BACKEND = os.getenv("ECHOATLAS_EMBEDDING_BACKEND", DEFAULT_EMBEDDING_BACKEND)
+
+# Optional partitioned layout: "none" (one global collection), "region" or
+# "location" (one collection per region / region+location, so each query only
+# searches its own scope's index). Each layout is a separate store.
+MEMORY_PARTITIONING = os.getenv("ECHOATLAS_MEMORY_PARTITIONING", "none")
+MEMORY_PARTITION_MAX_OPEN = int(os.getenv("ECHOATLAS_MEMORY_PARTITION_MAX_OPEN", "64"))
+MEMORY_PARTITION_IDLE_SECONDS = float(os.getenv("ECHOATLAS_MEMORY_PARTITION_IDLE_SECONDS", "600"))
+
+_store_suffix = "" if EMBEDDING_BACKEND == DEFAULT_EMBEDDING_BACKEND else f"__{EMBEDDING_BACKEND}"
+if MEMORY_PARTITIONING != "none":
+    _store_suffix += f"__by-{MEMORY_PARTITIONING}"
+
+COLLECTION_NAME = f"echoatlas_memory{_store_suffix}"
+
+# Content-addressed embedding cache (LRU in memory + SQLite on disk)
+EMBEDDING_CACHE_PATH = os.path.join(CHROMA_PATH, "embedding_cache.sqlite3")
+EMBEDDING_CACHE_MEMORY_ITEMS = int(os.getenv("ECHOATLAS_EMBEDDING_CACHE_ITEMS", "2048"))
+
+# SQLite sidecar index (scope + timestamp) used for paginated, newest-first listings
+MEMORY_INDEX_PATH = os.path.join(CHROMA_PATH, f"memory_index{_store_suffix}.sqlite3")
+
+# Write-behind ingestion: store_interaction returns immediately and a background
+# worker batches writes (one embedding request + one upsert per batch).
+WRITE_BEHIND_ENABLED = os.getenv("ECHOATLAS_WRITE_BEHIND", "1") != "0"
+WRITE_BATCH_SIZE = int(os.getenv("ECHOATLAS_WRITE_BATCH_SIZE", "32"))
+WRITE_MAX_LATENCY = float(os.getenv("ECHOATLAS_WRITE_MAX_LATENCY", "0.5"))
+INGEST_JOURNAL_PATH = os.path.join(CHROMA_PATH, f"ingest_journal{_store_suffix}.jsonl")
+# Batches still failing after this many retries are parked in the dead-letter file
+WRITE_MAX_RETRIES = int(os.getenv("ECHOATLAS_WRITE_MAX_RETRIES", "5"))
+INGEST_DEAD_LETTER_PATH = os.path.join(CHROMA_PATH, f"ingest_dead_letters{_store_suffix}.jsonl")
+# Reads wait this long for queued writes so users see their own interactions
+READ_FLUSH_TIMEOUT = 5.0
+# store_interaction(wait=True) waits at most this long for its commit
+STORE_WAIT_TIMEOUT = 10.0
+
+# Store-time dedupe: a new interaction whose phrase is at least this similar
+# (cosine) to a memory in the same scope bumps that memory's count/last_seen
+# and answer instead of adding a row.
+STORE_DEDUPE_ENABLED = os.getenv("ECHOATLAS_STORE_DEDUPE", "0") == "1"
+STORE_DEDUPE_THRESHOLD = float(os.getenv("ECHOATLAS_STORE_DEDUPE_THRESHOLD", "0.97"))
+
+# Recall search: "vector" (embedding similarity only), "lexical" (BM25 over the
+# index's full-text table, no embedding call), "hybrid" (both, fused with
+# reciprocal rank fusion) or "auto" (hybrid, except that queries of at most
+# LEXICAL_FAST_PATH_MAX_TERMS words whose words all appear in stored questions
+# are answered lexically and skip the embedding call). Only vector and hybrid
+# results always carry a cosine "score", so answer-cache lookups use those.
+RECALL_SEARCH_MODES = ("vector", "lexical", "hybrid", "auto")
+RECALL_SEARCH = os.getenv("ECHOATLAS_RECALL_SEARCH", "auto")
+LEXICAL_FAST_PATH_MAX_TERMS = int(os.getenv("ECHOATLAS_LEXICAL_FAST_PATH_MAX_TERMS", "3"))
+# Each hybrid leg ranks this many candidates per requested result
+HYBRID_CANDIDATE_FACTOR = 3
+RRF_K = 60
+
+# Memories carry precomputed scope keys (see _scope_keys); collections record
+# the version so older stores are migrated once when first opened.
+SCOPE_KEYS_VERSION = 2
 
 # Flag file used for restart-safe factory reset
 RESET_FLAG_PATH = "reset_memory_store.flag"
@@ -33,14 +118,203 @@ if os.path.exists(RESET_FLAG_PATH):
         # Don't crash the app; just log the issue
         print(f"⚠️ Failed to apply factory reset on startup: {e}")
 
-# One global client/collection for the app
-_embedding_fn = OpenAIEmbeddingFunction(model_name=EMBEDDING_MODEL_NAME)
+# One global backend/client/collection for the app
+_backend = create_embedding_backend(EMBEDDING_BACKEND)
+EMBEDDING_MODEL_NAME = _backend.model_name
+
 _client = chromadb.PersistentClient(path=CHROMA_PATH)
-_collection = _client.get_or_create_collection(
-    name=COLLECTION_NAME,
-    embedding_function=_embedding_fn,
+
+# Distance function per open collection (see _similarity)
+_spaces: dict[str, str] = {}
+
+
+def _collection_space(collection) -> str:
+    """Distance function of a collection's HNSW index ("l2" unless configured)."""
+    try:
+        configured = (collection.configuration.get("hnsw") or {}).get("space")
+    except Exception:
+        configured = None
+    return configured or (collection.metadata or {}).get("hnsw:space", "l2")
+
+
+def _on_collection_open(collection) -> None:
+    # Collections record the backend and dimension they were built with; refuse
+    # to mix vectors, and stamp stores created before this was recorded.
+    check_collection_backend(collection.metadata, _backend)
+    metadata = dict(collection.metadata or {})
+    if metadata.get("scope_keys_version") != SCOPE_KEYS_VERSION:
+        _migrate_scope_keys(collection)
+    if not metadata.get("embedding_backend") or metadata.get("scope_keys_version") != SCOPE_KEYS_VERSION:
+        collection.modify(
+            metadata={**metadata, **_backend.metadata(), "scope_keys_version": SCOPE_KEYS_VERSION}
+        )
+    _spaces[collection.name] = _collection_space(collection)
+    _check_partition_index(collection, metadata.get("memory_partition", ""))
+
+
+def _partition_scope(key: str) -> tuple[str | None, str | None]:
+    """(region, location) of the index rows stored in partition `key` (None matches any)."""
+    if MEMORY_PARTITIONING == "none":
+        return None, None
+    if MEMORY_PARTITIONING == "region":
+        return key, None
+    region, _, location = key.partition("|")
+    return region, location
+
+
+def _check_partition_index(collection, key: str) -> None:
+    """Resync one partition's index rows if its row count drifted from the index's."""
+    if _index.stale:
+        # _sync_index rebuilds the whole index
+        return
+    region, location = _partition_scope(key)
+    stored = collection.count()
+    if _index.partition_count(region, location) == stored:
+        return
+    print(f"🗂️ Resyncing memory index for '{collection.name}' ({stored} memories)...")
+    _index.rebuild(_iter_collection_records([collection]), region, location)
+
+
+# COLLECTION_NAME is the collection itself, or the name prefix of its partitions
+_router = CollectionRouter(
+    _client,
+    COLLECTION_NAME,
+    layout=MEMORY_PARTITIONING,
+    embedding_function=_backend.embedding_function,
+    metadata={**_backend.metadata(), "scope_keys_version": SCOPE_KEYS_VERSION},
+    on_open=_on_collection_open,
+    locations=lambda region: _index.locations(region),
+    max_open=MEMORY_PARTITION_MAX_OPEN,
+    idle_seconds=MEMORY_PARTITION_IDLE_SECONDS,
 )
 
+# All embeddings go through the cache; Chroma only sees precomputed vectors,
+# so identical text is embedded at most once per model.
+_embedding_cache = EmbeddingCache(
+    path=EMBEDDING_CACHE_PATH,
+    max_memory_items=EMBEDDING_CACHE_MEMORY_ITEMS,
+)
+_embedder = CachedEmbedder(_backend, EMBEDDING_MODEL_NAME, _embedding_cache)
+
+_index = MemoryIndex(MEMORY_INDEX_PATH)
+
+
+def _similarity(distance: float, space: str = "l2") -> float:
+    """
+    Chroma distance -> cosine similarity. Every backend's embeddings are unit
+    length, so squared L2 is 2 - 2*cos; cosine and ip distances are 1 - cos.
+    """
+    if space == "l2":
+        return 1.0 - distance / 2.0
+    return 1.0 - distance
+
+
+_dedupe_stats = {"deduplicated": 0}
+
+
+def _last_seen(metadata: dict) -> str:
+    return metadata.get("last_seen") or metadata.get("timestamp", "")
+
+
+def _bump(existing: dict, new: dict) -> dict:
+    """An existing memory seen again: count + 1, latest last_seen, newest answer."""
+    newer = new if new.get("answer") else existing
+    return {
+        **existing,
+        "count": int(existing.get("count", 1)) + int(new.get("count", 1)),
+        "last_seen": max(_last_seen(existing), _last_seen(new)),
+        "answer": newer.get("answer", ""),
+        # The answer keeps the time it was generated, not the time of the repeat
+        "answered_at": newer.get("answered_at") or newer.get("timestamp", ""),
+    }
+
+
+def _dedupe(collection, rows: list[int], records: list[dict], vectors, metadatas) -> tuple[list[int], dict]:
+    """
+    Split one partition's rows into new memories and bumps of existing ones
+    ({memory_id: updated metadata}), matching by scope and phrase similarity
+    both within the batch and against the collection.
+    """
+    kept: list[int] = []
+    bumped: dict[str, dict] = {}
+
+    # Within the batch: later repeats fold into the first occurrence
+    for i in rows:
+        for j in kept:
+            if (
+                metadatas[j]["scope"] == metadatas[i]["scope"]
+                and float(np.dot(vectors[i], vectors[j])) >= STORE_DEDUPE_THRESHOLD
+            ):
+                metadatas[j] = _bump(metadatas[j], metadatas[i])
+                break
+        else:
+            kept.append(i)
+
+    # Against the store: one nearest-neighbour query per scope
+    by_scope: dict[str, list[int]] = {}
+    for i in kept:
+        by_scope.setdefault(metadatas[i]["scope"], []).append(i)
+    fresh: list[int] = []
+    for scope, scope_rows in by_scope.items():
+        raw = collection.query(
+            query_embeddings=[vectors[i] for i in scope_rows],
+            n_results=1,
+            where={"scope": {"$eq": scope}},
+            include=["metadatas", "distances"],
+        )
+        for i, ids, metas, distances in zip(
+            scope_rows, raw.get("ids") or [], raw.get("metadatas") or [], raw.get("distances") or []
+        ):
+            if ids and ids[0] == records[i]["id"]:
+                # Journal replay of a record that was already committed
+                continue
+            if ids and _similarity(distances[0], _spaces.get(collection.name, "l2")) >= STORE_DEDUPE_THRESHOLD:
+                existing = bumped.get(ids[0]) or metas[0] or {}
+                # A replayed repeat was already counted when last_seen moved past it
+                if _last_seen(existing) < _last_seen(metadatas[i]):
+                    bumped[ids[0]] = _bump(existing, metadatas[i])
+            else:
+                fresh.append(i)
+    return fresh, bumped
+
+
+def _commit_batch(records: list[dict], dedupe: bool | None = None) -> None:
+    """
+    Write a batch of queued interactions: one embedding call for all
+    documents, one upsert per partition (idempotent, so journal replays are safe).
+    With store-time dedupe, repeats of a memory in the same scope update it
+    instead (`dedupe` overrides STORE_DEDUPE_ENABLED, e.g. for digests).
+    """
+    dedupe = STORE_DEDUPE_ENABLED if dedupe is None else dedupe
+    vectors = _embedder([r["document"] for r in records])
+    # Journaled records from older versions may lack the scope keys
+    metadatas = [_with_scope_keys(r["metadata"]) for r in records]
+    by_collection: dict[str, tuple[object, list[int]]] = {}
+    for i, meta in enumerate(metadatas):
+        collection = _router.for_write(meta["region"], meta["location"])
+        by_collection.setdefault(collection.name, (collection, []))[1].append(i)
+
+    added: list[int] = []
+    for collection, rows in by_collection.values():
+        if dedupe:
+            submitted = len(rows)
+            rows, bumped = _dedupe(collection, rows, records, np.asarray(vectors, dtype=np.float32), metadatas)
+            if bumped:
+                collection.update(ids=list(bumped), metadatas=list(bumped.values()))
+                # Bumps may carry a newer answer; keep the full-text index in step
+                _index.add({**meta, "id": memory_id} for memory_id, meta in bumped.items())
+            _dedupe_stats["deduplicated"] += submitted - len(rows)
+        if rows:
+            collection.upsert(
+                ids=[records[i]["id"] for i in rows],
+                documents=[records[i]["document"] for i in rows],
+                embeddings=[vectors[i] for i in rows],
+                metadatas=[metadatas[i] for i in rows],
+            )
+        added.extend(rows)
+    _index.add({**metadatas[i], "id": records[i]["id"]} for i in added)
+    print(f"✅ Committed {len(records)} memories to the store ({len(added)} new).")
+
 
 # ---------------------------------
 # Helpers
@@ -52,6 +326,75 @@ def _clean(text: str) -> str:
     return "".join(ch for ch in text if ch.isalnum() or ch in " ()-,").strip()
 
 
+@functools.lru_cache(maxsize=4096)
+def _canonical(text: str | None) -> str:
+    """
+    Canonical region/location: NFKC-normalized, cleaned and interned.
+    Cached, so each distinct value is normalized once per process.
+    """
+    if not text:
+        return ""
+    return sys.intern(_clean(unicodedata.normalize("NFKC", text)))
+
+
+@functools.lru_cache(maxsize=4096)
+def _scope_keys(region: str, location: str, mode: str, context: str) -> dict:
+    """
+    Precomputed filter keys stored on every memory (from canonical values),
+    one per scope _build_where can ask for:
+    - scope_region:              region
+    - scope_region_mode:         region|mode
+    - scope_region_context:      region|context
+    - scope_region_mode_context: region|mode|context
+    - scope_location:            region|location
+    - scope_location_mode:       region|location|mode
+    - scope_location_context:    region|location|context
+    - scope:                     region|location|mode|context
+    _clean never keeps "|", so keys cannot collide across fields.
+    """
+    return {
+        "scope_region": region,
+        "scope_region_mode": sys.intern(f"{region}|{mode}"),
+        "scope_region_context": sys.intern(f"{region}|{context}"),
+        "scope_region_mode_context": sys.intern(f"{region}|{mode}|{context}"),
+        "scope_location": sys.intern(f"{region}|{location}"),
+        "scope_location_mode": sys.intern(f"{region}|{location}|{mode}"),
+        "scope_location_context": sys.intern(f"{region}|{location}|{context}"),
+        "scope": sys.intern(f"{region}|{location}|{mode}|{context}"),
+    }
+
+
+def _with_scope_keys(metadata: dict) -> dict:
+    """Metadata with canonical region/location and its scope keys filled in."""
+    region = _canonical(metadata.get("region"))
+    location = _canonical(metadata.get("location"))
+    return {
+        **metadata,
+        "region": region,
+        "location": location,
+        **_scope_keys(region, location, metadata.get("mode") or "", metadata.get("context") or ""),
+    }
+
+
+def _migrate_scope_keys(collection, batch_size: int = 1000) -> None:
+    """Add scope keys to every memory of a collection written before they existed."""
+    migrated = 0
+    offset = 0
+    while True:
+        raw = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+        ids = raw.get("ids", [])
+        if not ids:
+            break
+        metas = [_with_scope_keys(m or {}) for m in _normalize_metadatas(raw.get("metadatas", []))]
+        collection.update(ids=ids, metadatas=metas)
+        # Region/location may have changed under NFKC; keep the index in step
+        _index.add({**m, "id": i} for i, m in zip(ids, metas))
+        migrated += len(ids)
+        offset += len(ids)
+    if migrated:
+        print(f"🔑 Added scope keys to {migrated} memories in '{collection.name}'.")
+
+
 def _build_where(
     region: str,
     location: str | None = None,
@@ -62,35 +405,26 @@ def _build_where(
     Build a D-level filter:
     Region + Location + (optional) Mode + (optional) Context.
 
-    Chroma requires:
-    - a single dict like {"region": {"$eq": "USA"}}  OR
-    - {"$and": [cond1, cond2, ...]} with at least 2 items.
-
-    So:
-    - 0 clauses -> return {}  (no filter)
-    - 1 clause  -> return that clause directly
-    - 2+        -> wrap in {"$and": [...]}
+    Always a single equality on the precomputed scope key for exactly the
+    fields given (see _scope_keys), e.g.:
+    - region + location + mode + context -> {"scope": ...}
+    - region + location                  -> {"scope_location": ...}
+    - region + mode                      -> {"scope_region_mode": ...}
+    No region -> {} (no filter).
     """
-    clauses: list[dict] = []
-
-    if region:
-        clauses.append({"region": {"$eq": _clean(region)}})
-
-    if location is not None and location != "":
-        clauses.append({"location": {"$eq": _clean(location)}})
+    region = _canonical(region)
+    if not region:
+        return {}
+    location = _canonical(location)
 
+    key = "scope_location" if location else "scope_region"
     if mode:
-        clauses.append({"mode": {"$eq": mode}})
-
+        key += "_mode"
     if context:
-        clauses.append({"context": {"$eq": context}})
-
-    if not clauses:
-        return {}
-    if len(clauses) == 1:
-        return clauses[0]
-    return {"$and": clauses}
-
+        key += "_context"
+    if key == "scope_location_mode_context":
+        key = "scope"
+    return {key: {"$eq": _scope_keys(region, location, mode or "", context or "")[key]}}
 
 
 def _normalize_metadatas(raw):
@@ -106,15 +440,122 @@ def _normalize_metadatas(raw):
     return raw
 
 
+def _to_memory(
+    meta: dict,
+    doc: str = "",
+    region: str = "",
+    location: str = "",
+    memory_id: str = "",
+) -> dict:
+    """Shape one stored metadata record into the dict the UI and agents consume."""
+    return {
+        "id": memory_id,
+        "phrase": meta.get("phrase", doc),
+        "answer": meta.get("answer", ""),
+        "gesture": meta.get("gesture", "🤷"),
+        "custom": meta.get("custom", "No cultural insight available."),
+        "tone": meta.get("tone", "Neutral"),
+        "mode": meta.get("mode", "Unknown"),
+        "region": meta.get("region", region),
+        "location": meta.get("location", location),
+        "context": meta.get("context", "default"),
+        "timestamp": meta.get("timestamp", ""),
+        "count": meta.get("count", 1),
+        "last_seen": meta.get("last_seen", meta.get("timestamp", "")),
+        "answered_at": meta.get("answered_at") or meta.get("timestamp", ""),
+        "kind": meta.get("kind", "memory"),
+        "digest_of": meta.get("digest_of", 0),
+    }
+
+
+def _iter_collection_records(collections: list | None = None, batch_size: int = 1000):
+    """Yield {id, **metadata} for every memory of `collections` (default: all), one Chroma page at a time."""
+    for collection in _router.all() if collections is None else collections:
+        offset = 0
+        while True:
+            raw = collection.get(include=["metadatas"], limit=batch_size, offset=offset)
+            ids = raw.get("ids", [])
+            if not ids:
+                break
+            metas = _normalize_metadatas(raw.get("metadatas", []))
+            for memory_id, meta in zip(ids, metas):
+                yield {**(meta or {}), "id": memory_id}
+            offset += len(ids)
+
+
+def _sync_index():
+    """
+    Reconcile the sidecar index with the store at startup, without opening
+    every partition. An index from an older schema is rebuilt from all of
+    them. Otherwise index rows of partitions that no longer exist are
+    dropped and partitions the index has never seen are opened; every
+    partition's row count is checked against the index when it is opened
+    (see _check_partition_index).
+    """
+    if _index.stale:
+        print("🗂️ Rebuilding memory index from the store...")
+        rebuilt = _index.rebuild(_iter_collection_records())
+        print(f"✅ Memory index rebuilt with {rebuilt} entries.")
+        return
+    if not _router.partitioned:
+        # One collection: opening it runs the check
+        _router.all()
+        return
+
+    existing = set(_router.names())
+    indexed: dict[str, str] = {}
+    for scope in _index.scopes():
+        key = partition_key(MEMORY_PARTITIONING, scope["region"], scope["location"])
+        indexed[partition_name(COLLECTION_NAME, key)] = key
+    for name, key in indexed.items():
+        if name not in existing:
+            print(f"🗂️ Dropping index rows of missing partition '{key}'.")
+            _index.rebuild([], *_partition_scope(key))
+    for name in existing - indexed.keys():
+        _router.open(name)
+
+
+_sync_index()
+
+_writer = (
+    WriteBehindQueue(
+        _commit_batch,
+        journal_path=INGEST_JOURNAL_PATH,
+        max_batch_size=WRITE_BATCH_SIZE,
+        max_latency=WRITE_MAX_LATENCY,
+        max_retries=WRITE_MAX_RETRIES,
+        dead_letter_path=INGEST_DEAD_LETTER_PATH,
+    )
+    if WRITE_BEHIND_ENABLED
+    else None
+)
+if _writer is not None:
+    atexit.register(_writer.close)
+
+
+def _await_writes() -> None:
+    """
+    Read-your-writes: let queued interactions land before reading the store.
+    While writes are failing, reads do not wait (they would only time out).
+    """
+    if _writer is not None and _writer.failing:
+        if _writer.pending():
+            print("⚠️ Memory writes are failing; reading without the queued interactions.")
+        return
+    if _writer is not None and _writer.pending():
+        if not _writer.flush(timeout=READ_FLUSH_TIMEOUT):
+            print("⚠️ Memory writes still pending; results may miss the newest interactions.")
+
+
 # ---------------------------------
 # Public API
 # ---------------------------------
 def setup_memory_schema():
     """
     Kept for compatibility with app.py.
-    Ensures the collection is initialized.
+    Ensures the collection (or, when partitioned, the store) is initialized.
     """
-    _ = _collection.name
+    _router.all()
     return
 
 
@@ -128,7 +569,9 @@ def store_interaction(
     mode: str = "Text",
     context: str | None = "default",
     answer: str | None = None,  # agent answer
-):
+    wait: bool = False,
+    answered_at: str | None = None,
+) -> dict:
     """
     Store a new interaction in memory, fully scoped by:
     Region + Location + Mode + Context  (D-level isolation).
@@ -137,10 +580,21 @@ def store_interaction(
     - phrase: user input / question
     - answer: agent's response
     - tone / gesture / custom: cultural metadata
+
+    With write-behind enabled the interaction is journaled and queued, and
+    this returns without waiting on the embedding call or the Chroma write
+    (pass wait=True to block until it is committed, for at most
+    STORE_WAIT_TIMEOUT seconds; a write that takes longer stays journaled).
+
+    `answered_at` is when the answer was generated (default: now); the
+    answer cache measures freshness from it.
+
+    Returns the stored memory in the same shape as recall_similar() results,
+    so callers can show it without querying the store again.
     """
 
-    clean_region = _clean(region)
-    clean_location = _clean(location)
+    clean_region = _canonical(region)
+    clean_location = _canonical(location)
     context = context or "default"
 
     print(
@@ -152,30 +606,118 @@ def store_interaction(
     uid = str(uuid.uuid4())
     timestamp = datetime.datetime.utcnow().isoformat()
 
-    _collection.add(
-        documents=[phrase],
-        metadatas=[
-            {
-                "region": clean_region,
-                "location": clean_location,
-                "mode": mode,
-                "context": context,
-                "field": "phrase",
-                "phrase": phrase,
-                "answer": answer or "",
-                "tone": tone,
-                "gesture": gesture,
-                "custom": custom,
-                "timestamp": timestamp,
-            }
-        ],
-        ids=[uid],
-    )
+    metadata = {
+        "region": clean_region,
+        "location": clean_location,
+        "mode": mode,
+        "context": context,
+        "field": "phrase",
+        "phrase": phrase,
+        "answer": answer or "",
+        "answered_at": (answered_at or timestamp) if answer else "",
+        "tone": tone,
+        "gesture": gesture,
+        "custom": custom,
+        "timestamp": timestamp,
+        "count": 1,
+        "last_seen": timestamp,
+    }
+
+    record = {"id": uid, "document": phrase, "metadata": metadata}
+    if _writer is None:
+        _commit_batch([record])
+    else:
+        _writer.submit(record)
+        if wait and not _writer.flush(timeout=STORE_WAIT_TIMEOUT):
+            print("⚠️ Memory write still pending; it stays journaled and is committed in the background.")
 
     print(
         f"✅ Stored memory for region='{clean_region}', "
         f"location='{clean_location}', mode='{mode}', context='{context}'"
     )
+    return _to_memory(metadata, phrase, memory_id=uid)
+
+
+def _fetch_memories(ids: list[str], region: str, location: str) -> dict[str, dict]:
+    """{id: memory} for the given ids of a scope, read from its partition(s) only."""
+    by_id: dict[str, dict] = {}
+    if not ids:
+        return by_id
+    for collection in _router.for_read(region, location):
+        raw = collection.get(ids=ids, include=["metadatas", "documents"])
+        for memory_id, doc, meta in zip(
+            raw.get("ids", []),
+            raw.get("documents") or [""] * len(raw.get("ids", [])),
+            _normalize_metadatas(raw.get("metadatas", [])),
+        ):
+            by_id[memory_id] = _to_memory(meta or {}, doc or "", region, location, memory_id)
+        if len(by_id) == len(ids):
+            break
+    return by_id
+
+
+def _lexical_memories(
+    hits: list[tuple[str, float]],
+    region: str,
+    location: str,
+    user_input: str,
+) -> list[dict]:
+    """Memories for index search hits, best first, with their BM25 "lexical_score"."""
+    by_id = _fetch_memories([memory_id for memory_id, _ in hits], region, location)
+    memories = []
+    for memory_id, lexical_score in hits:
+        memory = by_id.get(memory_id)
+        if memory is None:
+            continue
+        memory["lexical_score"] = round(lexical_score, 4)
+        if memory["phrase"].strip() == user_input.strip():
+            # Identical text embeds identically, so its cosine similarity is exactly 1
+            memory["score"] = 1.0
+        memories.append(memory)
+    return memories
+
+
+def _vector_memories(
+    region: str,
+    location: str,
+    user_input: str,
+    mode: str | None,
+    context: str | None,
+    n_results: int,
+) -> list[dict]:
+    """Embedding similarity search in a scope, best first, with cosine "score"."""
+    where = _build_where(region, location, mode, context)
+    collections = _router.for_read(region, location)
+    query_embeddings = _embedder([user_input]) if collections else []
+
+    memories: list[dict] = []
+    for collection in collections:
+        raw = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where,
+            include=["metadatas", "documents", "distances"],
+        )
+
+        ids = raw.get("ids", [[]])[0] if raw.get("ids") else []
+        docs = raw.get("documents", [[]])[0] if raw.get("documents") else []
+        metas = raw.get("metadatas", [[]])[0] if raw.get("metadatas") else []
+        distances = raw.get("distances", [[]])[0] if raw.get("distances") else [None] * len(ids)
+
+        for memory_id, doc, meta, distance in zip(ids, docs, metas, distances):
+            print(
+                f"   ➡️ Returned meta.region='{meta.get('region')}', "
+                f"location='{meta.get('location')}', mode='{meta.get('mode')}', "
+                f"context='{meta.get('context')}'"
+            )
+            memory = _to_memory(meta, doc, region, location, memory_id)
+            if distance is not None:
+                memory["score"] = round(_similarity(distance, _spaces.get(collection.name, "l2")), 4)
+            memories.append(memory)
+
+    # Region-wide recall over several partitions: keep the overall best
+    memories.sort(key=lambda x: x.get("score", 0.0), reverse=True)
+    return memories[:n_results]
 
 
 def recall_similar(
@@ -185,6 +727,7 @@ def recall_similar(
     mode: str | None = None,
     context: str | None = None,
     top_k: int = 5,
+    search: str | None = None,
 ) -> list[dict]:
     """
     Recall memories with strict D-level isolation.
@@ -192,76 +735,289 @@ def recall_similar(
     - Always filters by *region*.
     - Filters by *location* if provided.
     - Optionally filters by *mode* (Mic/Text) and *context*.
-    - If user_input is empty/whitespace, returns ALL memories for that scope.
+    - If user_input is empty/whitespace, returns the newest *top_k* memories
+      for that scope (see list_memories() for paging further back).
+
+    `search` picks how user_input is matched (default RECALL_SEARCH):
+    "vector", "lexical", "hybrid" or "auto" (see RECALL_SEARCH_MODES).
+
+    Semantic matches carry a "score": cosine similarity to user_input.
+    Keyword matches carry a "lexical_score" (BM25). Keyword-only results
+    ("lexical", or the "auto" fast path) have no "score" unless the stored
+    phrase is identical to user_input; pass "hybrid" or "vector" when the
+    caller needs similarities (e.g. for the semantic answer cache).
     """
+    search = search or RECALL_SEARCH
+    if search not in RECALL_SEARCH_MODES:
+        raise ValueError(f"Unknown recall search '{search}' (expected one of: {', '.join(RECALL_SEARCH_MODES)})")
 
-    clean_region = _clean(region)
-    clean_location = _clean(location)
+    clean_region = _canonical(region)
+    clean_location = _canonical(location)
 
     print(
         f"🔍 recall_similar -> "
         f"region='{clean_region}', location='{clean_location}', "
-        f"mode='{mode}', context='{context}', user_input='{user_input}'"
+        f"mode='{mode}', context='{context}', user_input='{user_input}', search='{search}'"
     )
 
-    where = _build_where(clean_region, clean_location, mode, context)
+    _await_writes()
 
-    # Case 1: no input → fetch all memories for this scope
+    # Case 1: no input → newest memories for this scope, limited at the index
     if not user_input or not user_input.strip():
-        raw = _collection.get(where=where)
-        metas = _normalize_metadatas(raw.get("metadatas", []))
-        memories = [
-            {
-                "phrase": m.get("phrase", ""),
-                "answer": m.get("answer", ""),
-                "gesture": m.get("gesture", "🤷"),
-                "custom": m.get("custom", "No cultural insight available."),
-                "tone": m.get("tone", "Neutral"),
-                "mode": m.get("mode", "Unknown"),
-                "region": m.get("region", clean_region),
-                "location": m.get("location", clean_location),
-                "context": m.get("context", "default"),
-                "timestamp": m.get("timestamp", ""),
-            }
-            for m in metas
-        ]
-        memories.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+        memories, _ = list_memories(clean_region, clean_location, mode, context, limit=top_k)
         return memories
 
-    # Case 2: semantic similarity query
-    raw = _collection.query(
-        query_texts=[user_input],
-        n_results=top_k,
-        where=where,
+    scope = (clean_region, clean_location, mode, context)
+    memories: list[dict]
+    if search == "lexical":
+        # Case 2: keyword search only
+        hits = _index.search(user_input, *scope, limit=top_k)
+        memories = _lexical_memories(hits, clean_region, clean_location, user_input)
+    elif search == "vector":
+        # Case 3: semantic similarity only, against this scope's partition(s)
+        memories = _vector_memories(clean_region, clean_location, user_input, mode, context, top_k)
+    else:
+        # Case 4 ("auto"): short queries whose words all appear in stored questions need no embedding
+        confident = []
+        if search == "auto" and len(search_terms(user_input)) <= LEXICAL_FAST_PATH_MAX_TERMS:
+            confident = _index.search(user_input, *scope, limit=top_k, match_all=True, phrase_only=True)
+        if confident:
+            print(f"⚡ Lexical fast path: {len(confident)} keyword matches, skipping the embedding call.")
+            memories = _lexical_memories(confident, clean_region, clean_location, user_input)
+        else:
+            # Case 5: hybrid, both rankings fused with reciprocal rank fusion
+            candidates = top_k * HYBRID_CANDIDATE_FACTOR
+            vector = _vector_memories(clean_region, clean_location, user_input, mode, context, candidates)
+            lexical = _index.search(user_input, *scope, limit=candidates)
+            fused = reciprocal_rank_fusion(
+                [[m["id"] for m in vector], [memory_id for memory_id, _ in lexical]], k=RRF_K
+            )
+            best = sorted(fused, key=fused.get, reverse=True)[:top_k]
+            by_id = {m["id"]: m for m in vector}
+            lexical_scores = dict(lexical)
+            # Only keyword-only hits still need fetching from Chroma
+            missing = [(i, lexical_scores[i]) for i in best if i not in by_id]
+            by_id.update((m["id"], m) for m in _lexical_memories(missing, clean_region, clean_location, user_input))
+            memories = []
+            for memory_id in best:
+                if memory_id in by_id:
+                    memory = by_id[memory_id]
+                    if memory_id in lexical_scores:
+                        memory["lexical_score"] = round(lexical_scores[memory_id], 4)
+                    memories.append(memory)
+
+    memories.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
+    return memories
+
+
+def search_memories(
+    region: str,
+    location: str | None,
+    query: str,
+    mode: str | None = None,
+    context: str | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """
+    Keyword search over stored questions and answers in a scope, best match
+    first (BM25 from the memory index; no embedding call).
+    """
+    clean_region = _canonical(region)
+    clean_location = _canonical(location)
+    _await_writes()
+    hits = _index.search(query, clean_region, clean_location, mode, context, limit=limit)
+    return _lexical_memories(hits, clean_region, clean_location, query)
+
+
+def list_memories(
+    region: str,
+    location: str | None = None,
+    mode: str | None = None,
+    context: str | None = None,
+    limit: int = 20,
+    cursor: str | None = None,
+    offset: int = 0,
+    after: str | None = None,
+) -> tuple[list[dict], str | None]:
+    """
+    Page through the memories of a scope, newest first.
+
+    The limit is applied in the sidecar index (ordered by timestamp), and only
+    the ids on this page are fetched from Chroma.
+
+    Returns (memories, next_cursor). Pass next_cursor back to get the following
+    page; it is None once the scope is exhausted. Pass a watermark from
+    memory_watermark() as `after` to list only memories stored since then.
+    """
+    clean_region = _canonical(region)
+    clean_location = _canonical(location)
+    _await_writes()
+
+    ids, next_cursor = _index.page(
+        clean_region,
+        clean_location,
+        mode,
+        context,
+        limit=limit,
+        cursor=cursor,
+        offset=offset,
+        after=after,
     )
+    if not ids:
+        return [], None
 
-    docs = raw.get("documents", [[]])[0] if raw.get("documents") else []
-    metas = raw.get("metadatas", [[]])[0] if raw.get("metadatas") else []
+    by_id = _fetch_memories(ids, clean_region, clean_location)
+    return [by_id[i] for i in ids if i in by_id], next_cursor
 
-    memories: list[dict] = []
-    for doc, meta in zip(docs, metas):
-        print(
-            f"   ➡️ Returned meta.region='{meta.get('region')}', "
-            f"location='{meta.get('location')}', mode='{meta.get('mode')}', "
-            f"context='{meta.get('context')}'"
-        )
-        memories.append(
-            {
-                "phrase": meta.get("phrase", doc),
-                "answer": meta.get("answer", ""),
-                "gesture": meta.get("gesture", "🤷"),
-                "custom": meta.get("custom", "No cultural insight available."),
-                "tone": meta.get("tone", "Neutral"),
-                "mode": meta.get("mode", "Unknown"),
-                "region": meta.get("region", clean_region),
-                "location": meta.get("location", clean_location),
-                "context": meta.get("context", "default"),
-                "timestamp": meta.get("timestamp", ""),
-            }
+
+def count_memories(
+    region: str,
+    location: str | None = None,
+    mode: str | None = None,
+    context: str | None = None,
+) -> int:
+    """Number of stored memories in a scope (answered from the index)."""
+    _await_writes()
+    return _index.count(_canonical(region), _canonical(location), mode, context)
+
+
+def memory_watermark(region: str, location: str | None = None) -> tuple[int, str | None, int]:
+    """
+    (memory count, cursor of the newest memory, occurrences) for a scope,
+    from the index. Occurrences also count repeats folded into existing
+    memories by store-time dedupe.
+
+    Cheap enough to call on every render; if all three values are unchanged,
+    no memory in the scope was added, removed or repeated since they were taken.
+    """
+    _await_writes()
+    clean_region, clean_location = _canonical(region), _canonical(location)
+    return (
+        _index.count(clean_region, clean_location),
+        _index.latest_cursor(clean_region, clean_location),
+        _index.occurrences(clean_region, clean_location),
+    )
+
+
+def canonical_scope(region: str, location: str | None = None) -> tuple[str, str]:
+    """(region, location) in the canonical form memories are stored and indexed under."""
+    return _canonical(region), _canonical(location)
+
+
+class RecallScope:
+    """
+    Request-scoped memo of recall results.
+
+    Create one per Streamlit rerun and route every panel's recall through it,
+    so identical (scope, query, top_k) lookups hit the vector store once.
+    Results already obtained elsewhere (e.g. by run_agent) can be seeded in.
+    """
+
+    def __init__(self):
+        self._results: dict[tuple, list[dict]] = {}
+        self.queries = 0
+
+    @staticmethod
+    def _key(region, location, user_input, mode, context, top_k) -> tuple:
+        return (
+            _canonical(region),
+            _canonical(location),
+            (user_input or "").strip(),
+            mode or None,
+            context or None,
+            top_k,
         )
 
-    memories.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
-    return memories
+    def seed(
+        self,
+        memories: list[dict],
+        region: str,
+        location: str,
+        user_input: str,
+        mode: str | None = None,
+        context: str | None = None,
+        top_k: int = 5,
+    ) -> None:
+        """Register results fetched outside this scope for the given lookup."""
+        self._results[self._key(region, location, user_input, mode, context, top_k)] = memories
+
+    def recall(
+        self,
+        region: str,
+        location: str,
+        user_input: str,
+        mode: str | None = None,
+        context: str | None = None,
+        top_k: int = 5,
+    ) -> list[dict]:
+        """Same contract as recall_similar(), memoized for this request."""
+        key = self._key(region, location, user_input, mode, context, top_k)
+        if key not in self._results:
+            self.queries += 1
+            self._results[key] = recall_similar(
+                region=region,
+                location=location,
+                user_input=user_input,
+                mode=mode,
+                context=context,
+                top_k=top_k,
+            )
+        return self._results[key]
+
+
+def flush_pending_writes(timeout: float | None = None) -> bool:
+    """Block until queued interactions are committed. Returns False on timeout."""
+    return _writer.flush(timeout=timeout) if _writer is not None else True
+
+
+def memory_writer_stats() -> dict:
+    """Counters for the write-behind queue (submitted, committed, batches, ...)."""
+    dedupe = {"dedupe": STORE_DEDUPE_ENABLED, **_dedupe_stats}
+    if _writer is None:
+        return {"enabled": False, **dedupe}
+    return {
+        "enabled": True,
+        "pending": _writer.pending(),
+        "failing": _writer.failing,
+        **_writer.stats,
+        **dedupe,
+    }
+
+
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """Embed texts with the memory store's model, through the embedding cache."""
+    return _embedder(texts)
+
+
+def seed_embedding_cache(
+    texts: list[str],
+    vectors: list[list[float]],
+    model_name: str = EMBEDDING_MODEL_NAME,
+) -> int:
+    """
+    Preload precomputed embeddings (e.g. the prompt library artifact) so
+    recalls for these texts need no embedding call. Returns how many were seeded.
+    """
+    if model_name != EMBEDDING_MODEL_NAME:
+        print(f"⚠️ Not seeding embeddings from '{model_name}' (store uses '{EMBEDDING_MODEL_NAME}').")
+        return 0
+    _embedding_cache.put_many(model_name, texts, vectors)
+    return len(texts)
+
+
+def embedding_cache_stats() -> dict:
+    """Hit/miss counters for the embedding cache (memory + disk tiers)."""
+    return _embedding_cache.stats()
+
+
+def embedding_backend_info() -> dict:
+    """Active embedding backend, model and dimension, and the collection it writes to."""
+    return {"collection": COLLECTION_NAME, **_backend.metadata()}
+
+
+def memory_partition_stats() -> dict:
+    """Partition layout and collection handle counters (open, opened, evicted)."""
+    return _router.stats()
 
 
 def display_memory(memory: dict):
@@ -284,6 +1040,11 @@ def display_memory(memory: dict):
     )
     st.markdown(f"🎭 Tone: {memory.get('tone', 'Neutral')}")
 
+    if memory.get("kind") == DIGEST_KIND:
+        st.caption(f"🗜️ Digest of {memory.get('digest_of', 0)} older conversations")
+    elif memory.get("count", 1) > 1:
+        st.caption(f"🔁 Asked {memory['count']} times (last: {memory.get('last_seen', '')})")
+
     st.caption(
         f"🕒 {memory.get('timestamp', '')} | "
         f"🏙️ {memory.get('region', '')} → {memory.get('location', '')} | "
@@ -291,68 +1052,233 @@ def display_memory(memory: dict):
     )
 
 
+def _group_by_collection(ids: list[str], home: dict[str, object]) -> list[tuple[object, list[str]]]:
+    """(collection, ids) pairs for memories whose collection is known."""
+    grouped: dict[str, tuple[object, list[str]]] = {}
+    for memory_id in ids:
+        collection = home[memory_id]
+        grouped.setdefault(collection.name, (collection, []))[1].append(memory_id)
+    return list(grouped.values())
+
+
+def _delete_ids(ids: list[str], home: dict[str, object]) -> None:
+    """Delete memories by id from the collections they live in, and from the index."""
+    for collection, memory_ids in _group_by_collection(ids, home):
+        collection.delete(ids=memory_ids)
+    _index.remove(ids)
+
+
+def compact_memories(
+    region: str | None = None,
+    location: str | None = None,
+    min_age_days: float = COMPACTION_MIN_AGE_DAYS,
+    dry_run: bool = True,
+    min_group: int = COMPACTION_MIN_GROUP,
+    summarize: Summarizer | None = None,
+    batch_size: int = 1000,
+) -> dict:
+    """
+    Fold memories not seen for `min_age_days` into one digest memory per
+    scope (region + location + mode + context), then delete the originals.
+    Optionally limited to one region / location.
+
+    Works one (region, location) at a time: the old ids come from the index
+    and only those are fetched from Chroma. Originals are marked with the
+    digest they go into, the digest is written, then the originals are
+    deleted; a pass interrupted after writing a digest leaves marked
+    originals behind, which the next pass deletes instead of folding twice.
+
+    With dry_run=True (the default) nothing is written; either way the
+    report says how many rows and roughly how many bytes are reclaimed.
+    """
+    _await_writes()
+    cutoff = compaction_cutoff(min_age_days)
+    clean_region = _canonical(region) if region else None
+    clean_location = _canonical(location) if location else None
+
+    pairs = sorted(
+        {
+            (s["region"], s["location"])
+            for s in _index.scopes(clean_region, clean_location)
+            if s["memory_count"] >= min_group
+        }
+    )
+    plans: list[dict] = []
+    for scope_region, scope_location in pairs:
+        # Timestamps never exceed last_seen, so this is a superset of the old memories
+        ids = _index.ids_before(scope_region, scope_location, before=cutoff)
+        if len(ids) < min_group:
+            continue
+        # Each old memory with the collection (partition) it lives in
+        old: list[dict] = []
+        home: dict[str, object] = {}
+        for collection in _router.for_read(scope_region, scope_location):
+            for offset in range(0, len(ids), batch_size):
+                raw = collection.get(ids=ids[offset : offset + batch_size], include=["metadatas"])
+                for memory_id, meta in zip(raw.get("ids", []), _normalize_metadatas(raw.get("metadatas", []))):
+                    meta = meta or {}
+                    # The index treats an empty location as "any"; keep this pair's memories only
+                    if meta.get("location", "") == scope_location:
+                        old.append({**meta, "id": memory_id})
+                        home[memory_id] = collection
+
+        leftovers = [m["id"] for m in old if m.get("compacted_into") in home]
+        scope_plans = plan_compaction(
+            [m for m in old if m.get("compacted_into") not in home],
+            cutoff,
+            _backend.dimension,
+            min_group=min_group,
+            summarize=summarize,
+        )
+        plans.extend(scope_plans)
+        if dry_run:
+            continue
+        if leftovers:
+            print(f"🧹 Removing {len(leftovers)} memories already folded by an interrupted compaction.")
+            _delete_ids(leftovers, home)
+        if not scope_plans:
+            continue
+
+        metadata = {m["id"]: {k: v for k, v in m.items() if k != "id"} for m in old}
+        for plan in scope_plans:
+            for collection, memory_ids in _group_by_collection(plan["ids"], home):
+                collection.update(
+                    ids=memory_ids,
+                    metadatas=[{**metadata[i], "compacted_into": plan["digest_id"]} for i in memory_ids],
+                )
+        _commit_batch(
+            [
+                {"id": plan["digest_id"], "document": plan["digest"]["phrase"], "metadata": plan["digest"]}
+                for plan in scope_plans
+            ],
+            dedupe=False,
+        )
+        _delete_ids([i for plan in scope_plans for i in plan["ids"]], home)
+
+    report = compaction_report(plans, dry_run, cutoff)
+    verb = "Would fold" if dry_run else "Folded"
+    print(
+        f"🗜️ {verb} {report['memories_folded']} memories into {report['digests']} digests "
+        f"({report['rows_reclaimed']} rows, ~{report['bytes_reclaimed']} bytes reclaimed)."
+    )
+    return report
+
+
+_compaction_job = (
+    CompactionJob(lambda: compact_memories(dry_run=False), COMPACTION_INTERVAL_HOURS * 3600)
+    if COMPACTION_INTERVAL_HOURS > 0
+    else None
+)
+if _compaction_job is not None:
+    _compaction_job.start()
+    atexit.register(_compaction_job.stop)
+
+
+def compaction_job_stats() -> dict:
+    """Background compaction schedule and the summary of its last run."""
+    if _compaction_job is None:
+        return {"enabled": False, "min_age_days": COMPACTION_MIN_AGE_DAYS}
+    return {"enabled": True, "min_age_days": COMPACTION_MIN_AGE_DAYS, **_compaction_job.stats()}
+
+
 def delete_memories_for_region(
     region: str,
-    location: str,
+    location: str | None = None,
     mode: str = None,
     context: str = None,
 ) -> str:
     """
     Delete all memories for a specific region/location.
     If mode/context are provided, filter by them; otherwise delete ALL modes/contexts
-    for that region + location.
+    for that region + location. If location is omitted, the whole region is cleared.
+
+    Goes through the scope's collection(s) with a single delete(where=...) each,
+    so no ids are pulled into Python regardless of how many memories match.
+    When partitioned and the scope is a whole partition, the partition's
+    collection is dropped instead. The count comes from the sidecar index; only
+    if that reports none is the store itself asked, so memories the index
+    missed are still deleted.
 
     Returns a human-readable message for the UI.
     """
-    clean_region = "".join(ch for ch in region if ch.isalnum() or ch in " ()-,").strip()
-    clean_location = "".join(ch for ch in location if ch.isalnum() or ch in " ()-,").strip()
-
-    client = chromadb.PersistentClient(path="memory_store")
-    collection = client.get_or_create_collection(
-        name="echoatlas_memory",
-        embedding_function=OpenAIEmbeddingFunction(
-            model_name="text-embedding-3-small"
-        ),
-    )
-
-    # Build the filter (region + location always; mode/context optional)
-    where_clauses = [
-        {"region": {"$eq": clean_region}},
-        {"location": {"$eq": clean_location}},
-    ]
-    if mode is not None:
-        where_clauses.append({"mode": {"$eq": mode}})
-    if context is not None:
-        where_clauses.append({"context": {"$eq": context}})
-
-    where = {"$and": where_clauses}
+    clean_region = _canonical(region)
+    clean_location = _canonical(location)
+    scope = f"{clean_region} / {clean_location or 'ALL'}"
 
-    # Fetch IDs to delete
-    raw = collection.get(where=where)
-    ids_to_delete = raw.get("ids", [])
+    where = _build_where(clean_region, clean_location, mode, context)
+    if not where:
+        return "ℹ️ Refusing to delete without a region."
 
-    # Chroma often returns nested lists: [[id1, id2, ...]]
-    if ids_to_delete and isinstance(ids_to_delete[0], list):
-        ids_to_delete = ids_to_delete[0]
+    # Queued writes for this scope must land first, or they would survive the delete
+    _await_writes()
 
-    if not ids_to_delete:
+    # The index knows the count without touching the vector store
+    deleted = _index.count(clean_region, clean_location, mode, context)
+    if not deleted:
+        # The index may have drifted from the store (e.g. a failed index write)
+        deleted = sum(
+            len(collection.get(where=where, include=[])["ids"])
+            for collection in _router.for_read(clean_region, clean_location)
+        )
+        if deleted:
+            print(f"⚠️ Memory index missed {deleted} memories for {scope}; deleting them from the store.")
+    if not deleted:
         return (
-            f"ℹ️ No memories found for {clean_region} / {clean_location} "
+            f"ℹ️ No memories found for {scope} "
             f"(mode={mode or 'ALL'}, context={context or 'ALL'})."
         )
 
-    collection.delete(ids=ids_to_delete)
+    if mode or context or not _router.drop(clean_region, clean_location):
+        for collection in _router.for_read(clean_region, clean_location):
+            collection.delete(where=where)
+    _index.remove_scope(clean_region, clean_location, mode, context)
     return (
-        f"🧹 Deleted {len(ids_to_delete)} memories for {clean_region} / {clean_location} "
+        f"🧹 Deleted {deleted} memories for {scope} "
         f"(mode={mode or 'ALL'}, context={context or 'ALL'})."
     )
 
+
+def clear_all_memories() -> int:
+    """
+    Soft reset: delete every memory in the collection (the store itself stays).
+    Returns how many memories were removed.
+    """
+    _await_writes()
+    deleted = _router.count()
+    if _router.partitioned:
+        _router.drop_all()
+    elif deleted:
+        # Chroma needs a filter for bulk deletes; $ne on a sentinel matches every record
+        for collection in _router.all():
+            collection.delete(where={"region": {"$ne": "__echoatlas_no_region__"}})
+    _index.rebuild([])
+    return deleted
+
+
 def list_all_regions() -> list[str]:
     """
     Return all distinct regions currently stored.
     Used by the Memory Management section in app.py.
+
+    Answered from the scope counters in the memory index, so the cost depends
+    on the number of distinct scopes, not on how many memories are stored.
+    """
+    _await_writes()
+    return _index.regions()
+
+
+def list_locations(region: str) -> list[str]:
+    """Return the distinct cities/locations with stored memories for a region."""
+    _await_writes()
+    return _index.locations(_canonical(region))
+
+
+def memory_scope_stats(region: str | None = None) -> list[dict]:
+    """
+    Per-scope memory counts for the memory management page:
+    [{"region", "location", "mode", "context", "memory_count", "occurrences", "last_timestamp"}, ...]
+    occurrences counts repeats folded in by store-time dedupe, and
+    last_timestamp moves with them.
     """
-    raw = _collection.get()
-    metas = _normalize_metadatas(raw.get("metadatas", []))
-    regions = {_clean(m.get("region", "Unknown")) for m in metas}
-    return sorted(r for r in regions if r)
+    _await_writes()
+    return _index.scopes(_canonical(region) if region else None)
@@ -0,0 +1,318 @@
+import datetime
+import json
+import os
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Callable
+
+from openai import OpenAI
+
+from utils.context_packer import ContextPacker, truncate_tokens
+
+# Memories not seen for this many days are folded into per-scope digests
+COMPACTION_MIN_AGE_DAYS = float(os.getenv("ECHOATLAS_COMPACTION_MIN_AGE_DAYS", "90"))
+# Scopes with fewer old memories than this are left alone (nothing to gain)
+COMPACTION_MIN_GROUP = int(os.getenv("ECHOATLAS_COMPACTION_MIN_GROUP", "3"))
+# Background compaction interval; 0 disables the job (run compact_memories.py instead)
+COMPACTION_INTERVAL_HOURS = float(os.getenv("ECHOATLAS_COMPACTION_INTERVAL_HOURS", "0"))
+
+DIGEST_KIND = "digest"
+DIGEST_MAX_QUESTIONS = 8
+DIGEST_MAX_ANSWER_TOKENS = 400
+DIGEST_LLM_MODEL = "gpt-4o-mini"
+# Token budget for the memories shown to the LLM summarizer
+DIGEST_LLM_MEMORY_TOKENS = 1500
+
+# Scope fields a digest is built per (one digest per scope per run)
+_SCOPE_FIELDS = ("region", "location", "mode", "context")
+
+# (memories, extractive digest metadata) -> digest answer text
+Summarizer = Callable[[list[dict], dict], str]
+
+
+def compaction_cutoff(min_age_days: float = COMPACTION_MIN_AGE_DAYS, now: datetime.datetime | None = None) -> str:
+    """Timestamp before which memories are old enough to compact (naive UTC isoformat)."""
+    now = now or datetime.datetime.utcnow()
+    return (now - datetime.timedelta(days=min_age_days)).isoformat()
+
+
+def is_compactable(memory: dict, cutoff: str) -> bool:
+    """A memory is old once neither it nor any deduplicated repeat is newer than `cutoff`."""
+    return (memory.get("last_seen") or memory.get("timestamp", "")) < cutoff
+
+
+def digest_questions(memory: dict) -> list[str]:
+    """Questions a memory stands for (a digest keeps one per line)."""
+    phrase = memory.get("phrase", "")
+    if memory.get("kind") == DIGEST_KIND:
+        return [line for line in phrase.splitlines() if line.strip()]
+    return [phrase] if phrase.strip() else []
+
+
+def _weighted_top(values: list[tuple[str, float]], n: int) -> list[tuple[str, float]]:
+    """Most common values by summed weight, ties broken by first appearance."""
+    totals: Counter = Counter()
+    first: dict[str, str] = {}
+    for value, weight in values:
+        value = (value or "").strip()
+        if not value:
+            continue
+        key = " ".join(value.casefold().split())
+        first.setdefault(key, value)
+        totals[key] += weight
+    order = {key: i for i, key in enumerate(first)}
+    ranked = sorted(totals, key=lambda key: (-totals[key], order[key]))
+    return [(first[key], totals[key]) for key in ranked[:n]]
+
+
+def _first_sentence(text: str) -> str:
+    text = " ".join((text or "").split())
+    for end in (". ", "! ", "? "):
+        if end in text:
+            return text.split(end, 1)[0] + end.strip()
+    return text
+
+
+def build_digest(
+    memories: list[dict],
+    summarize: Summarizer | None = None,
+    max_questions: int = DIGEST_MAX_QUESTIONS,
+    max_answer_tokens: int = DIGEST_MAX_ANSWER_TOKENS,
+) -> dict:
+    """
+    Metadata of one digest memory standing for `memories` (all of one scope).
+
+    Extractive: the most asked questions become the phrase (one per line),
+    the most common tone, gesture and tip are kept as the digest's own, and
+    the answer lists each top question with the start of its latest answer
+    plus the other tips seen. `summarize`, if given, writes the answer
+    instead (e.g. an LLM call); if it fails the extractive answer is kept.
+    """
+    if not memories:
+        raise ValueError("Cannot build a digest of no memories")
+    newest_first = sorted(memories, key=lambda m: m.get("timestamp", ""), reverse=True)
+
+    def weight(memory: dict) -> int:
+        return int(memory.get("count", 1) or 1)
+
+    questions: list[tuple[str, float]] = []
+    latest_answer: dict[str, str] = {}
+    for memory in newest_first:
+        asked = digest_questions(memory)
+        for question in asked:
+            questions.append((question, weight(memory) / len(asked)))
+            if memory.get("kind") != DIGEST_KIND and memory.get("answer"):
+                latest_answer.setdefault(" ".join(question.casefold().split()), memory["answer"])
+    top_questions = [q for q, _ in _weighted_top(questions, max_questions)]
+
+    tones = _weighted_top([(m.get("tone", ""), weight(m)) for m in newest_first], 3)
+    gestures = _weighted_top([(m.get("gesture", ""), weight(m)) for m in newest_first], 1)
+    tips = _weighted_top([(m.get("custom", ""), weight(m)) for m in newest_first], 4)
+
+    timestamps = [m.get("timestamp", "") for m in memories if m.get("timestamp")]
+    first_seen = min((m.get("first_seen") or m["timestamp"] for m in memories if m.get("timestamp")), default="")
+    newest = max(timestamps, default="")
+    folded = sum(int(m.get("digest_of", 1) or 1) for m in memories)
+
+    lines = [f"Digest of {folded} conversations ({first_seen[:10]} → {newest[:10]})."]
+    if tones:
+        lines.append("Tones: " + ", ".join(f"{tone} ({count:g})" for tone, count in tones) + ".")
+    for question in top_questions:
+        answer = latest_answer.get(" ".join(question.casefold().split()))
+        lines.append(f"- {question}" + (f" → {_first_sentence(answer)}" if answer else ""))
+    for tip, _ in tips[1:]:
+        lines.append(f"- Tip: {tip}")
+
+    first = newest_first[0]
+    digest = {
+        **{field: first.get(field, "") for field in _SCOPE_FIELDS},
+        "field": "phrase",
+        "kind": DIGEST_KIND,
+        "phrase": "\n".join(top_questions),
+        "answer": truncate_tokens("\n".join(lines), max_answer_tokens),
+        "tone": tones[0][0] if tones else "Neutral",
+        "gesture": gestures[0][0] if gestures else "🤷",
+        "custom": tips[0][0] if tips else "No cultural insight available.",
+        "timestamp": newest,
+        "first_seen": first_seen,
+        "count": sum(weight(m) for m in memories),
+        "last_seen": max(m.get("last_seen") or m.get("timestamp", "") for m in memories),
+        "digest_of": folded,
+    }
+
+    if summarize is not None:
+        try:
+            summary = summarize(memories, digest)
+            if summary and summary.strip():
+                digest["answer"] = truncate_tokens(summary.strip(), max_answer_tokens)
+        except Exception as e:
+            print(f"⚠️ Digest summarizer failed, keeping extractive digest: {e}")
+    return digest
+
+
+_client: OpenAI | None = None
+_init_lock = threading.Lock()
+
+
+def _get_client() -> OpenAI:
+    global _client
+    with _init_lock:
+        if _client is None:
+            _client = OpenAI()
+        return _client
+
+
+def llm_summarizer(memories: list[dict], digest: dict) -> str:
+    """Summarizer for build_digest: an LLM-written digest answer (tones, gestures, tips)."""
+    packed = ContextPacker(budget_tokens=DIGEST_LLM_MEMORY_TOKENS, max_field_tokens=60).pack(
+        memories,
+        lambda m: (
+            f"- Q: {m.get('phrase','')} | A: {m.get('answer','')} | Tone: {m.get('tone','')} | "
+            f"Gesture: {m.get('gesture','')} | Tip: {m.get('custom','')}"
+        ),
+    )
+    prompt = f"""
+Summarize these past visitor conversations in {digest.get('location') or digest.get('region')}
+({digest.get('region')}) into a short digest for future visitors.
+
+{packed['text']}
+
+Write at most 8 bullet points covering the main questions asked, the
+recommended tone and gestures, and the most useful cultural tips. Plain text only.
+"""
+    completion = _get_client().chat.completions.create(
+        model=DIGEST_LLM_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=0.2,
+    )
+    return completion.choices[0].message.content or ""
+
+
+def digest_id(memory_ids: list[str]) -> str:
+    """Id of the digest of these memories (the same memories always give the same id)."""
+    return f"digest-{uuid.uuid5(uuid.NAMESPACE_URL, '|'.join(sorted(memory_ids)))}"
+
+
+def estimate_bytes(memory: dict, dimension: int) -> int:
+    """Approximate storage of one memory: metadata JSON + document + float32 vector."""
+    metadata = {k: v for k, v in memory.items() if k != "id"}
+    return (
+        len(json.dumps(metadata, ensure_ascii=False).encode("utf-8"))
+        + len((memory.get("phrase") or "").encode("utf-8"))
+        + dimension * 4
+    )
+
+
+def plan_compaction(
+    memories: list[dict],
+    cutoff: str,
+    dimension: int,
+    min_group: int = COMPACTION_MIN_GROUP,
+    summarize: Summarizer | None = None,
+) -> list[dict]:
+    """
+    Group the old memories (each with an "id") by full scope and build one
+    digest per scope that has at least `min_group` of them.
+
+    Returns [{"scope", "ids", "digest_id", "digest", "bytes_before", "bytes_after"}, ...].
+    """
+    groups: dict[tuple, list[dict]] = {}
+    for memory in memories:
+        if is_compactable(memory, cutoff):
+            groups.setdefault(tuple(memory.get(f) or "" for f in _SCOPE_FIELDS), []).append(memory)
+
+    plans = []
+    for scope, group in sorted(groups.items()):
+        if len(group) < max(min_group, 2):
+            continue
+        ids = [m["id"] for m in group]
+        digest = build_digest(group, summarize=summarize)
+        plans.append(
+            {
+                "scope": dict(zip(_SCOPE_FIELDS, scope)),
+                "ids": ids,
+                "digest_id": digest_id(ids),
+                "digest": digest,
+                "bytes_before": sum(estimate_bytes(m, dimension) for m in group),
+                "bytes_after": estimate_bytes(digest, dimension),
+            }
+        )
+    return plans
+
+
+def compaction_report(plans: list[dict], dry_run: bool, cutoff: str) -> dict:
+    """Per-scope and total rows / bytes a compaction reclaims (or would, on a dry run)."""
+    scopes = [
+        {
+            **plan["scope"],
+            "memories_folded": len(plan["ids"]),
+            "rows_reclaimed": len(plan["ids"]) - 1,
+            "bytes_reclaimed": plan["bytes_before"] - plan["bytes_after"],
+        }
+        for plan in plans
+    ]
+    return {
+        "dry_run": dry_run,
+        "cutoff": cutoff,
+        "scopes": scopes,
+        "memories_folded": sum(s["memories_folded"] for s in scopes),
+        "digests": len(scopes),
+        "rows_reclaimed": sum(s["rows_reclaimed"] for s in scopes),
+        "bytes_reclaimed": sum(s["bytes_reclaimed"] for s in scopes),
+    }
+
+
+class CompactionJob:
+    """
+    Runs `run` (a compaction pass returning its report) every
+    `interval_seconds` on a daemon thread. The first pass runs one interval
+    after start(), so app startup is not slowed down.
+    """
+
+    def __init__(self, run: Callable[[], dict], interval_seconds: float):
+        self._run = run
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._stats = {"runs": 0, "last_run": None, "last_report": None, "error": None}
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def run_once(self) -> dict | None:
+        try:
+            report = self._run()
+            error = None
+        except Exception as e:
+            print(f"⚠️ Memory compaction failed: {e}")
+            report, error = None, str(e)
+        with self._lock:
+            self._stats["runs"] += 1
+            self._stats["last_run"] = time.time()
+            self._stats["error"] = error
+            if report is not None:
+                self._stats["last_report"] = {k: v for k, v in report.items() if k != "scopes"}
+        return report
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="echoatlas-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"interval_seconds": self.interval_seconds, "running": self.running, **self._stats}
@@ -0,0 +1,518 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Iterable
+
+
+_UPSERT_SQL = (
+    "INSERT INTO memories (id, region, location, mode, context, timestamp, phrase, answer, count, last_seen) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (id) DO UPDATE SET region = excluded.region, location = excluded.location, "
+    "mode = excluded.mode, context = excluded.context, timestamp = excluded.timestamp, "
+    "phrase = excluded.phrase, answer = excluded.answer, count = excluded.count, "
+    "last_seen = excluded.last_seen"
+)
+
+# Per-scope counters kept current by triggers on `memories`. occurrences sums
+# the memories' counts (repeats folded in by store-time dedupe); last_timestamp
+# is the latest activity, i.e. a new memory or a repeat of an existing one.
+_SCOPE_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_memories_insert AFTER INSERT ON memories
+BEGIN
+    INSERT INTO scopes (region, location, mode, context, memory_count, occurrences, last_timestamp)
+    VALUES (NEW.region, NEW.location, NEW.mode, NEW.context, 1, NEW.count, MAX(NEW.timestamp, NEW.last_seen))
+    ON CONFLICT (region, location, mode, context) DO UPDATE SET
+        memory_count = memory_count + 1,
+        occurrences = occurrences + excluded.occurrences,
+        last_timestamp = MAX(last_timestamp, excluded.last_timestamp);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memories_delete AFTER DELETE ON memories
+BEGIN
+    UPDATE scopes SET memory_count = memory_count - 1, occurrences = occurrences - OLD.count
+        WHERE region = OLD.region AND location = OLD.location
+          AND mode = OLD.mode AND context = OLD.context;
+    DELETE FROM scopes
+        WHERE region = OLD.region AND location = OLD.location
+          AND mode = OLD.mode AND context = OLD.context AND memory_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memories_update
+AFTER UPDATE OF region, location, mode, context, timestamp, count, last_seen ON memories
+BEGIN
+    UPDATE scopes SET memory_count = memory_count - 1, occurrences = occurrences - OLD.count
+        WHERE region = OLD.region AND location = OLD.location
+          AND mode = OLD.mode AND context = OLD.context;
+    DELETE FROM scopes
+        WHERE region = OLD.region AND location = OLD.location
+          AND mode = OLD.mode AND context = OLD.context AND memory_count <= 0;
+    INSERT INTO scopes (region, location, mode, context, memory_count, occurrences, last_timestamp)
+    VALUES (NEW.region, NEW.location, NEW.mode, NEW.context, 1, NEW.count, MAX(NEW.timestamp, NEW.last_seen))
+    ON CONFLICT (region, location, mode, context) DO UPDATE SET
+        memory_count = memory_count + 1,
+        occurrences = occurrences + excluded.occurrences,
+        last_timestamp = MAX(last_timestamp, excluded.last_timestamp);
+END;
+"""
+
+# Full-text index over memories.phrase / memories.answer (external content, so the
+# text is stored once). Rowids follow memories' rowids; rebuild() re-derives it.
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS memory_text USING fts5(
+    phrase, answer,
+    content = 'memories', content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_text_insert AFTER INSERT ON memories
+BEGIN
+    INSERT INTO memory_text (rowid, phrase, answer) VALUES (NEW.rowid, NEW.phrase, NEW.answer);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_text_delete AFTER DELETE ON memories
+BEGIN
+    INSERT INTO memory_text (memory_text, rowid, phrase, answer)
+    VALUES ('delete', OLD.rowid, OLD.phrase, OLD.answer);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_memory_text_update AFTER UPDATE OF phrase, answer ON memories
+BEGIN
+    INSERT INTO memory_text (memory_text, rowid, phrase, answer)
+    VALUES ('delete', OLD.rowid, OLD.phrase, OLD.answer);
+    INSERT INTO memory_text (rowid, phrase, answer) VALUES (NEW.rowid, NEW.phrase, NEW.answer);
+END;
+"""
+
+# BM25 column weights: a match in the question counts more than one in the answer
+_BM25_WEIGHTS = (2.0, 1.0)
+
+
+def search_terms(text: str) -> list[str]:
+    """Words of a search query, as the full-text tokenizer sees them."""
+    return re.findall(r"\w+", (text or "").casefold())
+
+
+def reciprocal_rank_fusion(rankings: Iterable[list[str]], k: int = 60) -> dict[str, float]:
+    """
+    Fuse several best-first id rankings: each id scores sum(1 / (k + rank)).
+    Returns {id: fused score}; ids missing from a ranking just get nothing from it.
+    """
+    fused: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, memory_id in enumerate(ranking, start=1):
+            fused[memory_id] = fused.get(memory_id, 0.0) + 1.0 / (k + rank)
+    return fused
+
+
+class MemoryIndex:
+    """
+    SQLite sidecar index over the Chroma memory collection.
+
+    Chroma can filter by metadata but cannot sort, so "newest first" listings
+    used to pull a whole scope into Python. This index keeps one row per
+    memory (id, region, location, mode, context, timestamp) with a
+    (scope, timestamp) B-tree, so listings are keyset-paginated at the
+    storage layer and only the requested page is fetched from Chroma.
+
+    A second table, `scopes`, holds (region, location, mode, context) ->
+    memory_count / occurrences / last_timestamp. Triggers on `memories` keep
+    it current on every insert, update and delete (including dedupe bumps of
+    a memory's count and last_seen), so region/city listings and counts cost
+    O(distinct scopes) instead of a scan over every stored memory.
+
+    Each row also keeps the memory's phrase and answer, indexed by an FTS5
+    table (`memory_text`, kept in sync by triggers) for BM25 keyword search
+    without an embedding call.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS memories (
+                id        TEXT PRIMARY KEY,
+                region    TEXT NOT NULL,
+                location  TEXT NOT NULL,
+                mode      TEXT NOT NULL,
+                context   TEXT NOT NULL,
+                timestamp TEXT NOT NULL,
+                phrase    TEXT NOT NULL DEFAULT '',
+                answer    TEXT NOT NULL DEFAULT '',
+                count     INTEGER NOT NULL DEFAULT 1,
+                last_seen TEXT NOT NULL DEFAULT ''
+            );
+            CREATE INDEX IF NOT EXISTS idx_memories_region_location_ts
+                ON memories (region, location, timestamp DESC, id DESC);
+            CREATE INDEX IF NOT EXISTS idx_memories_region_ts
+                ON memories (region, timestamp DESC, id DESC);
+
+            CREATE TABLE IF NOT EXISTS scopes (
+                region         TEXT NOT NULL,
+                location       TEXT NOT NULL,
+                mode           TEXT NOT NULL,
+                context        TEXT NOT NULL,
+                memory_count   INTEGER NOT NULL DEFAULT 0,
+                occurrences    INTEGER NOT NULL DEFAULT 0,
+                last_timestamp TEXT NOT NULL DEFAULT '',
+                PRIMARY KEY (region, location, mode, context)
+            );
+            """
+        )
+        self._migrate()
+        self._conn.executescript(_SCOPE_TRIGGERS)
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """Bring index files written by older versions up to the current schema."""
+        # Set when rows predate the text or count columns: the owner must rebuild() from the store
+        self.stale = False
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Index files created before the scopes table existed: backfill it once
+            self._conn.execute("DELETE FROM scopes")
+            self._conn.execute(
+                """
+                INSERT INTO scopes (region, location, mode, context, memory_count, last_timestamp)
+                SELECT region, location, mode, context, COUNT(*), MAX(timestamp)
+                FROM memories GROUP BY region, location, mode, context
+                """
+            )
+            self._conn.execute("PRAGMA user_version = 1")
+        if version < 2:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(memories)")}
+            for column in ("phrase", "answer"):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE memories ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+            self._conn.executescript(_FTS_SCHEMA)
+            self._conn.execute("INSERT INTO memory_text (memory_text) VALUES ('rebuild')")
+            self.stale = not {"phrase", "answer"} <= columns and self._has_rows()
+            self._conn.execute("PRAGMA user_version = 2")
+        if version < 3:
+            for table, column, ddl in (
+                ("memories", "count", "INTEGER NOT NULL DEFAULT 1"),
+                ("memories", "last_seen", "TEXT NOT NULL DEFAULT ''"),
+                ("scopes", "occurrences", "INTEGER NOT NULL DEFAULT 0"),
+            ):
+                columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}")
+                    # Existing memories' counts live in the store only
+                    self.stale = self.stale or (table == "memories" and self._has_rows())
+            # Older triggers did not track counts; __init__ recreates them
+            for trigger in ("trg_memories_insert", "trg_memories_delete", "trg_memories_update"):
+                self._conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            self._conn.execute("UPDATE scopes SET occurrences = memory_count")
+            self._conn.execute("PRAGMA user_version = 3")
+
+    def _has_rows(self) -> bool:
+        return self._conn.execute("SELECT EXISTS (SELECT 1 FROM memories)").fetchone()[0] == 1
+
+    # ---------------------------------
+    # Helpers
+    # ---------------------------------
+    @staticmethod
+    def _scope_filter(
+        region: str | None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+    ) -> tuple[str, list]:
+        """SQL WHERE fragment with the same semantics as memory_agent._build_where."""
+        clauses, params = [], []
+        if region:
+            clauses.append("region = ?")
+            params.append(region)
+        if location:
+            clauses.append("location = ?")
+            params.append(location)
+        if mode:
+            clauses.append("mode = ?")
+            params.append(mode)
+        if context:
+            clauses.append("context = ?")
+            params.append(context)
+        return (" AND ".join(clauses) or "1 = 1"), params
+
+    @staticmethod
+    def _partition_filter(region: str | None, location: str | None) -> tuple[str, list]:
+        """
+        SQL WHERE fragment for the rows of one store partition: every row
+        (region None), a region (location None), or a region and exact
+        location ("" included, unlike _scope_filter).
+        """
+        if region is None:
+            return "1 = 1", []
+        if location is None:
+            return "region = ?", [region]
+        return "region = ? AND location = ?", [region, location]
+
+    @staticmethod
+    def _row(record: dict) -> tuple:
+        return (
+            record["id"],
+            record.get("region") or "",
+            record.get("location") or "",
+            record.get("mode") or "",
+            record.get("context") or "",
+            record.get("timestamp") or "",
+            record.get("phrase") or "",
+            record.get("answer") or "",
+            int(record.get("count") or 1),
+            record.get("last_seen") or "",
+        )
+
+    # ---------------------------------
+    # Writes
+    # ---------------------------------
+    def add(self, records: Iterable[dict]) -> None:
+        """Insert (or refresh) index rows for stored memories."""
+        rows = [self._row(r) for r in records]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                _UPSERT_SQL,
+                rows,
+            )
+            self._conn.commit()
+
+    def remove(self, ids: Iterable[str]) -> None:
+        ids = list(ids)
+        if not ids:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM memories WHERE id = ?", [(i,) for i in ids])
+            self._conn.commit()
+
+    def remove_scope(
+        self,
+        region: str | None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+    ) -> int:
+        """Drop every index row in a scope. Returns the number of rows removed."""
+        where, params = self._scope_filter(region, location, mode, context)
+        with self._lock:
+            removed = self._conn.execute(f"DELETE FROM memories WHERE {where}", params).rowcount
+            self._conn.commit()
+        return removed
+
+    def rebuild(
+        self,
+        records: Iterable[dict],
+        region: str | None = None,
+        location: str | None = None,
+    ) -> int:
+        """
+        Replace the whole index, or the rows of one store partition (see
+        _partition_filter), with the given records. Returns the row count.
+        """
+        rows = [self._row(r) for r in records]
+        where, params = self._partition_filter(region, location)
+        with self._lock:
+            self._conn.execute(f"DELETE FROM memories WHERE {where}", params)
+            if region is None:
+                self._conn.execute("DELETE FROM scopes")
+            self._conn.executemany(
+                _UPSERT_SQL,
+                rows,
+            )
+            if region is None:
+                self._conn.execute("INSERT INTO memory_text (memory_text) VALUES ('rebuild')")
+                self.stale = False
+            self._conn.commit()
+        return len(rows)
+
+    # ---------------------------------
+    # Reads
+    # ---------------------------------
+    def count(
+        self,
+        region: str | None = None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+    ) -> int:
+        """Number of memories in a scope, summed from the per-scope counters."""
+        where, params = self._scope_filter(region, location, mode, context)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COALESCE(SUM(memory_count), 0) FROM scopes WHERE {where}", params
+            ).fetchone()[0]
+
+    def partition_count(self, region: str | None = None, location: str | None = None) -> int:
+        """Number of memories in one store partition (see _partition_filter), from the per-scope counters."""
+        where, params = self._partition_filter(region, location)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COALESCE(SUM(memory_count), 0) FROM scopes WHERE {where}", params
+            ).fetchone()[0]
+
+    def occurrences(
+        self,
+        region: str | None = None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+    ) -> int:
+        """Memories plus the repeats folded into them, summed from the per-scope counters."""
+        where, params = self._scope_filter(region, location, mode, context)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COALESCE(SUM(occurrences), 0) FROM scopes WHERE {where}", params
+            ).fetchone()[0]
+
+    def scopes(self, region: str | None = None, location: str | None = None) -> list[dict]:
+        """
+        Per-scope counters: region, location, mode, context, memory_count,
+        occurrences (memory_count plus folded repeats) and last_timestamp
+        (newest memory or repeat).
+        """
+        where, params = self._scope_filter(region, location)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT region, location, mode, context, memory_count, occurrences, last_timestamp "
+                f"FROM scopes WHERE {where} ORDER BY region, location, mode, context",
+                params,
+            ).fetchall()
+        keys = ("region", "location", "mode", "context", "memory_count", "occurrences", "last_timestamp")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def regions(self) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT region FROM scopes WHERE region != '' ORDER BY region"
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def locations(self, region: str) -> list[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT location FROM scopes WHERE region = ? AND location != '' "
+                "ORDER BY location",
+                (region,),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def page(
+        self,
+        region: str | None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+        limit: int = 20,
+        cursor: str | None = None,
+        offset: int = 0,
+        after: str | None = None,
+    ) -> tuple[list[str], str | None]:
+        """
+        Return up to `limit` memory ids for the scope, newest first, plus the
+        cursor for the next page (None when there are no more rows).
+
+        `cursor` is the opaque value returned by the previous page; `offset`
+        is an alternative for callers that need random access. `after` (a
+        cursor, e.g. from latest_cursor()) restricts the page to rows newer
+        than that point.
+        """
+        where, params = self._scope_filter(region, location, mode, context)
+        if cursor:
+            ts, _, last_id = cursor.rpartition("|")
+            where += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            params += [ts, ts, last_id]
+        if after:
+            ts, _, last_id = after.rpartition("|")
+            where += " AND (timestamp > ? OR (timestamp = ? AND id > ?))"
+            params += [ts, ts, last_id]
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, timestamp FROM memories WHERE {where} "
+                "ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+                params + [limit + 1, max(offset, 0)],
+            ).fetchall()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1][1]}|{rows[-1][0]}" if has_more and rows else None
+        return [r[0] for r in rows], next_cursor
+
+    def search(
+        self,
+        query: str,
+        region: str | None = None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+        limit: int = 20,
+        match_all: bool = False,
+        phrase_only: bool = False,
+    ) -> list[tuple[str, float]]:
+        """
+        BM25 keyword search in a scope: [(memory id, score)] best first
+        (higher is better). Every query word also matches as a prefix
+        ("subw" finds "subway"). By default any word may match, in the phrase
+        or the answer; `match_all` requires every word and `phrase_only`
+        searches the phrase (the user's question) only.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+        expression = (" AND " if match_all else " OR ").join(f'"{term}"*' for term in terms)
+        if phrase_only:
+            expression = f"phrase : ({expression})"
+        where, params = self._scope_filter(region, location, mode, context)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT memories.id, bm25(memory_text, {_BM25_WEIGHTS[0]}, {_BM25_WEIGHTS[1]}) AS score "
+                "FROM memory_text JOIN memories ON memories.rowid = memory_text.rowid "
+                f"WHERE memory_text MATCH ? AND {where} ORDER BY score LIMIT ?",
+                [expression] + params + [limit],
+            ).fetchall()
+        # SQLite's bm25() is lower-is-better (negative); flip it
+        return [(memory_id, -score) for memory_id, score in rows]
+
+    def ids_before(
+        self,
+        region: str | None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+        before: str = "",
+    ) -> list[str]:
+        """Ids of the memories in a scope stored before `before` (a timestamp), oldest first."""
+        where, params = self._scope_filter(region, location, mode, context)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id FROM memories WHERE {where} AND timestamp < ? ORDER BY timestamp, id",
+                params + [before],
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def latest_cursor(
+        self,
+        region: str | None,
+        location: str | None = None,
+        mode: str | None = None,
+        context: str | None = None,
+    ) -> str | None:
+        """Cursor pointing at the newest memory in the scope (None if empty)."""
+        where, params = self._scope_filter(region, location, mode, context)
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT id, timestamp FROM memories WHERE {where} "
+                "ORDER BY timestamp DESC, id DESC LIMIT 1",
+                params,
+            ).fetchone()
+        return f"{row[1]}|{row[0]}" if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
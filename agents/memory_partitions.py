@@ -0,0 +1,201 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from chromadb.errors import NotFoundError
+
+# "none": one collection for everything; "region": one collection per region;
+# "location": one collection per (region, location)
+PARTITION_LAYOUTS = ("none", "region", "location")
+
+
+def partition_key(layout: str, region: str, location: str | None = None) -> str:
+    """Partition a memory with this (cleaned) region and location is stored in."""
+    if layout == "none":
+        return ""
+    if layout == "region":
+        return region
+    return f"{region}|{location or ''}"
+
+
+def partition_name(prefix: str, key: str) -> str:
+    """Chroma collection name for a partition (names only allow [a-zA-Z0-9._-])."""
+    if not key:
+        return prefix
+    return f"{prefix}.{hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]}"
+
+
+class CollectionRouter:
+    """
+    Routes memory scopes to Chroma collections.
+
+    With the "none" layout every scope maps to the single `prefix`
+    collection. With "region" / "location", each region (or region +
+    location) gets its own collection, so a query only searches the HNSW
+    index of its own scope. Collection handles are opened lazily (every
+    open, including those made by all(), runs `on_open`), at most
+    `max_open` are kept, and handles unused for `idle_seconds` are dropped.
+
+    Dropping a handle does not unload the partition's HNSW index: the Rust
+    backend of chromadb 1.x keeps loaded indexes in its own LRU, bounded by
+    a count (the open-file limit / 5). Index memory is therefore bounded by
+    Chroma, not by `max_open`.
+
+    Read paths never create collections: a scope nobody wrote to has no
+    partition and simply returns nothing.
+    """
+
+    def __init__(
+        self,
+        client,
+        prefix: str,
+        layout: str = "none",
+        embedding_function=None,
+        metadata: dict | None = None,
+        on_open: Callable[[object], None] | None = None,
+        locations: Callable[[str], list[str]] | None = None,
+        max_open: int = 64,
+        idle_seconds: float = 600.0,
+    ):
+        if layout not in PARTITION_LAYOUTS:
+            raise ValueError(
+                f"Unknown memory partitioning '{layout}' (expected one of: {', '.join(PARTITION_LAYOUTS)})"
+            )
+        self.client = client
+        self.prefix = prefix
+        self.layout = layout
+        self.embedding_function = embedding_function
+        self.metadata = dict(metadata or {})
+        self.on_open = on_open
+        self.locations = locations or (lambda region: [])
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self._lock = threading.Lock()
+        self._open: OrderedDict[str, tuple[object, float]] = OrderedDict()
+        self._stats = {"opened": 0, "evicted": 0}
+
+    @property
+    def partitioned(self) -> bool:
+        return self.layout != "none"
+
+    # ---------------------------------
+    # Handle cache (caller holds _lock)
+    # ---------------------------------
+    def _evict(self, now: float) -> None:
+        while self._open:
+            name, (_, last_used) = next(iter(self._open.items()))
+            if len(self._open) <= self.max_open and now - last_used < self.idle_seconds:
+                break
+            del self._open[name]
+            self._stats["evicted"] += 1
+
+    def _handle(self, key: str, create: bool):
+        return self._open_named(partition_name(self.prefix, key), key, create)
+
+    def _open_named(self, name: str, key: str | None, create: bool):
+        """Cached handle for collection `name`, opened (and passed to on_open) if needed."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._open.pop(name, None)
+            if entry is None:
+                try:
+                    if create:
+                        collection = self.client.get_or_create_collection(
+                            name=name,
+                            embedding_function=self.embedding_function,
+                            metadata={**self.metadata, "memory_partition": key} if key else self.metadata,
+                        )
+                    else:
+                        collection = self.client.get_collection(
+                            name=name, embedding_function=self.embedding_function
+                        )
+                except NotFoundError:
+                    if create:
+                        raise
+                    return None
+                if self.on_open is not None:
+                    self.on_open(collection)
+                self._stats["opened"] += 1
+            else:
+                collection = entry[0]
+            self._open[name] = (collection, now)
+            self._evict(now)
+            return collection
+
+    def _forget(self, name: str) -> None:
+        with self._lock:
+            self._open.pop(name, None)
+
+    # ---------------------------------
+    # Public API
+    # ---------------------------------
+    def for_write(self, region: str, location: str):
+        """Collection a new memory of (region, location) goes to (created if needed)."""
+        return self._handle(partition_key(self.layout, region, location), create=True)
+
+    def partition_keys(self, region: str, location: str | None = None) -> list[str]:
+        """Partitions holding a (region, optional location) scope."""
+        if self.layout == "location" and not location:
+            # Region-wide scope: every location partition of the region
+            return [partition_key(self.layout, region, loc) for loc in ["", *self.locations(region)]]
+        return [partition_key(self.layout, region, location)]
+
+    def for_read(self, region: str, location: str | None = None) -> list:
+        """Existing collections holding a scope (only its own partitions)."""
+        collections = [self._handle(key, create=False) for key in self.partition_keys(region, location)]
+        return [c for c in collections if c is not None]
+
+    def names(self) -> list[str]:
+        """Collection names of every existing partition (partitioned layouts; nothing is opened)."""
+        names = [getattr(c, "name", c) for c in self.client.list_collections()]
+        return [name for name in names if name.startswith(self.prefix + ".")]
+
+    def open(self, name: str):
+        """Existing partition collection by name (None if it does not exist)."""
+        return self._open_named(name, None, create=False)
+
+    def all(self) -> list:
+        """Every existing collection of this store (all partitions)."""
+        if not self.partitioned:
+            return [self._handle("", create=True)]
+        collections = [self.open(name) for name in self.names()]
+        # A partition dropped since it was listed opens as None
+        return [c for c in collections if c is not None]
+
+    def count(self) -> int:
+        return sum(c.count() for c in self.all())
+
+    def drop(self, region: str, location: str | None = None) -> bool:
+        """
+        Delete the partitions of a scope outright. Returns False (and deletes
+        nothing) unless the scope is exactly a set of whole partitions.
+        """
+        if self.layout == "none" or (self.layout == "region" and location):
+            return False
+        for key in self.partition_keys(region, location):
+            name = partition_name(self.prefix, key)
+            self._forget(name)
+            try:
+                self.client.delete_collection(name)
+            except NotFoundError:
+                pass
+        return True
+
+    def drop_all(self) -> None:
+        """Delete every partition (partitioned layouts only)."""
+        if not self.partitioned:
+            return
+        for collection in self.all():
+            self._forget(collection.name)
+            self.client.delete_collection(collection.name)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "layout": self.layout,
+                "open": len(self._open),
+                "max_open": self.max_open,
+                **self._stats,
+            }
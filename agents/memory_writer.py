@@ -0,0 +1,240 @@
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable
+
+
+class WriteBehindQueue:
+    """
+    Batched, asynchronous write-behind queue for memory ingestion.
+
+    submit() appends the record to an append-only journal (fsync'd) and hands
+    it to a background worker, so callers return immediately. The worker
+    groups pending records into batches of up to `max_batch_size`, waiting at
+    most `max_latency` seconds after the first record, and passes each batch
+    to `commit_batch` (one embedding request + one collection write).
+
+    Committed ids are acknowledged in the journal. On startup any record that
+    was journaled but never acknowledged (e.g. after a crash, or a batch still
+    failing at shutdown) is replayed, so `commit_batch` must be idempotent
+    (upsert by id). The journal is only reset once every put in it is acked.
+
+    A batch that still fails after `max_retries` retries is moved to the
+    dead-letter file (same "put" lines as the journal, so it can be appended
+    back to the journal to retry) and acknowledged, so one bad batch cannot
+    block the queue. `failing` stays True from the first failed attempt until
+    a batch commits again; readers use it to stop waiting on flushes.
+    """
+
+    def __init__(
+        self,
+        commit_batch: Callable[[list[dict]], None],
+        journal_path: str,
+        max_batch_size: int = 32,
+        max_latency: float = 0.5,
+        retry_backoff: float = 1.0,
+        max_retry_backoff: float = 30.0,
+        max_retries: int = 5,
+        dead_letter_path: str | None = None,
+    ):
+        self.commit_batch = commit_batch
+        self.journal_path = journal_path
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.max_retries = max_retries
+        self.dead_letter_path = dead_letter_path or journal_path + ".dead"
+
+        self._queue: queue.Queue[dict] = queue.Queue()
+        self._journal_lock = threading.Lock()
+        # Ids journaled as "put" without an "ack" yet (guarded by _journal_lock)
+        self._unacked: set[str] = set()
+        self._pending = 0
+        self._pending_cv = threading.Condition()
+        self._stop = threading.Event()
+        self._failing = False
+        self.stats = {
+            "submitted": 0,
+            "committed": 0,
+            "batches": 0,
+            "failures": 0,
+            "replayed": 0,
+            "dead_lettered": 0,
+        }
+
+        parent = os.path.dirname(journal_path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._replay_journal()
+
+        self._worker = threading.Thread(
+            target=self._run, name="echoatlas-memory-writer", daemon=True
+        )
+        self._worker.start()
+
+    # ---------------------------------
+    # Journal
+    # ---------------------------------
+    def _append_journal(self, entry: dict) -> None:
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _replay_journal(self) -> None:
+        """Re-queue journaled records that were never acknowledged."""
+        if not os.path.exists(self.journal_path):
+            return
+
+        unacked: dict[str, dict] = {}
+        with open(self.journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write; everything before it is intact
+                    continue
+                if entry.get("op") == "put":
+                    unacked[entry["record"]["id"]] = entry["record"]
+                elif entry.get("op") == "ack":
+                    for memory_id in entry.get("ids", []):
+                        unacked.pop(memory_id, None)
+
+        # Compact: keep only the records still owed to the store
+        tmp_path = self.journal_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in unacked.values():
+                f.write(json.dumps({"op": "put", "record": record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.journal_path)
+
+        if unacked:
+            print(f"♻️ Replaying {len(unacked)} journaled memory writes.")
+        for record in unacked.values():
+            self._pending += 1
+            self._queue.put(record)
+        self._unacked.update(unacked)
+        self.stats["replayed"] = len(unacked)
+
+    # ---------------------------------
+    # Worker
+    # ---------------------------------
+    def _next_batch(self) -> list[dict]:
+        try:
+            first = self._queue.get(timeout=0.25)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _dead_letter(self, batch: list[dict]) -> None:
+        """Park a batch that keeps failing in the dead-letter file (the caller acks it)."""
+        print(
+            f"☠️ Giving up on {len(batch)} memory writes after {self.max_retries} retries; "
+            f"moved to {self.dead_letter_path}."
+        )
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            for record in batch:
+                f.write(json.dumps({"op": "put", "record": record}, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.stats["dead_lettered"] += len(batch)
+
+    def _commit(self, batch: list[dict]) -> None:
+        backoff = self.retry_backoff
+        attempt = 0
+        while True:
+            try:
+                self.commit_batch(batch)
+                self._failing = False
+                break
+            except Exception as e:
+                self._failing = True
+                self.stats["failures"] += 1
+                print(f"⚠️ Memory write batch of {len(batch)} failed: {e}")
+                if self._stop.is_set():
+                    # Leave the records in the journal; they are replayed on next start
+                    print("⚠️ Shutting down with unwritten memories; they stay journaled.")
+                    self._mark_done(len(batch))
+                    return
+                if attempt >= self.max_retries:
+                    self._dead_letter(batch)
+                    break
+                attempt += 1
+                # Wakes early on close(), which then takes the shutdown path above
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, self.max_retry_backoff)
+
+        with self._journal_lock:
+            ids = [r["id"] for r in batch]
+            self._append_journal({"op": "ack", "ids": ids})
+            self._unacked.difference_update(ids)
+            if not self._failing:
+                self.stats["committed"] += len(batch)
+                self.stats["batches"] += 1
+            self._mark_done(len(batch))
+            if not self._unacked:
+                # Every journaled put is in the store or dead-lettered: reset the journal
+                open(self.journal_path, "w", encoding="utf-8").close()
+
+    def _mark_done(self, n: int) -> int:
+        with self._pending_cv:
+            self._pending -= n
+            self._pending_cv.notify_all()
+            return self._pending
+
+    def _run(self) -> None:
+        while not (self._stop.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._commit(batch)
+
+    # ---------------------------------
+    # Public API
+    # ---------------------------------
+    def submit(self, record: dict) -> None:
+        """Durably journal a record and queue it for the background worker."""
+        with self._journal_lock:
+            self._append_journal({"op": "put", "record": record})
+            self._unacked.add(record["id"])
+            with self._pending_cv:
+                self._pending += 1
+            self.stats["submitted"] += 1
+        self._queue.put(record)
+
+    @property
+    def failing(self) -> bool:
+        """True while writes are failing (since the last failed attempt, until a batch commits)."""
+        return self._failing
+
+    def pending(self) -> int:
+        with self._pending_cv:
+            return self._pending
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Block until every submitted record is committed. Returns False on timeout."""
+        with self._pending_cv:
+            return self._pending_cv.wait_for(lambda: self._pending <= 0, timeout=timeout)
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Flush-on-shutdown hook: drain the queue, then stop the worker."""
+        self.flush(timeout=timeout)
+        self._stop.set()
+        self._worker.join(timeout=timeout)
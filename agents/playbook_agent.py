@@ -0,0 +1,336 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from openai import OpenAI
+
+from agents.culture_profile_agent import fallback_culture_profile, get_culture_profile
+from agents.memory_agent import canonical_scope, list_memories, memory_watermark
+from utils.context_packer import ContextPacker, section_tokens
+
+PLAYBOOK_MODEL = "gpt-4o-mini"
+PLAYBOOK_STORE_PATH = os.path.join("memory_store", "playbooks.sqlite3")
+# Newest memories used for a full build, and the largest delta merged incrementally
+PLAYBOOK_MEMORY_LIMIT = 50
+# Token budget for the memory block of playbook prompts
+PLAYBOOK_MEMORY_TOKEN_BUDGET = int(os.getenv("ECHOATLAS_PLAYBOOK_MEMORY_TOKENS", "2000"))
+
+_memory_packer = ContextPacker(budget_tokens=PLAYBOOK_MEMORY_TOKEN_BUDGET, max_field_tokens=60)
+
+
+def playbook_fingerprint(memory_count: int, watermark: str | None, occurrences: int) -> str:
+    """
+    Fingerprint of the memories a playbook was built from: count, newest
+    memory and occurrences (so repeats folded in by dedupe change it too).
+    """
+    return hashlib.sha256(f"{memory_count}|{watermark or ''}|{occurrences}".encode("utf-8")).hexdigest()
+
+
+class PlaybookStore:
+    """
+    Persisted cultural playbooks, one per (region, city).
+
+    Each row keeps the playbook JSON plus the memory count and watermark
+    (cursor of the newest memory) it was built from, so callers can tell
+    whether it is current and which memories arrived since. Callers key it
+    on the canonical (region, city) the memories are stored under.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS playbooks (
+                region       TEXT NOT NULL,
+                location     TEXT NOT NULL,
+                playbook     TEXT NOT NULL,
+                fingerprint  TEXT NOT NULL,
+                memory_count INTEGER NOT NULL,
+                watermark    TEXT,
+                updated      REAL NOT NULL,
+                PRIMARY KEY (region, location)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, region: str, location: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT playbook, fingerprint, memory_count, watermark, updated "
+                "FROM playbooks WHERE region = ? AND location = ?",
+                (region, location),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "playbook": json.loads(row[0]),
+            "fingerprint": row[1],
+            "memory_count": row[2],
+            "watermark": row[3],
+            "updated": row[4],
+        }
+
+    def put(
+        self,
+        region: str,
+        location: str,
+        playbook: dict,
+        memory_count: int,
+        watermark: str | None,
+        occurrences: int,
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playbooks "
+                "(region, location, playbook, fingerprint, memory_count, watermark, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    region,
+                    location,
+                    json.dumps(playbook, ensure_ascii=False),
+                    playbook_fingerprint(memory_count, watermark, occurrences),
+                    memory_count,
+                    watermark,
+                    time.time(),
+                ),
+            )
+            self._conn.commit()
+
+    def delete(self, region: str, location: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM playbooks WHERE region = ? AND location = ?", (region, location)
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_client: OpenAI | None = None
+_store: PlaybookStore | None = None
+_init_lock = threading.Lock()
+
+
+def _get_client() -> OpenAI:
+    global _client
+    with _init_lock:
+        if _client is None:
+            _client = OpenAI()
+        return _client
+
+
+def get_playbook_store() -> PlaybookStore:
+    global _store
+    with _init_lock:
+        if _store is None:
+            _store = PlaybookStore(PLAYBOOK_STORE_PATH)
+        return _store
+
+
+def _memory_lines(mems: list[dict]) -> str:
+    """Memory bullet list for playbook prompts, packed into the token budget."""
+    return _memory_packer.pack(
+        mems,
+        lambda m: (
+            f"- Q: {m.get('phrase','')} | Tone: {m.get('tone','')} | "
+            f"Gesture: {m.get('gesture','')} | Tip: {m.get('custom','')}"
+        ),
+        empty_text="No prior interactions recorded.",
+    )["text"]
+
+
+def _complete_json(prompt: str, system: str) -> dict:
+    print(f"🧮 Playbook prompt tokens: {section_tokens({'system': system, 'prompt': prompt})}")
+    completion = _get_client().chat.completions.create(
+        model=PLAYBOOK_MODEL,
+        messages=[
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.4,
+    )
+    return json.loads(completion.choices[0].message.content)
+
+
+def _full_playbook(region: str, city: str, mems: list[dict]) -> dict:
+    """Synthesize the whole playbook from the base profile and memories."""
+    try:
+        base = get_culture_profile(region, city)
+    except Exception as e:
+        print(f"⚠️ Culture profile for playbook failed: {e}")
+        base = fallback_culture_profile(city)
+
+    memory_text = _memory_lines(mems)
+
+    prompt = f"""
+You are building a CULTURAL PLAYBOOK for visitors to the following location:
+
+Region/Country: {region}
+City/Area: {city}
+
+Base cultural profile:
+- Suggested tone: {base.get('tone','')}
+- Suggested gesture: {base.get('gesture','')}
+- Cultural tip: {base.get('custom','')}
+
+Observed past interactions (questions and responses):
+{memory_text}
+
+Synthesize a practical CULTURAL PLAYBOOK with this JSON structure ONLY:
+
+{{
+  "communication_style": {{
+    "tone_overview": "...",
+    "body_language_overview": "...",
+    "phrasing_examples": [
+       "Example polite request...",
+       "Example asking for help...",
+       "Example declining politely..."
+    ],
+    "taboo_topics_or_phrases": [
+       "...", "...", "..."
+    ],
+    "formal_vs_informal": "..."
+  }},
+  "etiquette": {{
+    "greetings": "...",
+    "public_behavior": "...",
+    "restaurant_etiquette": "...",
+    "business_etiquette": "...",
+    "gift_giving": "..."
+  }},
+  "do_and_donts": {{
+    "do": [
+      "Do this...",
+      "Do that..."
+    ],
+    "dont": [
+      "Don't do this...",
+      "Don't do that..."
+    ]
+  }},
+  "emerging_patterns_from_memory": {{
+    "common_questions": [
+       "People often ask about...",
+       "They frequently wonder about..."
+    ],
+    "common_mistakes": [
+       "Visitors sometimes make this mistake...",
+       "Another recurring mistake is..."
+    ],
+    "recommendations": [
+       "My main advice would be...",
+       "Another key recommendation is..."
+    ]
+  }},
+  "examples": [
+    {{
+      "scenario": "Ordering food at a restaurant",
+      "what_to_say": "...",
+      "how_to_act": "..."
+    }},
+    {{
+      "scenario": "Asking for directions",
+      "what_to_say": "...",
+      "how_to_act": "..."
+    }},
+    {{
+      "scenario": "Meeting someone for the first time",
+      "what_to_say": "...",
+      "how_to_act": "..."
+    }}
+  ]
+}}
+
+Return ONLY valid JSON. Do not include any commentary outside the JSON.
+    """.strip()
+
+    return _complete_json(prompt, "You output only well-structured JSON cultural playbooks.")
+
+
+def _updated_patterns(region: str, city: str, current: dict, new_mems: list[dict]) -> dict:
+    """Fold newly stored memories into the emerging_patterns_from_memory section only."""
+    prompt = f"""
+You maintain the "emerging_patterns_from_memory" section of a CULTURAL PLAYBOOK for:
+
+Region/Country: {region}
+City/Area: {city}
+
+Current section:
+{json.dumps(current, indent=2, ensure_ascii=False)}
+
+New interactions recorded since it was written:
+{_memory_lines(new_mems)}
+
+Update the section so it also reflects the new interactions. Keep existing
+points that still hold, merge duplicates, and keep each list short.
+Return ONLY valid JSON with exactly these keys:
+
+{{
+  "common_questions": ["..."],
+  "common_mistakes": ["..."],
+  "recommendations": ["..."]
+}}
+    """.strip()
+
+    return _complete_json(prompt, "You output only well-structured JSON playbook sections.")
+
+
+def get_cultural_playbook(region: str, city: str, force: bool = False) -> tuple[dict, str]:
+    """
+    Return (playbook, how) for (region, city), reusing the persisted playbook.
+
+    - "cached": no memory added, removed or repeated since the stored
+                playbook was built.
+    - "delta":  only new memories arrived; just emerging_patterns_from_memory
+                was updated from them.
+    - "full":   first build, `force`, deletions, repeats of existing
+                memories only, or too many new memories.
+
+    Raises if the LLM call fails (nothing is stored in that case).
+    """
+    store = get_playbook_store()
+    # "Tokyo" and "Tokyo " share their memories, so they share a playbook too
+    key = canonical_scope(region, city)
+    memory_count, watermark, occurrences = memory_watermark(region, city)
+    stored = None if force else store.get(*key)
+
+    if stored is not None:
+        if stored["fingerprint"] == playbook_fingerprint(memory_count, watermark, occurrences):
+            return stored["playbook"], "cached"
+
+        new_mems, _ = list_memories(
+            region, city, limit=PLAYBOOK_MEMORY_LIMIT + 1, after=stored["watermark"]
+        )
+        # Pure append (no deletions in between) and a delta we can fold in
+        if (
+            new_mems
+            and len(new_mems) <= PLAYBOOK_MEMORY_LIMIT
+            and stored["memory_count"] + len(new_mems) == memory_count
+        ):
+            playbook = dict(stored["playbook"])
+            playbook["emerging_patterns_from_memory"] = _updated_patterns(
+                region,
+                city,
+                playbook.get("emerging_patterns_from_memory", {}),
+                new_mems,
+            )
+            store.put(*key, playbook, memory_count, watermark, occurrences)
+            return playbook, "delta"
+
+    mems, _ = list_memories(region, city, limit=PLAYBOOK_MEMORY_LIMIT)
+    playbook = _full_playbook(region, city, mems)
+    store.put(*key, playbook, memory_count, watermark, occurrences)
+    return playbook, "full"
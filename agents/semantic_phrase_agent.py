@@ -1,32 +1,139 @@
-from sentence_transformers import SentenceTransformer, util
 import json
+import os
+import threading
 
-# Load embedding model
-model = SentenceTransformer("all-MiniLM-L6-v2")
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+REGION_DATA_PATH = "region_data.json"
+
+# Batched encoding runs on CPU; 0 threads keeps torch's default
+SEMANTIC_BATCH_SIZE = int(os.getenv("ECHOATLAS_SEMANTIC_BATCH_SIZE", "64"))
+SEMANTIC_NUM_THREADS = int(os.getenv("ECHOATLAS_SEMANTIC_NUM_THREADS", "0"))
+
+# Generic alternatives offered next to each location's own phrase
+ALT_PHRASES = [
+    "Can I get some noodles?",
+    "Where can I find a local dish?",
+    "Is there a food stall nearby?",
+    "I'd love to try something traditional",
+]
+
+# The model, region data and candidate matrices are loaded on first use and
+# shared process-wide, so importing this module (e.g. via langchain_tools)
+# costs nothing until the semantic tool actually runs.
+_model = None
+_region_data: dict | None = None
+_candidates: dict[str, tuple[list[str], np.ndarray]] = {}
+_init_lock = threading.Lock()
+
+
+def get_model():
+    """Process-wide SentenceTransformer, loaded on first use."""
+    global _model
+    with _init_lock:
+        if _model is None:
+            from sentence_transformers import SentenceTransformer
+
+            _model = SentenceTransformer(MODEL_NAME, device="cpu")
+        return _model
+
+
+def get_region_data() -> dict:
+    global _region_data
+    with _init_lock:
+        if _region_data is None:
+            with open(REGION_DATA_PATH, "r", encoding="utf-8") as f:
+                _region_data = json.load(f)
+        return _region_data
+
+
+def set_num_threads(num_threads: int) -> None:
+    """Limit the CPU threads torch uses for encoding (0 or less leaves the default)."""
+    if num_threads > 0:
+        import torch
+
+        torch.set_num_threads(num_threads)
+
+
+def encode(texts: list[str], batch_size: int = SEMANTIC_BATCH_SIZE) -> np.ndarray:
+    """Unit-normalized float32 embeddings, one row per text."""
+    vectors = get_model().encode(
+        texts,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+    )
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def candidate_matrix(location: str) -> tuple[list[str], np.ndarray]:
+    """
+    Candidate phrases for a location and their normalized embedding matrix,
+    encoded once per location and cached.
+    """
+    cached = _candidates.get(location)
+    if cached is None:
+        phrases = [get_region_data()[location]["phrase"], *ALT_PHRASES]
+        cached = (phrases, encode(phrases))
+        with _init_lock:
+            cached = _candidates.setdefault(location, cached)
+    return cached
 
-# Load region data
-with open("region_data.json", "r", encoding="utf-8") as f:
-    REGION_DATA = json.load(f)
 
 def semantic_translate(location, user_input):
     """
     Returns the most semantically appropriate phrase for the given location and user input.
     Uses cosine similarity to match meaning.
     """
-    if location not in REGION_DATA:
+    if location not in get_region_data():
         return "Location not supported"
 
-    base_phrase = REGION_DATA[location]["phrase"]
-    alt_phrases = [
-        base_phrase,
-        "Can I get some noodles?",
-        "Where can I find a local dish?",
-        "Is there a food stall nearby?",
-        "I'd love to try something traditional"
-    ]
-
-    # Embed all phrases + user input
-    embeddings = model.encode(alt_phrases + [user_input], convert_to_tensor=True)
-    scores = util.cos_sim(embeddings[-1], embeddings[:-1])
-    best_match = alt_phrases[scores.argmax()]
-    return best_match
+    phrases, matrix = candidate_matrix(location)
+
+    # Only the user input is encoded per call; rows are unit length, so one
+    # matrix-vector product gives every cosine similarity
+    scores = matrix @ encode([user_input])[0]
+    return phrases[int(scores.argmax())]
+
+
+def semantic_translate_batch(
+    pairs: list[tuple[str, str]],
+    top_k: int = 1,
+    batch_size: int = SEMANTIC_BATCH_SIZE,
+    num_threads: int = SEMANTIC_NUM_THREADS,
+) -> list[list[dict]]:
+    """
+    semantic_translate for many (location, user_input) pairs at once.
+
+    All user inputs are encoded in one batched pass, then scored per
+    location against its cached candidate matrix. Returns, in input order,
+    the top_k matches [{"phrase", "score"}] for each pair, best first
+    (an empty list for an unsupported location).
+    """
+    results: list[list[dict]] = [[] for _ in pairs]
+    region_data = get_region_data()
+
+    by_location: dict[str, list[int]] = {}
+    for i, (location, _) in enumerate(pairs):
+        if location in region_data:
+            by_location.setdefault(location, []).append(i)
+    if not by_location:
+        return results
+
+    set_num_threads(num_threads)
+    supported = [i for rows in by_location.values() for i in rows]
+    queries = encode([pairs[i][1] for i in supported], batch_size=batch_size)
+    row_of = {i: row for row, i in enumerate(supported)}
+
+    for location, indices in by_location.items():
+        phrases, matrix = candidate_matrix(location)
+        # (inputs x dim) @ (dim x candidates): every score for the location at once
+        scores = queries[[row_of[i] for i in indices]] @ matrix.T
+        k = min(top_k, len(phrases))
+        best = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+        for i, row_scores, row_best in zip(indices, scores, best):
+            results[i] = [
+                {"phrase": phrases[j], "score": float(row_scores[j])} for j in row_best
+            ]
+    return results
@@ -0,0 +1,239 @@
+import json
+import os
+import queue
+import threading
+from typing import Callable
+
+VOSK_MODEL_PATH = os.getenv("ECHOATLAS_VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
+SAMPLE_RATE = 16000
+# 8000 int16 samples = 0.5 s of audio per block
+BLOCK_SIZE = 8000
+# Idle recognizers kept for reuse; more concurrent mic users still get their own
+RECOGNIZER_POOL_SIZE = int(os.getenv("ECHOATLAS_RECOGNIZER_POOL_SIZE", "4"))
+
+_STOP = object()
+
+
+class RecognizerPool:
+    """
+    Reusable KaldiRecognizers, one checked out per listening session.
+
+    checkout() hands out an idle recognizer (or creates one), so concurrent
+    sessions never share a recognizer and their audio cannot interleave.
+    checkin() resets it and keeps up to `max_idle` for the next session.
+    """
+
+    def __init__(self, factory: Callable[[], object], max_idle: int = RECOGNIZER_POOL_SIZE):
+        self.factory = factory
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: list = []
+        self._stats = {"created": 0, "reused": 0, "in_use": 0}
+
+    def checkout(self):
+        with self._lock:
+            self._stats["in_use"] += 1
+            if self._idle:
+                self._stats["reused"] += 1
+                return self._idle.pop()
+            self._stats["created"] += 1
+        try:
+            return self.factory()
+        except BaseException:
+            with self._lock:
+                self._stats["created"] -= 1
+                self._stats["in_use"] -= 1
+            raise
+
+    def checkin(self, recognizer) -> None:
+        # Drop any half-decoded utterance before the next session gets it
+        recognizer.Reset()
+        with self._lock:
+            self._stats["in_use"] -= 1
+            if len(self._idle) < self.max_idle:
+                self._idle.append(recognizer)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "idle": len(self._idle)}
+
+
+# ---------------------------------
+# Shared Vosk model (loaded on first mic use)
+# ---------------------------------
+_vosk_model = None
+_pool: RecognizerPool | None = None
+_init_lock = threading.Lock()
+
+
+def get_vosk_model():
+    """Process-wide Vosk model, loaded the first time anyone uses the mic."""
+    global _vosk_model
+    with _init_lock:
+        if _vosk_model is None:
+            from vosk import Model
+
+            print(f"🎙️ Loading Vosk model from {VOSK_MODEL_PATH}...")
+            _vosk_model = Model(VOSK_MODEL_PATH)
+        return _vosk_model
+
+
+def _new_recognizer():
+    from vosk import KaldiRecognizer
+
+    return KaldiRecognizer(get_vosk_model(), SAMPLE_RATE)
+
+
+def get_recognizer_pool() -> RecognizerPool:
+    global _pool
+    with _init_lock:
+        if _pool is None:
+            _pool = RecognizerPool(_new_recognizer)
+        return _pool
+
+
+class Transcriber:
+    """
+    Speech recognition on a dedicated worker thread.
+
+    Audio blocks (from the sounddevice callback, or feed()) go into a queue;
+    the worker blocks on that queue, so it uses no CPU between blocks, and
+    feeds each block to a Vosk KaldiRecognizer as soon as it arrives. Final
+    and partial transcripts are published under a lock; the UI reads them
+    with snapshot(), or waits for the next change with wait().
+
+    Without an explicit `recognizer`, one is checked out of the shared pool
+    on start() and returned on stop().
+    """
+
+    def __init__(
+        self,
+        recognizer=None,
+        use_microphone: bool = True,
+        samplerate: int = SAMPLE_RATE,
+        blocksize: int = BLOCK_SIZE,
+    ):
+        self.recognizer = recognizer
+        self.use_microphone = use_microphone
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self._audio: queue.Queue = queue.Queue()
+        self._changed = threading.Condition()
+        self._finals: list[str] = []
+        self._partial = ""
+        self._version = 0
+        self._error: BaseException | None = None
+        self._stream = None
+        self._thread: threading.Thread | None = None
+        self._pooled = False
+
+    # ---------------------------------
+    # Audio input
+    # ---------------------------------
+    def feed(self, data: bytes) -> None:
+        """Queue one block of 16-bit mono PCM for recognition."""
+        self._audio.put(bytes(data))
+
+    def _audio_callback(self, indata, frames, time_info, status):
+        if status:
+            print(status, flush=True)
+        self.feed(indata)
+
+    # ---------------------------------
+    # Worker
+    # ---------------------------------
+    def _publish(self, final: str | None = None, partial: str = "") -> None:
+        with self._changed:
+            if final:
+                self._finals.append(final)
+            if final or partial != self._partial:
+                self._partial = partial
+                self._version += 1
+                self._changed.notify_all()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                data = self._audio.get()
+                if data is _STOP:
+                    break
+                if self.recognizer.AcceptWaveform(data):
+                    text = json.loads(self.recognizer.Result()).get("text", "")
+                    self._publish(final=text)
+                else:
+                    partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+                    self._publish(partial=partial)
+            # Whatever was still being decoded when recording stopped
+            self._publish(final=json.loads(self.recognizer.FinalResult()).get("text", ""))
+        except Exception as e:
+            print(f"⚠️ Speech recognition failed: {e}")
+            with self._changed:
+                self._error = e
+                self._version += 1
+                self._changed.notify_all()
+
+    # ---------------------------------
+    # Public API
+    # ---------------------------------
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def error(self) -> BaseException | None:
+        return self._error
+
+    def start(self) -> None:
+        """Start the worker (and the microphone stream, if use_microphone)."""
+        if self._thread is not None:
+            return
+        if self.recognizer is None:
+            self.recognizer = get_recognizer_pool().checkout()
+            self._pooled = True
+        if self.use_microphone:
+            try:
+                import sounddevice as sd
+
+                self._stream = sd.RawInputStream(
+                    samplerate=self.samplerate,
+                    blocksize=self.blocksize,
+                    dtype="int16",
+                    channels=1,
+                    callback=self._audio_callback,
+                )
+                self._stream.start()
+            except BaseException:
+                self._release()
+                raise
+        self._thread = threading.Thread(target=self._run, name="echoatlas-transcriber", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> str:
+        """Stop listening, finish decoding queued audio and return the final transcript."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
+        if self._thread is not None:
+            self._audio.put(_STOP)
+            self._thread.join(timeout)
+        if not self.running:
+            self._release()
+        return self.snapshot()[1]
+
+    def _release(self) -> None:
+        if self._pooled:
+            get_recognizer_pool().checkin(self.recognizer)
+            self.recognizer = None
+            self._pooled = False
+
+    def snapshot(self) -> tuple[int, str, str]:
+        """(version, final transcript so far, current partial)."""
+        with self._changed:
+            return self._version, " ".join(self._finals), self._partial
+
+    def wait(self, version: int, timeout: float | None = None) -> tuple[int, str, str]:
+        """Block until the transcript changes past `version` (or timeout), then snapshot()."""
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+        return self.snapshot()
@@ -7,45 +7,91 @@ from typing import Dict, Any, List
 from agents.memory_agent import (
     setup_memory_schema,
     store_interaction,
-    recall_similar,
     display_memory,
     delete_memories_for_region,
+    compact_memories,
+    compaction_job_stats,
+    embedding_backend_info,
+    embedding_cache_stats,
+    memory_partition_stats,
+    memory_writer_stats,
+    RecallScope,
+    list_memories,
+    search_memories,
+    count_memories,
+    memory_scope_stats,
+    seed_embedding_cache,
 )
-from langchain_runner import run_agent
+from langchain_runner import stream_agent
+from utils.fan_out import FanOut
+from agents.culture_profile_agent import (
+    get_culture_profile,
+    fallback_culture_profile,
+    culture_profile_cache_stats,
+)
+from agents.playbook_agent import get_cultural_playbook
+from agents.answer_cache import answer_cache
+from utils.prompt_library import PROMPT_LIBRARY, PROMPT_LIBRARY_CONTEXT, decode_vector, load_artifact
 
 # =========================================
 # EXTRA IMPORTS (MIC + LLM FOR CULTURE)
 # =========================================
-import queue
 import json
-import time
 import shutil
 from pathlib import Path
 
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
+from agents.transcriber import Transcriber, get_recognizer_pool
 
-from openai import OpenAI
+# ------------ Factory reset paths ------------
+RESET_FLAG_PATH = Path("reset_memory_store.flag")
+MEMORY_STORE_PATH = Path("memory_store")
 
-client = OpenAI()
+# Upper bound on the background culture-profile call in the Ask flow (seconds)
+CULTURE_PROFILE_TIMEOUT = 20.0
 
-# ------------ Vosk setup (adjust model path if needed) ------------
-VOSK_MODEL_PATH = "models/vosk-model-small-en-us-0.15"
+# Conversation Memory page size (pages are fetched lazily from the memory index)
+MEMORY_PAGE_SIZE = 20
 
-q: queue.Queue[bytes] = queue.Queue()
-vosk_model = Model(VOSK_MODEL_PATH)
-rec = KaldiRecognizer(vosk_model, 16000)
+# How often the live transcript fragment pulls from the recognizer thread (seconds)
+TRANSCRIPT_REFRESH_SECONDS = 0.25
 
-# ------------ Factory reset paths ------------
-RESET_FLAG_PATH = Path("reset_memory_store.flag")
-MEMORY_STORE_PATH = Path("memory_store")
+
+def start_listening() -> None:
+    """
+    Open the mic and start recognition on a background thread for this session.
+    The Vosk model is loaded on first use; each session gets its own pooled recognizer.
+    """
+    stop_listening()
+    transcriber = Transcriber()
+    try:
+        transcriber.start()
+    except Exception as e:
+        st.warning(f"Could not open the microphone: {e}")
+        return
+    st.session_state.transcriber = transcriber
+    st.session_state.recording = True
+
+
+def stop_listening() -> None:
+    """Stop this session's recognizer thread and keep its final transcript."""
+    transcriber = st.session_state.pop("transcriber", None)
+    if transcriber is not None:
+        st.session_state.transcript = transcriber.stop()
+    st.session_state.recording = False
 
 
-def audio_callback(indata, frames, time_info, status):
-    """Vosk audio callback."""
-    if status:
-        print(status, flush=True)
-    q.put(bytes(indata))
+@st.fragment(run_every=TRANSCRIPT_REFRESH_SECONDS)
+def render_live_transcript() -> None:
+    """Live transcript while listening; reruns on its own without blocking the page."""
+    transcriber = st.session_state.get("transcriber")
+    if transcriber is None:
+        return
+    if transcriber.error is not None:
+        st.warning(f"Speech recognition stopped: {transcriber.error}")
+        return
+    _, text, partial = transcriber.snapshot()
+    st.session_state.transcript = text
+    st.write("🗣 " + " ".join(part for part in (text, partial) if part))
 
 
 def apply_scheduled_factory_reset() -> None:
@@ -75,80 +121,14 @@ def generate_dynamic_culture_profile(region: str, location: str) -> dict:
     Use LLM to dynamically generate a culture profile for (region, location).
 
     Returns a dict with keys: phrase, gesture, tone, custom.
-    Uses a small cache in st.session_state to avoid repeating calls.
+    Profiles come from the process-wide, on-disk cache in
+    agents/culture_profile_agent.py, so a place is generated once for all users.
     """
-    if "dynamic_culture_cache" not in st.session_state:
-        st.session_state.dynamic_culture_cache = {}
-
-    cache = st.session_state.dynamic_culture_cache
-    cache_key = f"{region.strip().lower()}|{location.strip().lower()}"
-
-    # 1) Check cache first
-    if cache_key in cache:
-        return cache[cache_key]
-
-    # 2) Call LLM
     try:
-        prompt = f"""
-You are a cultural communication expert.
-
-For the following place:
-- Country or State/Region: {region}
-- City/Area: {location}
-
-Generate a short, practical profile for how a visitor should speak and behave.
-Return ONLY valid JSON with these keys:
-- "phrase": a short example phrase for politely asking for something (in English or local language).
-- "gesture": a one-sentence description of an appropriate gesture/body language.
-- "tone": 2–5 words describing the recommended tone of voice.
-- "custom": 1–2 sentences of a key cultural tip for everyday interactions.
-
-Example output:
-{{
-  "phrase": "Can I get a coffee, please?",
-  "gesture": "Smile and make brief eye contact.",
-  "tone": "Friendly and polite",
-  "custom": "Start with a short greeting before making your request."
-}}
-        """.strip()
-
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a cultural communication expert. Return ONLY compact JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.4,
-        )
-
-        content = completion.choices[0].message.content
-        data = json.loads(content)
-
-        result = {
-            "phrase": (data.get("phrase") or "").strip()
-            or f"Hello, could you please help me here in {location}?",
-            "gesture": (data.get("gesture") or "Smile gently and be respectful.").strip(),
-            "tone": (data.get("tone") or "Polite and friendly").strip(),
-            "custom": (
-                data.get("custom")
-                or f"Be respectful and observe how locals behave in {location}."
-            ).strip(),
-        }
-
+        return get_culture_profile(region, location)
     except Exception as e:
         st.warning(f"Dynamic culture profile failed: {e}")
-        result = {
-            "phrase": f"Hello, could you please help me here in {location}?",
-            "gesture": "Smile gently and be respectful.",
-            "tone": "Polite and friendly",
-            "custom": f"Be respectful and observe how locals behave in {location}.",
-        }
-
-    cache[cache_key] = result
-    return result
+        return fallback_culture_profile(location)
 
 
 # --------- Apply any scheduled factory reset, then init schema ---------
@@ -156,133 +136,65 @@ apply_scheduled_factory_reset()
 setup_memory_schema()
 
 
-def generate_cultural_playbook(region: str, city: str) -> dict:
+@st.cache_resource(show_spinner=False)
+def warm_prompt_library() -> dict:
+    """
+    Load the precomputed FAQ artifact once per process (see
+    build_prompt_library.py): seed its embeddings into the embedding cache
+    and register its canonical answers, so FAQ questions need no network calls.
+    """
+    artifact = load_artifact()
+    if artifact is None:
+        print("ℹ️ No prompt library artifact; run build_prompt_library.py to precompute FAQ answers.")
+        return {"loaded": False}
+
+    entries = list(artifact["entries"].values())
+    seeded = seed_embedding_cache(
+        [e["prompt"] for e in entries],
+        [decode_vector(e["embedding"]) for e in entries],
+        artifact["embedding_model"],
+    )
+    for e in entries:
+        # Served only in the scope the answer was generated for
+        answer_cache.add_canonical(
+            e["region"],
+            e["city"],
+            e.get("context", PROMPT_LIBRARY_CONTEXT),
+            e["prompt"],
+            e["answer"],
+            timestamp=e.get("answered_at", artifact["built_at"]),
+        )
+    return {
+        "loaded": True,
+        "library_version": artifact["library_version"],
+        "built_at": artifact["built_at"],
+        "entries": len(entries),
+        "embeddings_seeded": seeded,
+    }
+
+
+prompt_library_status = warm_prompt_library()
+
+
+def generate_cultural_playbook(region: str, city: str, force: bool = False) -> dict:
     """
     Build a structured cultural playbook for (region, city) by combining:
     - the dynamic culture profile (tone, gesture, tip)
     - past memories from the memory store
     - an LLM synthesis pass
 
+    Playbooks are persisted by agents/playbook_agent.py: an unchanged city is
+    served from storage, and new memories only refresh the
+    emerging_patterns_from_memory section. `force` rebuilds from scratch.
+
     Returns a dict ready for UI rendering.
     """
-    base = generate_dynamic_culture_profile(region=region, location=city)
-
-    mems = recall_similar(
-        region=region,
-        location=city,
-        user_input="",  # empty → fetch ALL in this scope
-        mode=None,
-        context=None,
-        top_k=50,
-    )
-
-    memory_lines = []
-    for m in mems:
-        memory_lines.append(
-            f"- Q: {m.get('phrase','')} | Tone: {m.get('tone','')} | "
-            f"Gesture: {m.get('gesture','')} | Tip: {m.get('custom','')}"
-        )
-    memory_text = "\n".join(memory_lines) if memory_lines else "No prior interactions recorded."
-
-    prompt = f"""
-You are building a CULTURAL PLAYBOOK for visitors to the following location:
-
-Region/Country: {region}
-City/Area: {city}
-
-Base cultural profile:
-- Suggested tone: {base.get('tone','')}
-- Suggested gesture: {base.get('gesture','')}
-- Cultural tip: {base.get('custom','')}
-
-Observed past interactions (questions and responses):
-{memory_text}
-
-Synthesize a practical CULTURAL PLAYBOOK with this JSON structure ONLY:
-
-{{
-  "communication_style": {{
-    "tone_overview": "...",
-    "body_language_overview": "...",
-    "phrasing_examples": [
-       "Example polite request...",
-       "Example asking for help...",
-       "Example declining politely..."
-    ],
-    "taboo_topics_or_phrases": [
-       "...", "...", "..."
-    ],
-    "formal_vs_informal": "..."
-  }},
-  "etiquette": {{
-    "greetings": "...",
-    "public_behavior": "...",
-    "restaurant_etiquette": "...",
-    "business_etiquette": "...",
-    "gift_giving": "..."
-  }},
-  "do_and_donts": {{
-    "do": [
-      "Do this...",
-      "Do that..."
-    ],
-    "dont": [
-      "Don't do this...",
-      "Don't do that..."
-    ]
-  }},
-  "emerging_patterns_from_memory": {{
-    "common_questions": [
-       "People often ask about...",
-       "They frequently wonder about..."
-    ],
-    "common_mistakes": [
-       "Visitors sometimes make this mistake...",
-       "Another recurring mistake is..."
-    ],
-    "recommendations": [
-       "My main advice would be...",
-       "Another key recommendation is..."
-    ]
-  }},
-  "examples": [
-    {{
-      "scenario": "Ordering food at a restaurant",
-      "what_to_say": "...",
-      "how_to_act": "..."
-    }},
-    {{
-      "scenario": "Asking for directions",
-      "what_to_say": "...",
-      "how_to_act": "..."
-    }},
-    {{
-      "scenario": "Meeting someone for the first time",
-      "what_to_say": "...",
-      "how_to_act": "..."
-    }}
-  ]
-}}
-
-Return ONLY valid JSON. Do not include any commentary outside the JSON.
-    """.strip()
-
     try:
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You output only well-structured JSON cultural playbooks.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.4,
-        )
-        content = completion.choices[0].message.content
-        data = json.loads(content)
-        return data
+        playbook, how = get_cultural_playbook(region, city, force=force)
+        print(f"📘 Playbook for {city}, {region}: {how}")
+        return playbook
     except Exception as e:
+        base = generate_dynamic_culture_profile(region=region, location=city)
         st.warning(f"Cultural playbook generation failed: {e}")
         return {
             "communication_style": {
@@ -715,6 +627,9 @@ if "prefill_text" not in st.session_state:
 if "prefill_just_set" not in st.session_state:
     st.session_state.prefill_just_set = False
 
+# One recall memo per rerun: panels asking for the same scope/query share a single vector query
+recall_scope = RecallScope()
+
 # ============================================================
 # PAGE: ASK ECHOATLAS
 # ============================================================
@@ -875,8 +790,8 @@ if page == "Ask EchoAtlas":
             st.session_state.city_is_custom = False
 
     if final_region != prev_region or final_city != prev_city:
+        stop_listening()
         st.session_state.transcript = ""
-        st.session_state.recording = False
         st.session_state.run_from_mic = False
         st.session_state.transcript_region = final_region
         st.session_state.transcript_city = final_city
@@ -925,16 +840,19 @@ if page == "Ask EchoAtlas":
 
             with col1:
                 if st.button("🎙 Start Listening", use_container_width=True):
-                    st.session_state.recording = True
+                    start_listening()
                     st.session_state.transcript = ""
                     st.session_state.run_from_mic = False
 
             with col2:
                 if st.button("⏹ Stop", use_container_width=True):
-                    st.session_state.recording = False
+                    stop_listening()
 
             with col3:
                 if st.button("🧹 Clear", use_container_width=True):
+                    if st.session_state.recording:
+                        # Keep listening, but from an empty transcript
+                        start_listening()
                     st.session_state.transcript = ""
                     st.session_state.run_from_mic = False
 
@@ -957,34 +875,9 @@ if page == "Ask EchoAtlas":
                     unsafe_allow_html=True,
                 )
 
-            placeholder = st.empty()
-
             if st.session_state.recording:
-                with sd.RawInputStream(
-                    samplerate=16000,
-                    blocksize=8000,
-                    dtype="int16",
-                    channels=1,
-                    callback=audio_callback,
-                ):
-                    st.info("🎧 Speak now… press Stop when you are done.")
-                    while st.session_state.recording:
-                        if not q.empty():
-                            data = q.get()
-                            if rec.AcceptWaveform(data):
-                                result = json.loads(rec.Result())
-                                txt = result.get("text", "")
-                                if txt:
-                                    st.session_state.transcript += " " + txt
-                            else:
-                                partial = json.loads(rec.PartialResult())
-                                if partial.get("partial"):
-                                    placeholder.write(
-                                        "🗣 " + st.session_state.transcript + " " + partial["partial"]
-                                    )
-                                    continue
-                        placeholder.write("🗣 " + st.session_state.transcript)
-                        time.sleep(0.1)
+                st.info("🎧 Speak now… press Stop when you are done.")
+                render_live_transcript()
 
             st.markdown("#### 📝 Captured Transcript")
             transcript = st.session_state.transcript.strip()
@@ -1015,6 +908,8 @@ if page == "Ask EchoAtlas":
                 user_input = ""
         else:
             # ----- TEXT MODE -----
+            if st.session_state.recording:
+                stop_listening()
 
                 # Prefill text if coming from FAQ
                 default_text = st.session_state.get("prefill_text", "")
@@ -1046,39 +941,84 @@ if page == "Ask EchoAtlas":
     if submit_query and user_input:
         mode_clean = "Mic" if input_mode.startswith("🎙") else "Text"
 
-        agent_output = run_agent(
-            user_input=user_input,
-            region=region,
-            location=city,
-            mode=mode_clean,
-            context="default",
-        )
-
         region_is_custom = st.session_state.get("region_is_custom", False)
         city_is_custom = st.session_state.get("city_is_custom", False)
+        needs_profile = region_is_custom or city_is_custom
+
+        # The culture profile and the answer are independent LLM calls: start the
+        # profile in the background and stream the answer (recall + LLM) meanwhile,
+        # so the round trip costs roughly the slower of the two, not their sum.
+        fan_out = FanOut()
+        if needs_profile:
+            fan_out.submit(
+                "culture_profile",
+                get_culture_profile,
+                region,
+                city,
+                timeout=CULTURE_PROFILE_TIMEOUT,
+            )
 
-        if region_is_custom or city_is_custom:
-            dyn = generate_dynamic_culture_profile(
+        try:
+            answer_stream = stream_agent(
+                user_input=user_input,
                 region=region,
                 location=city,
+                mode=mode_clean,
+                context="default",
+                use_cache=st.session_state.get("answer_cache_enabled", True),
+            )
+
+            # Show the answer token by token while it is generated; the full card
+            # below replaces this preview once the complete text is known.
+            live_answer = st.empty()
+            with live_answer.container():
+                st.markdown("🤖 **EchoAtlas suggests:**")
+                st.write_stream(answer_stream)
+            agent_output = answer_stream.result()
+        except Exception:
+            # The answer failed: nothing will use the profile, so drop it if not started
+            fan_out.cancel_all()
+            raise
+        live_answer.empty()
+        if agent_output.get("cached"):
+            st.caption(
+                f"⚡ Reused the answer to a near-identical question "
+                f"(similarity {agent_output['cache_score']:.2f})."
             )
+
+        if needs_profile:
+            try:
+                dyn = fan_out.result("culture_profile")
+            except Exception as e:
+                st.warning(f"Dynamic culture profile failed: {e}")
+                dyn = fallback_culture_profile(city)
             agent_output["gesture"] = agent_output.get("gesture") or dyn.get("gesture")
             agent_output["tone"] = agent_output.get("tone") or dyn.get("tone")
             agent_output["custom"] = agent_output.get("custom") or dyn.get("custom")
             if not agent_output.get("phrase"):
                 agent_output["phrase"] = dyn.get("phrase")
 
-        store_interaction(
-            region=region,
-            location=city,
-            phrase=user_input,
-            tone=agent_output.get("tone", "Neutral"),
-            gesture=agent_output.get("gesture", "🤝"),
-            custom=agent_output.get("custom", "Be respectful and observe local behavior."),
-            mode=mode_clean,
-            context="default",
-            answer=agent_output.get("phrase", ""),
-        )
+        # A cached answer is already stored; storing it again would renew it forever
+        stored = []
+        if not agent_output.get("cached"):
+            stored = [
+                store_interaction(
+                    region=region,
+                    location=city,
+                    phrase=user_input,
+                    tone=agent_output.get("tone", "Neutral"),
+                    gesture=agent_output.get("gesture", "🤝"),
+                    custom=agent_output.get("custom", "Be respectful and observe local behavior."),
+                    mode=mode_clean,
+                    context="default",
+                    answer=agent_output.get("phrase", ""),
+                    answered_at=agent_output.get("answered_at"),
+                )
+            ]
+
+        # The runner's recall already covers every mode and context; together with
+        # the interaction just stored it makes up the related-memories panel.
+        agent_output["related"] = stored + agent_output.get("related", [])[: 5 - len(stored)]
 
         st.session_state.last_region = region
         st.session_state.last_city = city
@@ -1106,6 +1046,9 @@ if page == "Ask EchoAtlas":
             agent_output = None
             user_input = ""
 
+    if agent_output and agent_output.get("related") is not None:
+        recall_scope.seed(agent_output["related"], region=region, location=city, user_input=user_input)
+
     if agent_output:
         phrase = agent_output.get("phrase", "")
         gesture = agent_output.get("gesture", "Smile and be respectful.")
@@ -1224,7 +1167,7 @@ if page == "Ask EchoAtlas":
         st.markdown("<br>", unsafe_allow_html=True)
         st.markdown("### 🧠 Related Memories for this City")
 
-        related = recall_similar(
+        related = recall_scope.recall(
             region=region,
             location=city,
             user_input=user_input,
@@ -1281,31 +1224,82 @@ elif page == "Conversation Memory":
         if st.button("🧹 Clear memories for this city", use_container_width=True):
             msg = delete_memories_for_region(region=region, location=city, mode=None, context=None)
             st.success(msg)
+            st.session_state.memory_page_cursors = [None]
 
-    mems = recall_similar(
-        region=region,
-        location=city,
-        user_input="",
-        mode=None,
-        context=None,
-        top_k=50,
+    with st.expander("🗂️ Memory overview by region & city", expanded=False):
+        scope_stats = memory_scope_stats()
+        if scope_stats:
+            st.dataframe(scope_stats, use_container_width=True, hide_index=True)
+        else:
+            st.caption("No memories stored yet.")
+
+    # Keyword search runs on the local full-text index (no embedding call)
+    memory_query = st.text_input(
+        "🔎 Search this city's memories",
+        placeholder="e.g. subway, tipping, enga",
+        key="memory_search_query",
     )
 
-    if mems:
-        st.write(f"Found **{len(mems)}** memories.")
-        for idx, m in enumerate(mems, start=1):
-            preview = m.get("phrase", "")
-            if len(preview) > 80:
-                preview = preview[:77] + "..."
-            label = f"💬 Turn {idx}: {preview}"
-            with st.expander(label):
-                st.markdown(
-                    f"<div class='ea-mem-meta'>Region: {m.get('region','')} · Location: {m.get('location','')} · Mode: {m.get('mode','')}</div>",
-                    unsafe_allow_html=True,
-                )
-                display_memory(m)
+    # Cursor stack for newest-first paging; reset whenever the scope changes
+    page_scope = f"{region}|{city}"
+    if st.session_state.get("memory_page_scope") != page_scope:
+        st.session_state.memory_page_scope = page_scope
+        st.session_state.memory_page_cursors = [None]
+    cursors = st.session_state.memory_page_cursors
+
+    if memory_query.strip():
+        found = search_memories(region=region, location=city, query=memory_query, limit=MEMORY_PAGE_SIZE)
+        if found:
+            st.write(f"**{len(found)}** memories match '{memory_query}' (best match first).")
+            for idx, m in enumerate(found, start=1):
+                preview = m.get("phrase", "")
+                if len(preview) > 80:
+                    preview = preview[:77] + "..."
+                with st.expander(f"🔎 Match {idx}: {preview}"):
+                    st.markdown(
+                        f"<div class='ea-mem-meta'>Region: {m.get('region','')} · Location: {m.get('location','')} · Mode: {m.get('mode','')}</div>",
+                        unsafe_allow_html=True,
+                    )
+                    display_memory(m)
+        else:
+            st.info(f"No memories in {city} mention '{memory_query}'.")
     else:
-        st.info("No memories stored yet for this city. Ask EchoAtlas something first.")
+        total = count_memories(region=region, location=city)
+        mems, next_cursor = list_memories(
+            region=region,
+            location=city,
+            limit=MEMORY_PAGE_SIZE,
+            cursor=cursors[-1],
+        )
+
+        if mems:
+            first = (len(cursors) - 1) * MEMORY_PAGE_SIZE
+            st.write(
+                f"Found **{total}** memories · showing {first + 1}–{first + len(mems)} (newest first)."
+            )
+            for idx, m in enumerate(mems, start=first + 1):
+                preview = m.get("phrase", "")
+                if len(preview) > 80:
+                    preview = preview[:77] + "..."
+                label = f"💬 Turn {idx}: {preview}"
+                with st.expander(label):
+                    st.markdown(
+                        f"<div class='ea-mem-meta'>Region: {m.get('region','')} · Location: {m.get('location','')} · Mode: {m.get('mode','')}</div>",
+                        unsafe_allow_html=True,
+                    )
+                    display_memory(m)
+
+            nav_newer, nav_older = st.columns(2)
+            with nav_newer:
+                if len(cursors) > 1 and st.button("◀ Newer", use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            with nav_older:
+                if next_cursor and st.button("Older ▶", use_container_width=True):
+                    cursors.append(next_cursor)
+                    st.rerun()
+        else:
+            st.info("No memories stored yet for this city. Ask EchoAtlas something first.")
 
 # ============================================================
 # PAGE: CULTURAL PLAYBOOK
@@ -1329,22 +1323,11 @@ elif page == "Cultural Playbook":
         unsafe_allow_html=True,
     )
 
-    if st.button("🔁 Regenerate Playbook for this City"):
-        cache = st.session_state.get("cached_playbook", {})
-        cache_key = f"{region}|{city}"
-        if cache_key in cache:
-            del cache[cache_key]
-        st.session_state.cached_playbook = cache
+    regenerate = st.button("🔁 Regenerate Playbook for this City")
 
-    cache_key = f"{region}|{city}"
-    cache = st.session_state.get("cached_playbook", {})
-    playbook = cache.get(cache_key)
-
-    if playbook is None:
-        with st.spinner("Synthesizing cultural playbook from EchoAtlas memory..."):
-            playbook = generate_cultural_playbook(region=region, city=city)
-        cache[cache_key] = playbook
-        st.session_state.cached_playbook = cache
+    # Stored playbooks are reused as long as this city's memories are unchanged
+    with st.spinner("Synthesizing cultural playbook from EchoAtlas memory..."):
+        playbook = generate_cultural_playbook(region=region, city=city, force=regenerate)
 
     if playbook:
         json_str = json.dumps(playbook, indent=2, ensure_ascii=False)
@@ -1398,289 +1381,14 @@ elif page == "FAQ & Sample Prompts":
             st.session_state.prefill_just_set = True
             st.success("Loaded into Ask EchoAtlas — switch to that tab to send it!")
 
-    # -------------- UNITED STATES --------------
-    with st.expander("🌍 United States (New York, Seattle, Chicago)", expanded=False):
-        prompt_button(
-            "Ask a stranger for help without sounding intrusive",
-            "How do I politely ask a stranger for help in New York without sounding intrusive?",
-            "us_ask_help"
-        )
-        prompt_button(
-            "Small talk at a US tech company",
-            "What is a natural way to start small talk with coworkers at a US tech company?",
-            "us_smalltalk"
-        )
-        prompt_button(
-            "Talking to someone who seems busy",
-            "How do I approach someone who looks busy without appearing rude?",
-            "us_busy"
-        )
-        prompt_button(
-            "Declining an invite politely",
-            "How do I politely decline a social invitation in the US without offending the person?",
-            "us_decline"
-        )
-        prompt_button(
-            "Handling direct feedback",
-            "How should I respond when an American coworker gives very direct feedback?",
-            "us_direct"
-        )
-
-    # -------------- CANADA --------------
-    with st.expander("🇨🇦 Canada (Toronto, Vancouver)", expanded=False):
-        prompt_button(
-            "Apologizing in a Canadian way",
-            "What is the most Canadian way to apologize after bumping into someone?",
-            "ca_apology"
-        )
-        prompt_button(
-            "Being friendly but not intrusive",
-            "How do I engage in friendly small talk with Canadians without crossing boundaries?",
-            "ca_friendly"
-        )
-        prompt_button(
-            "Asking someone to repeat themselves",
-            "What’s a polite way to ask someone to repeat themselves in Canada?",
-            "ca_repeat"
-        )
-        prompt_button(
-            "Making dinner plans politely",
-            "How do Canadians usually phrase dinner invitations politely?",
-            "ca_dinner"
-        )
-
-    # -------------- UNITED KINGDOM --------------
-    with st.expander("🇬🇧 United Kingdom (London, Manchester)", expanded=False):
-        prompt_button(
-            "Asking for directions in London",
-            "How do I ask for directions in London without sounding abrupt?",
-            "uk_directions"
-        )
-        prompt_button(
-            "Joining a queue properly",
-            "What should I know about queue etiquette in the UK?",
-            "uk_queue"
-        )
-        prompt_button(
-            "Polite disagreement in a meeting",
-            "How should I express disagreement politely in a UK business meeting?",
-            "uk_disagree"
-        )
-        prompt_button(
-            "Small talk that British people enjoy",
-            "What are some safe and enjoyable small talk topics for people in the UK?",
-            "uk_smalltalk"
-        )
-
-    # -------------- AUSTRALIA --------------
-    with st.expander("🇦🇺 Australia (Sydney, Melbourne)", expanded=False):
-        prompt_button(
-            "Friendly teasing (“banter”)",
-            "How should I respond to friendly teasing or ‘banter’ in Australian culture?",
-            "au_banter"
-        )
-        prompt_button(
-            "Ordering coffee in a busy Aussie café",
-            "What’s the polite and quick way to order coffee in a busy Melbourne café?",
-            "au_coffee"
-        )
-        prompt_button(
-            "Understanding Aussie humor",
-            "How do I understand and react to Australian humor without misunderstanding it?",
-            "au_humor"
-        )
-        prompt_button(
-            "Saying no without sounding rude",
-            "How can I say ‘no’ politely in Australian social situations?",
-            "au_no"
-        )
-
-    # -------------- SINGAPORE --------------
-    with st.expander("🇸🇬 Singapore (Singapore City)", expanded=False):
-        prompt_button(
-            "Hawker centre etiquette",
-            "What’s the polite way to ask for customization at a hawker centre in Singapore?",
-            "sg_hawker"
-        )
-        prompt_button(
-            "Business greeting etiquette",
-            "How formal should I be when greeting someone in a Singapore business meeting?",
-            "sg_greeting"
-        )
-        prompt_button(
-            "When not to joke",
-            "What kind of jokes or comments should I avoid in Singapore?",
-            "sg_jokes"
-        )
-        prompt_button(
-            "Talking to older Singaporeans respectfully",
-            "How do I address and speak to an older person respectfully in Singapore?",
-            "sg_elder"
-        )
-
-    # -------------- GERMANY --------------
-    with st.expander("🇩🇪 Germany (Berlin, Munich)", expanded=False):
-        prompt_button(
-            "Being on time (very important!)",
-            "Why is punctuality so important in Germany and how do I show respect?",
-            "de_punctual"
-        )
-        prompt_button(
-            "Direct but respectful communication",
-            "How do I communicate in a direct but respectful manner in Germany?",
-            "de_direct"
-        )
-        prompt_button(
-            "Splitting the bill",
-            "How do I politely ask to split the bill in Germany?",
-            "de_split"
-        )
-        prompt_button(
-            "Discussing work-life boundaries",
-            "How do Germans perceive work-life boundaries and how should I respect them?",
-            "de_boundaries"
-        )
-
-    # -------------- FRANCE --------------
-    with st.expander("🇫🇷 France (Paris, Lyon)", expanded=False):
-        prompt_button(
-            "Start with ‘bonjour’ — always!",
-            "Why is saying ‘bonjour’ before any question so important in France?",
-            "fr_bonjour"
-        )
-        prompt_button(
-            "Restaurant etiquette",
-            "How do I politely call a server in a French restaurant?",
-            "fr_server"
-        )
-        prompt_button(
-            "Polite complaints",
-            "What is a polite way to raise a complaint at a hotel or restaurant in France?",
-            "fr_complaint"
-        )
-        prompt_button(
-            "Talking to Parisians politely",
-            "What tone do Parisians appreciate in short interactions?",
-            "fr_tone"
-        )
-
-    # ===================== INDIA =====================
-    st.markdown("### 🇮🇳 India – State-Specific Real Questions")
-
-    # ---------- Tamil Nadu ----------
-    with st.expander("🇮🇳 Tamil Nadu (Chennai, Coimbatore)", expanded=False):
-        prompt_button(
-            "Respecting elders in Chennai",
-            "How should I address an elder respectfully in Chennai?",
-            "tn_elder"
-        )
-        prompt_button(
-            "Temple etiquette in Tamil Nadu",
-            "What should I know about temple etiquette and dress code in Tamil Nadu?",
-            "tn_temple"
-        )
-        prompt_button(
-            "Auto-rickshaw negotiation",
-            "How can I ask an auto driver in Chennai to go by meter politely?",
-            "tn_auto"
-        )
-        prompt_button(
-            "Ordering food politely",
-            "How do I ask for less spicy food in Tamil Nadu without sounding rude?",
-            "tn_spice"
-        )
-
-    # ---------- Karnataka ----------
-    with st.expander("🇮🇳 Karnataka (Bengaluru, Mysuru)", expanded=False):
-        prompt_button(
-            "Talking to IT coworkers in Bengaluru",
-            "How should I greet or start conversations in a Bengaluru IT company?",
-            "ka_it"
-        )
-        prompt_button(
-            "Meter request for auto",
-            "What is the polite way to ask a Bengaluru auto driver to use the meter?",
-            "ka_meter"
-        )
-        prompt_button(
-            "Breaking the ice in Bengaluru",
-            "What are natural ice-breakers when talking to locals in Bengaluru?",
-            "ka_ice"
-        )
-        prompt_button(
-            "Respectful tone with elders in Karnataka",
-            "How should I speak to an elder respectfully in Karnataka?",
-            "ka_elder"
-        )
-
-    # ---------- Kerala ----------
-    with st.expander("🇮🇳 Kerala (Kochi, Thiruvananthapuram)", expanded=False):
-        prompt_button(
-            "Backwater recommendations",
-            "How do I politely ask a local in Kochi for backwater tourism suggestions?",
-            "kl_backwater"
-        )
-        prompt_button(
-            "Temple etiquette",
-            "What should I know before visiting temples in Kerala?",
-            "kl_temple"
-        )
-        prompt_button(
-            "Seafood preferences",
-            "How do I ask for mild-spice seafood dishes in Kerala?",
-            "kl_seafood"
-        )
-        prompt_button(
-            "Public behavior norms",
-            "What are general social behavior expectations in Kerala?",
-            "kl_behavior"
-        )
-
-    # ---------- Telangana ----------
-    with st.expander("🇮🇳 Telangana (Hyderabad, Warangal)", expanded=False):
-        prompt_button(
-            "Talking to elders in Hyderabad",
-            "How do I speak respectfully to elders in Hyderabad?",
-            "ts_elder"
-        )
-        prompt_button(
-            "Asking a vendor for lower price",
-            "What is a polite way to ask a street vendor for a lower price in Hyderabad?",
-            "ts_vendor"
-        )
-        prompt_button(
-            "Office behavior in Hyderabad",
-            "How formal or informal should I be in Hyderabad workplaces?",
-            "ts_office"
-        )
-        prompt_button(
-            "Handling spicy dishes politely",
-            "What is a polite way to request less spicy food in Telangana?",
-            "ts_spice"
-        )
-
-    # ---------- Maharashtra ----------
-    with st.expander("🇮🇳 Maharashtra (Mumbai, Pune)", expanded=False):
-        prompt_button(
-            "Crowded train etiquette",
-            "How do I ask for help inside a crowded Mumbai local train?",
-            "mh_train"
-        )
-        prompt_button(
-            "Small talk in Mumbai offices",
-            "How do I start casual conversations with coworkers in Mumbai?",
-            "mh_smalltalk"
-        )
-        prompt_button(
-            "Housing society manners",
-            "What’s a polite way to complain about noise to a neighbor in Maharashtra?",
-            "mh_noise"
-        )
-        prompt_button(
-            "Talking to service staff respectfully",
-            "How do I politely talk to security guards and drivers in Mumbai?",
-            "mh_staff"
-        )
+    india_header_shown = False
+    for group in PROMPT_LIBRARY:
+        if group["section"] == "india" and not india_header_shown:
+            st.markdown("### 🇮🇳 India – State-Specific Real Questions")
+            india_header_shown = True
+        with st.expander(group["title"], expanded=False):
+            for item in group["prompts"]:
+                prompt_button(item["label"], item["prompt"], item["key"])
 
     st.markdown("<br>", unsafe_allow_html=True)
     st.info("Tip: Click a prompt, then switch to Ask EchoAtlas — it will be pre-filled!")
@@ -1701,10 +1409,64 @@ else:
 
     st.selectbox("Theme", ["Glassmorphism Dark (current)", "Light (future)", "High Contrast (future)"])
     st.checkbox("Enable microphone features", value=True)
-    st.checkbox("Show developer debug info", value=False)
+    st.checkbox(
+        "Reuse answers for near-identical questions (semantic answer cache)",
+        key="answer_cache_enabled",
+        value=True,
+    )
+    show_debug = st.checkbox("Show developer debug info", value=False)
+
+    if show_debug:
+        st.markdown("### Embedding Backend")
+        st.json(embedding_backend_info())
+        st.markdown("### Memory Partitions")
+        st.json(memory_partition_stats())
+        st.markdown("### Embedding Cache")
+        st.json(embedding_cache_stats())
+        st.markdown("### Memory Writer")
+        st.json(memory_writer_stats())
+        st.markdown("### Memory Compaction")
+        st.json(compaction_job_stats())
+        st.markdown("### Speech Recognizers")
+        st.json(get_recognizer_pool().stats())
+        st.markdown("### Culture Profile Cache")
+        st.json(culture_profile_cache_stats())
+        st.markdown("### Prompt Library Artifact")
+        st.json(prompt_library_status)
+        st.markdown("### Answer Cache (per scope)")
+        st.dataframe(answer_cache.stats(), use_container_width=True)
 
     st.markdown("### Memory Controls")
 
+    if st.button("♻️ Stop reusing cached answers for the current city", use_container_width=True):
+        answer_cache.invalidate(st.session_state.selected_region, st.session_state.selected_city)
+        st.success("Cached answers invalidated — new questions here will go to the LLM.")
+
+    st.markdown("#### 🗜️ Compact old memories")
+    compaction_age = st.number_input(
+        "Fold memories not seen for this many days into per-city digests",
+        min_value=1,
+        value=int(compaction_job_stats()["min_age_days"]),
+        step=30,
+    )
+    col1, col2 = st.columns(2)
+    with col1:
+        preview_compaction = st.button("📋 Preview compaction (dry run)", use_container_width=True)
+    with col2:
+        run_compaction = st.button("🗜️ Compact now", use_container_width=True)
+    if preview_compaction or run_compaction:
+        with st.spinner("Scanning old memories..."):
+            report = compact_memories(min_age_days=compaction_age, dry_run=not run_compaction)
+        if report["digests"]:
+            (st.info if preview_compaction else st.success)(
+                f"{'Would fold' if preview_compaction else 'Folded'} {report['memories_folded']} memories "
+                f"into {report['digests']} digests, reclaiming {report['rows_reclaimed']} rows "
+                f"(~{report['bytes_reclaimed'] / 1024:.1f} KiB)."
+            )
+            st.dataframe(report["scopes"], use_container_width=True)
+        else:
+            st.info("ℹ️ No scope has enough old memories to compact.")
+
     if "show_factory_reset_confirm" not in st.session_state:
         st.session_state.show_factory_reset_confirm = False
 
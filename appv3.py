@@ -1,37 +1,24 @@
 import os
-import json
-import queue
-import time
 import random
 from pathlib import Path
 
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
-
-import streamlit as st
-from openai import OpenAI   # 👈 add this
-
-client = OpenAI()           # 👈 and this
-
-
-import sounddevice as sd
-from vosk import Model, KaldiRecognizer
-
 import streamlit as st
 import openai
 
 from agents.memory_agent import (
     setup_memory_schema,
     store_interaction,
-    recall_similar,
     display_memory,
     delete_memories_for_region,
-    list_all_regions,
+    RecallScope,
+    clear_all_memories,
+    list_memories,
+    count_memories,
 )
 from langchain_runner import run_agent
-
-import chromadb
-from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
+from utils.region_loader import load_regions
+from agents.culture_profile_agent import get_culture_profile, fallback_culture_profile
+from agents.transcriber import Transcriber
 
 # -----------------------
 # OpenAI setup (for dynamic culture profile)
@@ -62,89 +49,19 @@ def pick_variant(field, context=None, default=None):
     return field or default
 
 
-# Simple in-memory cache for dynamic culture profiles
-if "dynamic_culture_cache" not in st.session_state:
-    st.session_state.dynamic_culture_cache = {}
-
-
 def generate_dynamic_culture_profile(region: str, location: str) -> dict:
     """
     Use LLM to dynamically generate a culture profile for (region, location).
 
     Returns a dict with keys: phrase, gesture, tone, custom.
+    Served from the shared, on-disk profile cache (agents/culture_profile_agent.py).
     """
-    cache_key = f"{region.strip()}|{location.strip()}"
-    cache = st.session_state.dynamic_culture_cache
-
-    # 1) Check cache first
-    if cache_key in cache:
-        return cache[cache_key]
-
     try:
-        prompt = f"""
-You are a cultural communication expert.
-
-For the following place:
-- Country or State/Region: {region}
-- City/Area: {location}
-
-Generate a short, practical profile for how a visitor should speak and behave.
-Return ONLY valid JSON with these keys:
-- "phrase": a short example phrase for politely asking for something (in English or local language).
-- "gesture": a one-sentence description of an appropriate gesture/body language.
-- "tone": 2–5 words describing the recommended tone of voice.
-- "custom": 1–2 sentences of a key cultural tip for everyday interactions.
-
-Example output:
-{{
-  "phrase": "Can I get a coffee, please?",
-  "gesture": "Smile and make brief eye contact.",
-  "tone": "Friendly and polite",
-  "custom": "Start with a short greeting before making your request."
-}}
-        """.strip()
-
-        # ✅ modern OpenAI client (SDK >= 1.0)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",  # adjust if you use a different model
-            messages=[
-                {"role": "system", "content": "You return only concise JSON objects."},
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.4,
-        )
-
-        content = response.choices[0].message.content.strip()
-
-        # Sometimes models wrap JSON in ```json ... ``` fences – strip them
-        if content.startswith("```"):
-            content = content.strip("`")
-            # drop leading "json\n" if present
-            if content.lower().startswith("json"):
-                content = content.split("\n", 1)[1]
-
-        profile = json.loads(content)
-
-        result = {
-            "phrase": profile.get("phrase", "").strip(),
-            "gesture": profile.get("gesture", "").strip(),
-            "tone": profile.get("tone", "").strip(),
-            "custom": profile.get("custom", "").strip(),
-        }
-
+        return get_culture_profile(region, location)
     except Exception as e:
         # Fallback minimal profile if LLM fails
-        result = {
-            "phrase": f"Hello, could you please help me here in {location}?",
-            "gesture": "Smile gently and be respectful.",
-            "tone": "Polite and friendly",
-            "custom": f"Be respectful and watch how locals behave in {location}.",
-        }
         st.warning(f"LLM culture profile generation failed: {e}")
-
-    # 3) Cache and return
-    cache[cache_key] = result
-    return result
+        return fallback_culture_profile(location)
 
 
 # -----------------------
@@ -391,6 +308,8 @@ if st.session_state.last_mode != mode:
     st.session_state.typed_phrase = ""
     st.session_state.transcript = ""
     st.session_state.recording = False
+    if "transcriber" in st.session_state:
+        st.session_state.pop("transcriber").stop()
     if "selected_region" in st.session_state:
         del st.session_state["selected_region"]
 
@@ -420,8 +339,7 @@ if st.session_state.last_mode != mode:
 # -----------------------
 # Load region options (2-level: region → locations)
 # -----------------------
-with open("regions.json", "r", encoding="utf-8") as f:
-    region_options = json.load(f)
+region_options = load_regions()
 
 regions_for_mode = (
     region_options["International"]
@@ -500,16 +418,35 @@ st.info(f"🎭 Tone Tip: {tone}")
 # -----------------------
 # Mic setup (Vosk)
 # -----------------------
-MODEL_PATH = "models/vosk-model-small-en-us-0.15"
-model = Model(MODEL_PATH)
-rec = KaldiRecognizer(model, 16000)
-q = queue.Queue()
+# The shared Vosk model loads on first mic use; each session gets its own pooled recognizer
+def start_listening():
+    stop_listening()
+    transcriber = Transcriber()
+    try:
+        transcriber.start()
+    except Exception as e:
+        st.warning(f"Could not open the microphone: {e}")
+        return
+    st.session_state.transcriber = transcriber
+    st.session_state.recording = True
 
 
-def audio_callback(indata, frames, time_, status):
-    if status:
-        print(status)
-    q.put(bytes(indata))
+def stop_listening():
+    transcriber = st.session_state.pop("transcriber", None)
+    if transcriber is not None:
+        st.session_state.transcript = transcriber.stop()
+    st.session_state.recording = False
+
+
+@st.fragment(run_every=0.25)
+def render_live_transcript():
+    # Pulls from the recognizer thread; reruns on its own without blocking the page
+    transcriber = st.session_state.get("transcriber")
+    if transcriber is None:
+        return
+    _, text, partial = transcriber.snapshot()
+    st.session_state.transcript = text
+    st.write("🗣️ Transcript: " + " ".join(part for part in (text, partial) if part))
 
 
 if "transcript" not in st.session_state:
@@ -537,19 +474,21 @@ if input_mode == "Mic":
 
     with mic_col1:
         if st.button("🎙 Start listening", key="mic_start"):
-            st.session_state.recording = True
+            start_listening()
             st.session_state.transcript = ""
             st.session_state.run_from_mic = False
 
     with mic_col2:
         if st.button("⏹ Stop listening", key="mic_stop"):
-            st.session_state.recording = False
+            stop_listening()
             if st.session_state.transcript.strip():
                 st.session_state.run_from_mic = True
                 st.rerun()
 
     with mic_col3:
         if st.button("🧹 Clear transcript", key="mic_clear"):
+            if st.session_state.recording:
+                start_listening()
             st.session_state.transcript = ""
             st.rerun()
 
@@ -571,41 +510,10 @@ if input_mode == "Mic":
             unsafe_allow_html=True,
         )
 
-    placeholder = st.empty()
-
-    # Capture audio when recording
+    # Live transcript from the recognizer thread while recording
     if st.session_state.recording:
-        with sd.RawInputStream(
-            samplerate=16000,
-            blocksize=8000,
-            dtype="int16",
-            channels=1,
-            callback=audio_callback,
-        ):
-            st.info("🎙️ Speak now... press **Stop listening** when you're done.")
-            while st.session_state.recording:
-                if not q.empty():
-                    data = q.get()
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        text = result.get("text", "")
-                        if text:
-                            st.session_state.transcript += " " + text
-                    else:
-                        partial = json.loads(rec.PartialResult())
-                        if partial.get("partial"):
-                            placeholder.write(
-                                "🗣️ Transcript: "
-                                + st.session_state.transcript
-                                + " "
-                                + partial["partial"]
-                            )
-                            continue
-                placeholder.write("🗣️ Transcript: " + st.session_state.transcript)
-                time.sleep(0.1)
-    else:
-        # 🔑 When not recording, remove the streaming placeholder box
-        placeholder.empty()
+        st.info("🎙️ Speak now... press **Stop listening** when you're done.")
+        render_live_transcript()
 
     # ✅ Captured Transcript ONLY in Mic mode
     st.markdown("#### 📝 Captured Transcript")
@@ -645,6 +553,8 @@ if input_mode == "Mic":
 
 else:
     # ----- TEXT MODE -----
+    if st.session_state.recording:
+        stop_listening()
     typed_input = st.text_area(
         "Type your phrase here",
         placeholder="e.g., Can I get a bowl of ramen?",
@@ -678,8 +588,15 @@ st.markdown(
 # =====================================================
 # 1) Handle submission + store "last_results" in session
 # =====================================================
+MEMORY_PAGE_SIZE = 10
+
 if "last_results" not in st.session_state:
     st.session_state.last_results = []
+if "last_results_scope" not in st.session_state:
+    st.session_state.last_results_scope = None
+
+# One recall memo per rerun: the tabs below share a single query per scope
+recall_scope = RecallScope()
 
 if submit_query and user_input:
     agent_result = run_agent(
@@ -692,30 +609,31 @@ if submit_query and user_input:
 
     llm_phrase = agent_result.get("phrase", "")
 
-    # Store this Q&A into memory
-    store_interaction(
-        region=selected_region,
-        location=location,
-        phrase=user_input,
-        tone=tone,
-        gesture=gesture,
-        custom=custom,
-        mode=input_mode,
-        context="casual",
-        answer=llm_phrase,
-    )
+    # Store this Q&A into memory (a cached answer is already stored)
+    stored = []
+    if not agent_result.get("cached"):
+        stored = [
+            store_interaction(
+                region=selected_region,
+                location=location,
+                phrase=user_input,
+                tone=tone,
+                gesture=gesture,
+                custom=custom,
+                mode=input_mode,
+                context="casual",
+                answer=llm_phrase,
+                answered_at=agent_result.get("answered_at"),
+            )
+        ]
 
-    # Get similar memories JUST for this question
-    results = recall_similar(
-        region=selected_region,
-        location=location,
-        user_input=user_input,
-        mode=input_mode,
-        context="casual",
-    )
+    # Similar memories JUST for this question: run_agent already recalled them
+    # for the same scope, so reuse that instead of querying again.
+    results = stored + agent_result.get("memories", [])[: 5 - len(stored)]
 
     # Cache in session to show under "Related Memories" tab
     st.session_state.last_results = results
+    st.session_state.last_results_scope = (selected_region, location, input_mode)
 
     # Decide what to show as the main answer text
     if llm_phrase:
@@ -738,6 +656,20 @@ else:
     source_label = st.session_state.get("last_source_label", "")
     user_input = st.session_state.get("last_user_input", "")
 
+if st.session_state.last_results_scope == (selected_region, location, input_mode):
+    recall_scope.seed(
+        st.session_state.last_results,
+        region=selected_region,
+        location=location,
+        user_input=st.session_state.get("last_user_input", ""),
+        mode=input_mode,
+        context="casual",
+        top_k=5,
+    )
+
+# How many memories this city has (answered from the memory index, no documents fetched)
+city_mem_count = count_memories(region=selected_region, location=location)
+
 
 # =====================================================
 # 2) Tabs: Ask/Response · Related Memories · All Memories
@@ -811,19 +743,11 @@ with tab_related:
     # Last question the user asked (if any)
     last_q = st.session_state.get("last_user_input", "").strip()
 
-    # Check if we have ANY memories for this city at all
-    city_mems = recall_similar(
-        region=selected_region,
-        location=location,
-        user_input="",      # empty → fetch all for scope
-        mode=None,
-        context=None,
-        top_k=10,
-    )
+    # Check if we have ANY memories for this city at all (city_mem_count, computed above)
 
     if not last_q:
         # No question asked yet this session for this city
-        if city_mems:
+        if city_mem_count:
             # There is history, but nothing "related" yet
             st.markdown(
                 """
@@ -853,7 +777,7 @@ with tab_related:
             )
     else:
         # We have a last question – show memories related to that question
-        rel = recall_similar(
+        rel = recall_scope.recall(
             region=selected_region,
             location=location,
             user_input=last_q,
@@ -905,24 +829,31 @@ with tab_related:
 # TAB 3: All Memories for this City
 # ----------------------
 with tab_all:
-    all_mems = recall_similar(
+    # Newest-first pages fetched lazily through the memory index
+    page_scope = f"{selected_region}|{location}"
+    if st.session_state.get("memory_page_scope") != page_scope:
+        st.session_state.memory_page_scope = page_scope
+        st.session_state.memory_page_cursors = [None]
+    cursors = st.session_state.memory_page_cursors
+
+    all_mems, next_cursor = list_memories(
         region=selected_region,
         location=location,
-        user_input="",      # empty → get all for this scope
-        mode=None,          # any mode
-        context=None,       # any context
-        top_k=50,
+        limit=MEMORY_PAGE_SIZE,
+        cursor=cursors[-1],
     )
 
     if all_mems:
         st.markdown(
             f"### 📚 Full Conversation History for {selected_region} → {location}"
         )
+        first = (len(cursors) - 1) * MEMORY_PAGE_SIZE
         st.caption(
+            f"{city_mem_count} memories · showing {first + 1}–{first + len(all_mems)}. "
             "Sorted by most recent first. These include both Mic and Text interactions."
         )
 
-        for idx, r in enumerate(all_mems, start=1):
+        for idx, r in enumerate(all_mems, start=first + 1):
             preview = r.get("phrase", "")
             if len(preview) > 80:
                 preview = preview[:77] + "..."
@@ -938,6 +869,16 @@ with tab_all:
                 )
                 display_memory(r)
 
+        nav_newer, nav_older = st.columns(2)
+        with nav_newer:
+            if len(cursors) > 1 and st.button("◀ Newer", key="mem_page_newer"):
+                cursors.pop()
+                st.rerun()
+        with nav_older:
+            if next_cursor and st.button("Older ▶", key="mem_page_older"):
+                cursors.append(next_cursor)
+                st.rerun()
+
         if st.button("🧹 Clear ALL memories for this city"):
             msg = delete_memories_for_region(
                 region=selected_region,
@@ -949,9 +890,11 @@ with tab_all:
 
             # also clear cached “last” values so Related tab empties
             st.session_state.last_results = []
+            st.session_state.last_results_scope = None
             st.session_state.last_main_text = ""
             st.session_state.last_source_label = ""
             st.session_state.last_user_input = ""
+            st.session_state.memory_page_cursors = [None]
 
             st.rerun()
     else:
@@ -981,25 +924,11 @@ col1, col2 = st.columns(2)
 with col1:
     if st.button("🧽 Clear ALL Memories (soft)"):
 
-        client = chromadb.PersistentClient(path="memory_store")
-        collection = client.get_or_create_collection(
-            name="echoatlas_memory",
-            embedding_function=OpenAIEmbeddingFunction(
-                model_name="text-embedding-3-small"
-            ),
-        )
-
-        all_ids = collection.get().get("ids", [])
-        if all_ids and isinstance(all_ids[0], list):
-            flat = []
-            for sub in all_ids:
-                flat.extend(sub)
-            all_ids = flat
+        cleared = clear_all_memories()
 
-        if all_ids:
-            collection.delete(ids=all_ids)
+        if cleared:
             st.success(
-                f"🧽 Cleared ALL memories in collection ({len(all_ids)} entries)."
+                f"🧽 Cleared ALL memories in collection ({cleared} entries)."
             )
         else:
             st.info("ℹ️ No memories found in the collection to clear.")
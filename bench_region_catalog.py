@@ -0,0 +1,94 @@
+"""
+Microbenchmark: per-call regions.json parsing vs the indexed RegionCatalog.
+Run: python bench_region_catalog.py [num_regions]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+
+from utils.region_loader import RegionCatalog
+
+
+def legacy_get_region_info(path: str, region_or_location: str):
+    """The previous get_region_info: parse, flatten and scan on every call."""
+    with open(path, "r", encoding="utf-8") as f:
+        all_regions = json.load(f)
+    flat_regions = {
+        region: info
+        for category in all_regions.values()
+        for region, info in category.items()
+    }
+    if region_or_location in flat_regions:
+        return flat_regions[region_or_location]
+    for info in flat_regions.values():
+        if info.get("location") == region_or_location:
+            return info
+    return None
+
+
+def build_regions_file(path: str, num_regions: int) -> list[str]:
+    """Write a synthetic regions.json with `num_regions` regions, 2 cities each."""
+    data: dict = {"International": {}, "Indian States": {}}
+    keys = []
+    for i in range(num_regions):
+        category = "International" if i % 2 else "Indian States"
+        region = f"Region {i}"
+        data[category][region] = {
+            "emoji": "🌍",
+            "location": f"Capital {i}, Region {i}",
+            "locations": {
+                f"City {i}A": {"phrase": "Hello", "gesture": "Nod", "tone": "Warm", "custom": "Be polite."},
+                f"City {i}B": {"phrase": "Hi", "gesture": "Wave", "tone": "Casual", "custom": "Smile."},
+            },
+        }
+        keys.append(region)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return keys
+
+
+def timed(label: str, fn, keys: list[str], calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(keys[i % len(keys)])
+    elapsed = time.perf_counter() - start
+    per_call_us = elapsed / calls * 1e6
+    print(f"{label:<34} {calls:>8} calls  {per_call_us:>12.2f} µs/call")
+    return per_call_us
+
+
+def main():
+    num_regions = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "regions.json")
+        keys = build_regions_file(path, num_regions)
+        # Worst case for the legacy path: location strings hit the linear scan
+        location_keys = [f"Capital {i}, Region {i}" for i in range(num_regions)]
+        alias_keys = [f"city {i}b, region {i}" for i in range(num_regions)]
+
+        print(f"📦 {num_regions} regions, file size {os.path.getsize(path) / 1024:.0f} KiB\n")
+
+        legacy_us = timed("legacy (region key)", lambda k: legacy_get_region_info(path, k), keys, 50)
+        legacy_loc_us = timed("legacy (location)", lambda k: legacy_get_region_info(path, k), location_keys, 50)
+
+        catalog = RegionCatalog(path)
+        start = time.perf_counter()
+        catalog.reload()
+        print(f"{'catalog build (one-off)':<34} {'':>8}        {(time.perf_counter() - start) * 1e3:>12.2f} ms")
+
+        catalog_us = timed("catalog (region key)", catalog.get, keys, 200_000)
+        catalog_loc_us = timed("catalog (location)", catalog.get, location_keys, 200_000)
+        timed("catalog (normalized alias)", catalog.get, alias_keys, 200_000)
+
+        print(
+            f"\n⚡ speedup: {legacy_us / catalog_us:,.0f}x by region key, "
+            f"{legacy_loc_us / catalog_loc_us:,.0f}x by location"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Microbenchmark: per-call run_agent overhead, rebuilding the LLM client and
+agent on every call vs the long-lived EchoAtlasRunner.
+
+Both paths talk to a local fake OpenAI chat server that answers instantly,
+so the numbers are client/agent overhead only (no model latency, no recall).
+Run: python bench_runner_overhead.py [calls]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# langchain_runner imports the memory agent, which opens a Chroma store in the
+# working directory and needs an API key: keep both away from the real ones.
+os.environ["OPENAI_API_KEY"] = "sk-bench"
+os.environ.setdefault("CHROMA_OPENAI_API_KEY", "sk-bench")
+os.environ["ECHOATLAS_WRITE_BEHIND"] = "0"
+os.chdir(tempfile.mkdtemp(prefix="echoatlas-bench-"))
+
+from langchain.agents import create_tool_calling_agent  # noqa: E402
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder  # noqa: E402
+from langchain_openai import ChatOpenAI  # noqa: E402
+
+from langchain_runner import EchoAtlasRunner, SYSTEM_PROMPT_TEMPLATE, format_memory_context  # noqa: E402
+
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    """Minimal /chat/completions endpoint with HTTP/1.1 keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    connections = 0
+
+    def setup(self):
+        super().setup()
+        FakeChatHandler.connections += 1
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(
+            {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o-mini",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": "Vanakkam! Try filter coffee."},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 6, "total_tokens": 16},
+            }
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_run(base_url: str, user_input: str, region: str, location: str, memories: list[dict]) -> str:
+    """The previous run_agent body: new client, prompt and agent on every call."""
+    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0, base_url=base_url)
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+        region=region,
+        location=location,
+        context="casual",
+        mode="Text",
+        memory_context=format_memory_context(memories),
+    )
+    prompt = ChatPromptTemplate.from_messages(
+        [
+            ("system", system_prompt),
+            MessagesPlaceholder(variable_name="messages"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ]
+    )
+    agent = create_tool_calling_agent(llm=llm, tools=[], prompt=prompt)
+    result = agent.invoke({"messages": [HumanMessage(content=user_input)], "intermediate_steps": []})
+    return result.return_values["output"]
+
+
+def timed(label: str, fn, calls: int) -> float:
+    FakeChatHandler.connections = 0
+    fn(0)  # warm-up (imports, first connection)
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    per_call_ms = elapsed / calls * 1e3
+    print(f"{label:<28} {calls:>6} calls  {per_call_ms:>9.2f} ms/call  {FakeChatHandler.connections:>5} TCP connections")
+    return per_call_ms
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    memories = [
+        {"phrase": "Where is the temple?", "gesture": "Namaste", "custom": "Remove shoes.", "tone": "Respectful"}
+    ]
+    question = lambda i: f"Question {i}: what should I eat?"  # noqa: E731
+
+    legacy_ms = timed(
+        "legacy (rebuild per call)",
+        lambda i: legacy_run(base_url, question(i), "Tamil Nadu", "Chennai", memories),
+        calls,
+    )
+
+    runner = EchoAtlasRunner(base_url=base_url)
+    runner_ms = timed(
+        "EchoAtlasRunner (reused)",
+        lambda i: runner.run(question(i), "Tamil Nadu", "Chennai", memories=memories),
+        calls,
+    )
+    runner.close()
+    server.shutdown()
+
+    print(f"\n⚡ overhead per call: {legacy_ms:.2f} ms -> {runner_ms:.2f} ms ({legacy_ms / runner_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Microbenchmark: filtered recall latency with the previous four-clause $and
+filter (region/location/mode/context) vs a single equality on the
+precomputed `scope` key, on one Chroma collection holding both.
+
+Vectors are random and small, so the numbers are filter + HNSW cost only
+(no embedding call). Building 1M memories takes a while; pass a smaller
+count for a quick run.
+Run: python bench_scope_filter.py [memories] [queries]
+"""
+
+import random
+import sys
+import tempfile
+import time
+
+import chromadb
+import numpy as np
+
+DIM = 16
+INSERT_BATCH = 5000
+REGIONS = [f"Region {r}" for r in range(50)]
+LOCATIONS = [f"City {c}" for c in range(20)]
+MODES = ["Text", "Mic"]
+CONTEXTS = ["default", "business", "travel"]
+
+
+def legacy_where(region, location, mode, context):
+    return {
+        "$and": [
+            {"region": {"$eq": region}},
+            {"location": {"$eq": location}},
+            {"mode": {"$eq": mode}},
+            {"context": {"$eq": context}},
+        ]
+    }
+
+
+def scope_where(region, location, mode, context):
+    return {"scope": {"$eq": f"{region}|{location}|{mode}|{context}"}}
+
+
+def build(collection, memories: int) -> None:
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for offset in range(0, memories, INSERT_BATCH):
+        size = min(INSERT_BATCH, memories - offset)
+        vectors = rng.standard_normal((size, DIM)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        metadatas = []
+        for i in range(size):
+            region, location = random.choice(REGIONS), random.choice(LOCATIONS)
+            mode, context = random.choice(MODES), random.choice(CONTEXTS)
+            metadatas.append(
+                {
+                    "region": region,
+                    "location": location,
+                    "mode": mode,
+                    "context": context,
+                    "scope_region": region,
+                    "scope_location": f"{region}|{location}",
+                    "scope": f"{region}|{location}|{mode}|{context}",
+                }
+            )
+        collection.add(
+            ids=[str(offset + i) for i in range(size)],
+            embeddings=vectors.tolist(),
+            metadatas=metadatas,
+        )
+        print(f"\r   built {offset + size}/{memories}", end="", flush=True)
+    print(f"\n   ({time.perf_counter() - start:.1f} s)")
+
+
+def timed(label: str, collection, make_where, scopes, vectors) -> float:
+    start = time.perf_counter()
+    for scope, vector in zip(scopes, vectors):
+        collection.query(query_embeddings=[vector], n_results=5, where=make_where(*scope))
+    elapsed_ms = (time.perf_counter() - start) * 1000 / len(scopes)
+    print(f"{label:<32} {elapsed_ms:8.2f} ms/query")
+    return elapsed_ms
+
+
+def main():
+    memories = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    random.seed(0)
+
+    client = chromadb.PersistentClient(path=tempfile.mkdtemp(prefix="echoatlas-bench-"))
+    collection = client.create_collection("bench_scope_filter", embedding_function=None)
+    print(f"📦 Building {memories} memories...")
+    build(collection, memories)
+
+    scopes = [
+        (random.choice(REGIONS), random.choice(LOCATIONS), random.choice(MODES), random.choice(CONTEXTS))
+        for _ in range(queries)
+    ]
+    vectors = np.random.default_rng(1).standard_normal((queries, DIM)).astype(np.float32).tolist()
+
+    # Warm up the index and metadata pages before timing either filter
+    timed("warm-up", collection, scope_where, scopes[:10], vectors[:10])
+    legacy_ms = timed("$and over 4 fields", collection, legacy_where, scopes, vectors)
+    scope_ms = timed("single scope equality", collection, scope_where, scopes, vectors)
+
+    print(f"\n⚡ filtered recall: {legacy_ms:.2f} ms -> {scope_ms:.2f} ms ({legacy_ms / scope_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
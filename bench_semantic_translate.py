@@ -0,0 +1,76 @@
+"""
+Throughput benchmark: semantic_translate in a Python loop vs
+semantic_translate_batch, in sentences per second on CPU.
+
+Locations and their phrases come from regions.json; inputs are the FAQ
+prompt library questions, repeated to `sentences`. Needs
+sentence-transformers (the model is downloaded on first use).
+Run: python bench_semantic_translate.py [sentences] [batch_size] [num_threads]
+"""
+
+import json
+import sys
+import time
+
+import agents.semantic_phrase_agent as spa
+from utils.prompt_library import iter_prompts
+
+
+def region_phrases(path: str = "regions.json") -> dict:
+    """{location: {"phrase": ...}} for every location in regions.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        all_regions = json.load(f)
+    return {
+        location: {"phrase": info["phrase"]}
+        for category in all_regions.values()
+        for region in category.values()
+        for location, info in region.get("locations", {}).items()
+        if info.get("phrase")
+    }
+
+
+def timed(label: str, fn, sentences: int) -> float:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    rate = sentences / elapsed
+    print(f"{label:<36} {elapsed * 1000:9.1f} ms  {rate:9.1f} sentences/s")
+    return rate
+
+
+def main():
+    sentences = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else spa.SEMANTIC_BATCH_SIZE
+    num_threads = int(sys.argv[3]) if len(sys.argv) > 3 else spa.SEMANTIC_NUM_THREADS
+
+    spa._region_data = region_phrases()
+    locations = sorted(spa._region_data)
+    questions = [prompt["prompt"] for _, prompt in iter_prompts()]
+    pairs = [
+        (locations[i % len(locations)], questions[i % len(questions)])
+        for i in range(sentences)
+    ]
+
+    # Load the model and every candidate matrix up front so both paths
+    # measure input encoding and scoring only
+    spa.set_num_threads(num_threads)
+    for location in locations:
+        spa.candidate_matrix(location)
+
+    print(f"{sentences} sentences, {len(locations)} locations, batch_size={batch_size}, threads={num_threads or 'default'}")
+    loop_rate = timed(
+        "semantic_translate (loop)",
+        lambda: [spa.semantic_translate(location, text) for location, text in pairs],
+        sentences,
+    )
+    batch_rate = timed(
+        "semantic_translate_batch",
+        lambda: spa.semantic_translate_batch(pairs, batch_size=batch_size, num_threads=num_threads),
+        sentences,
+    )
+
+    print(f"\n⚡ throughput: {loop_rate:.1f} -> {batch_rate:.1f} sentences/s ({batch_rate / loop_rate:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
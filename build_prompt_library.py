@@ -0,0 +1,116 @@
+"""
+Build step: precompute embeddings and canonical answers for the FAQ prompt
+library (utils/prompt_library.py) into prompt_library.artifact.json.
+
+Only entries whose text, scope or models changed since the last build, or
+whose answer is older than the answer cache TTL (ECHOATLAS_ANSWER_CACHE_TTL,
+after which the app stops serving it), are re-embedded / re-answered;
+everything else is carried over. The app loads the artifact at startup, so
+FAQ questions are answered from warm data.
+
+Run: python build_prompt_library.py [--force] [--dry-run]
+"""
+
+import datetime
+import hashlib
+import sys
+
+from agents.answer_cache import ANSWER_CACHE_TTL
+from agents.memory_agent import EMBEDDING_MODEL_NAME, embed_texts
+from langchain_runner import EchoAtlasRunner
+from utils.prompt_library import (
+    ARTIFACT_FORMAT_VERSION,
+    PROMPT_LIBRARY_ARTIFACT_PATH,
+    PROMPT_LIBRARY_CONTEXT,
+    encode_vector,
+    entry_expired,
+    entry_fingerprint,
+    iter_prompts,
+    load_artifact,
+    save_artifact,
+)
+
+ANSWER_MODEL = "gpt-4o-mini"
+ANSWER_CONTEXT = PROMPT_LIBRARY_CONTEXT
+
+
+def main():
+    force = "--force" in sys.argv
+    dry_run = "--dry-run" in sys.argv
+
+    previous = None if force else load_artifact()
+    previous_entries = (previous or {}).get("entries", {})
+
+    entries: dict[str, dict] = {}
+    stale: list[tuple[dict, dict, str]] = []
+    expired = 0
+    for group, prompt in iter_prompts():
+        fingerprint = entry_fingerprint(group, prompt, EMBEDDING_MODEL_NAME, ANSWER_MODEL)
+        old = previous_entries.get(prompt["key"])
+        if old is not None and old.get("fingerprint") == fingerprint:
+            # The app stops serving answers older than the answer cache TTL
+            if not entry_expired(old, previous["built_at"], ANSWER_CACHE_TTL):
+                entries[prompt["key"]] = old
+                continue
+            expired += 1
+        stale.append((group, prompt, fingerprint))
+
+    removed = sorted(set(previous_entries) - {p["key"] for _, p in iter_prompts()})
+    print(
+        f"📚 {len(entries) + len(stale)} prompts: {len(entries)} unchanged, "
+        f"{len(stale)} to build ({expired} expired), {len(removed)} removed"
+    )
+    for _, prompt, _ in stale:
+        print(f"   • {prompt['key']}: {prompt['prompt']}")
+    if dry_run or (not stale and not removed and previous is not None):
+        return
+
+    if stale:
+        # One batched embedding request for every changed prompt
+        vectors = embed_texts([prompt["prompt"] for _, prompt, _ in stale])
+        runner = EchoAtlasRunner(model=ANSWER_MODEL)
+        try:
+            for (group, prompt, fingerprint), vector in zip(stale, vectors):
+                # Canonical answers do not depend on any user's memories
+                result = runner.run(
+                    prompt["prompt"],
+                    group["region"],
+                    group["city"],
+                    context=ANSWER_CONTEXT,
+                    memories=[],
+                    use_cache=False,
+                )
+                entries[prompt["key"]] = {
+                    "fingerprint": fingerprint,
+                    "prompt": prompt["prompt"],
+                    "region": group["region"],
+                    "city": group["city"],
+                    "context": ANSWER_CONTEXT,
+                    "embedding": encode_vector(vector),
+                    "answer": result["phrase"],
+                    # Canonical answers expire like cached ones (ECHOATLAS_ANSWER_CACHE_TTL)
+                    "answered_at": datetime.datetime.utcnow().isoformat(),
+                }
+                print(f"   ✅ {prompt['key']}")
+        finally:
+            runner.close()
+
+    library_version = hashlib.sha256(
+        "".join(sorted(e["fingerprint"] for e in entries.values())).encode("utf-8")
+    ).hexdigest()[:12]
+    save_artifact(
+        {
+            "format_version": ARTIFACT_FORMAT_VERSION,
+            "library_version": library_version,
+            "built_at": datetime.datetime.utcnow().isoformat(),
+            "embedding_model": EMBEDDING_MODEL_NAME,
+            "answer_model": ANSWER_MODEL,
+            "entries": entries,
+        },
+        PROMPT_LIBRARY_ARTIFACT_PATH,
+    )
+    print(f"💾 Wrote {PROMPT_LIBRARY_ARTIFACT_PATH} (library version {library_version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Maintenance step: fold memories not seen for a while into one digest memory
+per scope (region + location + mode + context) and delete the originals,
+keeping per-city indexes and playbook prompts small.
+
+--dry-run only prints what would be folded and how much it reclaims.
+--llm has gpt-4o-mini write the digest answers (default: extractive).
+Set ECHOATLAS_COMPACTION_INTERVAL_HOURS to run the same pass in the app's
+background instead.
+
+Run: python compact_memories.py [--dry-run] [--llm] [--min-age-days N] [--region R [--location L]]
+"""
+
+import sys
+
+from agents.memory_agent import compact_memories
+from agents.memory_compactor import COMPACTION_MIN_AGE_DAYS, llm_summarizer
+
+
+def _option(name: str, default: str | None = None) -> str | None:
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv
+    min_age_days = float(_option("--min-age-days", str(COMPACTION_MIN_AGE_DAYS)))
+    region = _option("--region")
+    location = _option("--location")
+
+    print(
+        f"🗜️ Compacting memories older than {min_age_days:g} days"
+        f" in {region or 'all regions'}{f' / {location}' if location else ''}"
+        f"{' (dry run)' if dry_run else ''}..."
+    )
+    report = compact_memories(
+        region=region,
+        location=location,
+        min_age_days=min_age_days,
+        dry_run=dry_run,
+        summarize=llm_summarizer if "--llm" in sys.argv else None,
+    )
+
+    for scope in report["scopes"]:
+        print(
+            f"   • {scope['region']} / {scope['location'] or '-'} / {scope['mode']} / {scope['context']}: "
+            f"{scope['memories_folded']} memories -> 1 digest (~{scope['bytes_reclaimed'] / 1024:.1f} KiB)"
+        )
+    print(
+        f"{'📋 Would reclaim' if dry_run else '✅ Reclaimed'} {report['rows_reclaimed']} rows "
+        f"(~{report['bytes_reclaimed'] / 1024:.1f} KiB) across {report['digests']} scopes."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,362 @@
+import datetime
+import os
+import threading
+from typing import Iterator
+
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_tool_calling_agent
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage
 from agents.memory_agent import recall_similar
+from agents.answer_cache import SemanticAnswerCache, answer_cache
+from utils.context_packer import ContextPacker, section_tokens
+
+
+# Strongly location-anchored system prompt. Region, location, context, mode and
+# memory are template variables filled at invoke time, so the prompt and the
+# agent built on it are constructed once per process instead of once per call.
+SYSTEM_PROMPT_TEMPLATE = (
+    "You are EchoAtlas, a culturally-aware assistant bound to the "
+    "current region '{region}' and city/location '{location}'.\n\n"
+    "GENERAL RULE:\n"
+    "- Always answer from the perspective of THIS region/location.\n"
+    "- If the user asks about 'tourist destinations', 'places to visit', "
+    "or similar, interpret it as destinations IN or AROUND this city/region "
+    "or at least within this country, not worldwide.\n"
+    "- Use a friendly, concise tone.\n"
+    "- When helpful, include short cultural or etiquette tips.\n\n"
+    "Current context tag: {context}\n"
+    "Input mode: {mode}\n\n"
+    "Relevant past interactions for this region/location:\n"
+    "{memory_context}"
+)
+
+
+# Token budget for the recalled-memory block of the system prompt
+MEMORY_CONTEXT_TOKEN_BUDGET = int(os.getenv("ECHOATLAS_MEMORY_CONTEXT_TOKENS", "800"))
+
+_memory_packer = ContextPacker(budget_tokens=MEMORY_CONTEXT_TOKEN_BUDGET)
+
+# The answer cache and the memory packer rank by cosine similarity, so the
+# runner's own recall never takes the keyword-only fast path
+RUNNER_RECALL_SEARCH = "hybrid"
+# The runner does one recall per question, across every mode and context (the
+# UI's related-memories panel shows those); the prompt and the answer cache use
+# the first RUNNER_PROMPT_MEMORIES of them that match the question's mode/context.
+RUNNER_RECALL_TOP_K = 15
+RUNNER_PROMPT_MEMORIES = 5
+RUNNER_RELATED_MEMORIES = 5
+
+
+def _render_memory(r: dict) -> str:
+    return (
+        f"- Phrase: {r['phrase']}\n"
+        f"  Gesture: {r['gesture']}\n"
+        f"  Custom: {r['custom']}\n"
+        f"  Tone: {r['tone']}"
+    )
+
+
+def format_memory_context(recalled: list[dict]) -> str:
+    """
+    Render recalled memories as the bullet list used in the system prompt,
+    best first (similarity + recency), deduplicated and within the token budget.
+    """
+    return _memory_packer.pack(
+        recalled,
+        _render_memory,
+        separator="\n\n",
+        empty_text="No prior interactions found for this region/location.",
+    )["text"]
+
+
+def _answered_at(hit: dict) -> str:
+    """When a cached answer was originally generated."""
+    return hit.get("answered_at") or hit.get("timestamp", "")
+
+
+class EchoAtlasRunner:
+    """
+    Long-lived EchoAtlas agent.
+
+    Owns one pooled, keep-alive HTTP client, one ChatOpenAI instance and one
+    prebuilt tool-calling agent. Each run() only fills in the prompt variables
+    and invokes, so per-question overhead is the model call itself rather than
+    client setup, TLS handshakes and LangChain graph construction.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        temperature: float = 0,
+        base_url: str | None = None,
+        api_key: str | None = None,
+        max_connections: int = 20,
+        timeout: float = 60.0,
+        cache: SemanticAnswerCache | None = answer_cache,
+    ):
+        self.answer_cache = cache
+        self.http_client = httpx.Client(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=120.0,
+            ),
+        )
+
+        # ChatOpenAI only accepts one http_client for both its sync and async
+        # clients, so the pooled sync client is wired in through the SDK client.
+        self.openai_client = openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            http_client=self.http_client,
+        )
+        llm_kwargs = {}
+        if base_url:
+            llm_kwargs["base_url"] = base_url
+        if api_key:
+            llm_kwargs["api_key"] = api_key
+        self.llm = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            client=self.openai_client.chat.completions,
+            **llm_kwargs,
+        )
+
+        self.prompt = ChatPromptTemplate.from_messages(
+            [
+                ("system", SYSTEM_PROMPT_TEMPLATE),
+                MessagesPlaceholder(variable_name="messages"),
+                MessagesPlaceholder(variable_name="agent_scratchpad"),
+            ]
+        )
+
+        # No external tools yet, but ready for future ones
+        self.agent = create_tool_calling_agent(llm=self.llm, tools=[], prompt=self.prompt)
+        # Same prompt straight into the model, for token streaming
+        self.chain = self.prompt | self.llm
+
+    def _prepare(
+        self,
+        user_input: str,
+        region: str,
+        location: str,
+        mode: str,
+        context: str | None,
+        memories: list[dict] | None,
+    ) -> tuple[dict, list[dict], list[dict], dict]:
+        """
+        Resolve defaults, recall memories and build the prompt variables.
+        Returns (variables, memories for the prompt, related memories of any
+        mode/context, token usage of each prompt section).
+        """
+        if not user_input or not user_input.strip():
+            user_input = "Tell me something interesting about this place."
+
+        context = context or "casual"
+        print("Agent input:", repr(user_input))
+
+        # One recall for this region/location; the prompt keeps this mode/context
+        recalled, related = memories, memories
+        if recalled is None:
+            related = recall_similar(
+                region=region,
+                location=location,
+                user_input=user_input,
+                mode=None,
+                context=None,
+                top_k=RUNNER_RECALL_TOP_K,
+                search=RUNNER_RECALL_SEARCH,
+            )
+            recalled = [
+                m for m in related if m.get("mode") == mode and m.get("context") == context
+            ][:RUNNER_PROMPT_MEMORIES]
+            related = related[:RUNNER_RELATED_MEMORIES]
+
+        memory_context = format_memory_context(recalled)
+        variables = {
+            "region": region,
+            "location": location,
+            "context": context,
+            "mode": mode,
+            "memory_context": memory_context,
+            "messages": [HumanMessage(content=user_input)],
+        }
+        usage = section_tokens(
+            {
+                "system": SYSTEM_PROMPT_TEMPLATE.format(**{**variables, "memory_context": ""}),
+                "memory_context": memory_context,
+                "question": user_input,
+            }
+        )
+        print(f"🧮 Prompt tokens: {usage}")
+        return variables, recalled, related, usage
+
+    def _cached_answer(
+        self,
+        user_input: str,
+        variables: dict,
+        recalled: list[dict],
+        use_cache: bool,
+    ) -> dict | None:
+        if not use_cache or self.answer_cache is None:
+            return None
+        scope = (variables["region"], variables["location"], variables["context"])
+        hit = self.answer_cache.lookup_canonical(*scope, user_input)
+        if hit is None:
+            hit = self.answer_cache.lookup(*scope, recalled)
+        if hit is not None:
+            print(f"⚡ Answer cache hit (similarity {hit['score']:.3f}): {hit['phrase']!r}")
+        return hit
+
+    def run(
+        self,
+        user_input: str,
+        region: str,
+        location: str,
+        mode: str = "Text",
+        context: str | None = None,
+        memories: list[dict] | None = None,
+        use_cache: bool = True,
+    ) -> dict:
+        """
+        Answer one question. See run_agent() for the behaviour and return shape.
+
+        Pass `memories` to reuse a recall done elsewhere; otherwise similar
+        interactions are recalled here. With `use_cache`, a near-duplicate
+        question's stored answer is returned without calling the LLM.
+        """
+        variables, recalled, related, usage = self._prepare(
+            user_input, region, location, mode, context, memories
+        )
+        hit = self._cached_answer(user_input, variables, recalled, use_cache)
+        if hit is not None:
+            return {
+                "phrase": hit["answer"],
+                "memories": recalled,
+                "related": related,
+                "prompt_tokens": usage,
+                "cached": True,
+                "cache_score": hit["score"],
+                "answered_at": _answered_at(hit),
+            }
+
+        result = self.agent.invoke({**variables, "intermediate_steps": []})
+        return {
+            "phrase": result.return_values["output"],
+            "memories": recalled,
+            "related": related,
+            "prompt_tokens": usage,
+            "answered_at": datetime.datetime.utcnow().isoformat(),
+        }
+
+    def stream(
+        self,
+        user_input: str,
+        region: str,
+        location: str,
+        mode: str = "Text",
+        context: str | None = None,
+        memories: list[dict] | None = None,
+        use_cache: bool = True,
+    ) -> "AgentStream":
+        """
+        Like run(), but the answer is returned as an AgentStream that yields
+        tokens as the model produces them. Memories are recalled up front.
+        A cached answer is yielded as a single chunk.
+        """
+        variables, recalled, related, usage = self._prepare(
+            user_input, region, location, mode, context, memories
+        )
+        hit = self._cached_answer(user_input, variables, recalled, use_cache)
+        if hit is not None:
+            return AgentStream(
+                iter([hit["answer"]]),
+                recalled,
+                usage,
+                related=related,
+                cache_score=hit["score"],
+                answered_at=_answered_at(hit),
+            )
+
+        tokens = (
+            chunk.content
+            for chunk in self.chain.stream({**variables, "agent_scratchpad": []})
+            if chunk.content
+        )
+        return AgentStream(tokens, recalled, usage, related=related)
+
+    def close(self) -> None:
+        self.http_client.close()
+
+
+class AgentStream:
+    """
+    Iterable of answer tokens (e.g. for st.write_stream).
+
+    `memories` holds the recall used for the prompt, `related` the same
+    recall across every mode and context, and `prompt_tokens` the token
+    usage per prompt section; `text` accumulates the tokens seen so far
+    and is the full answer once iteration finishes. `cache_score` is set when
+    the answer came from the semantic answer cache; `answered_at` is when the
+    answer was generated (set when the stream finishes, unless cached).
+    """
+
+    def __init__(
+        self,
+        tokens: Iterator[str],
+        memories: list[dict],
+        prompt_tokens: dict | None = None,
+        cache_score: float | None = None,
+        answered_at: str | None = None,
+        related: list[dict] | None = None,
+    ):
+        self._tokens = tokens
+        self.memories = memories
+        self.related = memories if related is None else related
+        self.prompt_tokens = prompt_tokens or {}
+        self.cache_score = cache_score
+        self.answered_at = answered_at
+        self.text = ""
+
+    def __iter__(self) -> Iterator[str]:
+        for token in self._tokens:
+            self.text += token
+            yield token
+        if self.answered_at is None:
+            self.answered_at = datetime.datetime.utcnow().isoformat()
+
+    def result(self) -> dict:
+        """Drain any remaining tokens and return the run_agent()-shaped dict."""
+        for _ in self:
+            pass
+        result = {
+            "phrase": self.text,
+            "memories": self.memories,
+            "related": self.related,
+            "prompt_tokens": self.prompt_tokens,
+            "answered_at": self.answered_at,
+        }
+        if self.cache_score is not None:
+            result.update(cached=True, cache_score=self.cache_score)
+        return result
+
+
+_runner: EchoAtlasRunner | None = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> EchoAtlasRunner:
+    """Process-wide runner, created on first use and shared by all sessions."""
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = EchoAtlasRunner()
+    return _runner
 
 
 def run_agent(
@@ -11,6 +365,7 @@ def run_agent(
     location: str,
     mode: str = "Text",
     context: str | None = None,
+    use_cache: bool = True,
 ) -> dict:
     """
     Run EchoAtlas agent with semantic memory recall and OpenAI response.
@@ -20,72 +375,28 @@ def run_agent(
     - If the user is ambiguous (e.g. "best tourist destinations?"),
       interpret the question as being about THIS region/location,
       not the whole world.
-    """
-
-    if not user_input or not user_input.strip():
-        user_input = "Tell me something interesting about this place."
-
-    context = context or "casual"
-    print("Agent input:", repr(user_input))
-
-    # 1) Recall similar interactions from memory for this region/location/mode/context
-    recalled = recall_similar(
-        region=region,
-        location=location,
-        user_input=user_input,
-        mode=mode,
-        context=context,
-    )
-
-    memory_context = (
-        "\n\n".join(
-            f"- Phrase: {r['phrase']}\n"
-            f"  Gesture: {r['gesture']}\n"
-            f"  Custom: {r['custom']}\n"
-            f"  Tone: {r['tone']}"
-            for r in recalled
-        )
-        if recalled
-        else "No prior interactions found for this region/location."
-    )
-
-    # 2) Initialize LLM
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-
-    # 3) Strongly location-anchored system prompt
-    system_prompt = (
-        "You are EchoAtlas, a culturally-aware assistant bound to the "
-        f"current region '{region}' and city/location '{location}'.\n\n"
-        "GENERAL RULE:\n"
-        "- Always answer from the perspective of THIS region/location.\n"
-        "- If the user asks about 'tourist destinations', 'places to visit', "
-        "or similar, interpret it as destinations IN or AROUND this city/region "
-        "or at least within this country, not worldwide.\n"
-        "- Use a friendly, concise tone.\n"
-        "- When helpful, include short cultural or etiquette tips.\n\n"
-        f"Current context tag: {context}\n"
-        f"Input mode: {mode}\n\n"
-        "Relevant past interactions for this region/location:\n"
-        f"{memory_context}"
-    )
 
-    prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", system_prompt),
-            MessagesPlaceholder(variable_name="messages"),
-            MessagesPlaceholder(variable_name="agent_scratchpad"),
-        ]
+    Returns {"phrase": <answer>, "memories": <memories used in the prompt>,
+    "related": <the same recall across every mode and context>,
+    "answered_at": <when the answer was generated>} so the UI can reuse the
+    recall instead of querying the memory store again. Answers served from
+    the semantic answer cache also carry "cached" and "cache_score" (and the
+    original answer's answered_at); pass use_cache=False to always call the LLM.
+    """
+    return get_runner().run(
+        user_input, region, location, mode=mode, context=context, use_cache=use_cache
     )
 
-    # 4) Create agent (no external tools yet, but ready for future ones)
-    agent = create_tool_calling_agent(llm=llm, tools=[], prompt=prompt)
 
-    # 5) Run agent
-    result = agent.invoke(
-        {
-            "messages": [HumanMessage(content=user_input)],
-            "intermediate_steps": [],
-        }
+def stream_agent(
+    user_input: str,
+    region: str,
+    location: str,
+    mode: str = "Text",
+    context: str | None = None,
+    use_cache: bool = True,
+) -> AgentStream:
+    """Streaming variant of run_agent(): same prompt, tokens yielded as they arrive."""
+    return get_runner().stream(
+        user_input, region, location, mode=mode, context=context, use_cache=use_cache
     )
-
-    return {"phrase": result.return_values["output"]}
@@ -0,0 +1,122 @@
+"""
+Test the semantic answer cache that short-circuits run_agent.
+Run: python test_answer_cache.py
+"""
+
+import datetime
+import os
+import tempfile
+import time
+
+from agents.answer_cache import SemanticAnswerCache
+
+
+def recalled(score, answer="Take the blue line.", days_old=0):
+    ts = (datetime.datetime.utcnow() - datetime.timedelta(days=days_old)).isoformat()
+    return {"phrase": "Where is the metro?", "answer": answer, "score": score, "timestamp": ts}
+
+
+def test_serves_best_fresh_match_above_threshold():
+    cache = SemanticAnswerCache(threshold=0.9, ttl=24 * 3600)
+    hit = cache.lookup(
+        "Tamil Nadu",
+        "Chennai",
+        "default",
+        [recalled(0.93, "A"), recalled(0.97, "B", days_old=3), recalled(0.95, "C"), recalled(0.99, "")],
+    )
+    assert hit["answer"] == "C"
+    assert cache.lookup("Tamil Nadu", "Chennai", "default", [recalled(0.85)]) is None
+
+    stats = cache.stats()
+    assert stats == [
+        {
+            "region": "Tamil Nadu",
+            "location": "Chennai",
+            "context": "default",
+            "lookups": 2,
+            "hits": 1,
+            "hit_rate": 0.5,
+        }
+    ]
+
+
+def test_invalidation_hides_older_answers():
+    cache = SemanticAnswerCache(threshold=0.9)
+    old = recalled(0.98)
+    assert cache.lookup("Japan", "Tokyo", "default", [old]) is not None
+
+    time.sleep(0.01)
+    cache.invalidate("Japan", "Tokyo")
+    assert cache.lookup("Japan", "Tokyo", "default", [old]) is None
+    assert cache.lookup("Japan", "Osaka", "default", [old]) is not None
+
+    time.sleep(0.01)
+    assert cache.lookup("Japan", "Tokyo", "default", [recalled(0.98)]) is not None
+
+
+def test_repeats_do_not_renew_an_answer():
+    cache = SemanticAnswerCache(threshold=0.9, ttl=24 * 3600)
+    now = datetime.datetime.utcnow()
+    # Asked again a minute ago, but answered three days ago
+    repeated = dict(
+        recalled(0.98),
+        timestamp=(now - datetime.timedelta(days=3)).isoformat(),
+        answered_at=(now - datetime.timedelta(days=3)).isoformat(),
+        last_seen=(now - datetime.timedelta(minutes=1)).isoformat(),
+        count=12,
+    )
+    assert cache.lookup("Japan", "Tokyo", "default", [repeated]) is None
+    fresh = dict(repeated, answered_at=(now - datetime.timedelta(hours=1)).isoformat())
+    assert cache.lookup("Japan", "Tokyo", "default", [fresh]) is not None
+
+
+def test_invalidations_survive_a_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answer_cache.sqlite3")
+        old = recalled(0.98)
+        # Nothing is written until something is invalidated
+        assert SemanticAnswerCache(threshold=0.9, path=path).lookup("Japan", "Tokyo", "default", [old])
+        assert not os.path.exists(path)
+
+        time.sleep(0.01)
+        cache = SemanticAnswerCache(threshold=0.9, path=path)
+        cache.invalidate("Japan", "Tokyo")
+        cache.close()
+
+        restarted = SemanticAnswerCache(threshold=0.9, path=path)
+        assert restarted.lookup("Japan", "Tokyo", "default", [old]) is None
+        assert restarted.lookup("Japan", "Osaka", "default", [old]) is not None
+        restarted.close()
+
+
+def test_canonical_answers_are_scoped_and_expire():
+    cache = SemanticAnswerCache(ttl=24 * 3600)
+    question = "How do I greet elders in Chennai?"
+    cache.add_canonical("Tamil Nadu", "Chennai", "default", question, "Say vanakkam.")
+    old = (datetime.datetime.utcnow() - datetime.timedelta(days=3)).isoformat()
+    cache.add_canonical("Tamil Nadu", "Madurai", "default", question, "Stale.", timestamp=old)
+
+    hit = cache.lookup_canonical("Tamil Nadu", "Chennai", "default", "how do I greet elders in chennai")
+    assert hit["answer"] == "Say vanakkam." and hit["canonical"]
+    # Another city or context of the same region does not get this answer
+    assert cache.lookup_canonical("Tamil Nadu", "Coimbatore", "default", question) is None
+    assert cache.lookup_canonical("Tamil Nadu", "Chennai", "business", question) is None
+    # Older than the TTL
+    assert cache.lookup_canonical("Tamil Nadu", "Madurai", "default", question) is None
+
+    time.sleep(0.01)
+    cache.invalidate("Tamil Nadu", "Chennai")
+    assert cache.lookup_canonical("Tamil Nadu", "Chennai", "default", question) is None
+
+
+def main():
+    test_serves_best_fresh_match_above_threshold()
+    test_invalidation_hides_older_answers()
+    test_repeats_do_not_renew_an_answer()
+    test_invalidations_survive_a_restart()
+    test_canonical_answers_are_scoped_and_expire()
+    print("✅ All answer cache tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Test the token-budgeted memory context packer.
+Run: python test_context_packer.py
+"""
+
+import datetime
+
+from utils.context_packer import ContextPacker, count_tokens, section_tokens
+
+
+def memory(phrase, score=None, days_old=0, custom="Be polite."):
+    ts = (datetime.datetime.utcnow() - datetime.timedelta(days=days_old)).isoformat()
+    m = {"phrase": phrase, "custom": custom, "tone": "Warm", "gesture": "Nod", "timestamp": ts}
+    if score is not None:
+        m["score"] = score
+    return m
+
+
+def render(m):
+    return f"- {m['phrase']} | {m['custom']}"
+
+
+def test_ranks_by_similarity_and_recency_and_dedupes():
+    packer = ContextPacker(budget_tokens=1000)
+    packed = packer.pack(
+        [
+            memory("Where is the metro?", score=0.60, days_old=0),
+            memory("Best filter coffee nearby?", score=0.95, days_old=1),
+            memory("where is the METRO", score=0.58, days_old=2),
+            memory("How do I greet elders?", score=0.62, days_old=400),
+        ],
+        render,
+    )
+
+    phrases = [m["phrase"] for m in packed["memories"]]
+    assert phrases[0] == "Best filter coffee nearby?"
+    assert phrases.index("Where is the metro?") < phrases.index("How do I greet elders?")
+    assert "where is the METRO" not in phrases
+    assert packed["dropped"] == 1
+
+
+def test_respects_budget_and_truncates_long_fields():
+    packer = ContextPacker(budget_tokens=60, max_field_tokens=10)
+    memories = [memory(f"Question number {i}", custom="word " * 200) for i in range(20)]
+    packed = packer.pack(memories, render, empty_text="none")
+
+    assert packed["tokens"] <= 60
+    assert 0 < len(packed["memories"]) < 20
+    assert all(len(line) < 120 for line in packed["text"].split("\n"))
+    assert packer.pack([], render, empty_text="none")["text"] == "none"
+
+
+def test_section_report():
+    usage = section_tokens({"system": "You are EchoAtlas.", "question": ""})
+    assert usage["question"] == 0
+    assert usage["total"] == usage["system"] == count_tokens("You are EchoAtlas.") > 0
+
+
+def main():
+    test_ranks_by_similarity_and_recency_and_dedupes()
+    test_respects_budget_and_truncates_long_fields()
+    test_section_report()
+    print("✅ All context packer tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Test the shared culture-profile cache (TTL, LRU, single-flight, disk tier).
+Run: python test_culture_profile_cache.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from agents.culture_profile_agent import CultureProfileCache, profile_key
+
+
+def profile(tone):
+    return {"phrase": "Hello", "gesture": "Nod", "tone": tone, "custom": "Be kind."}
+
+
+def test_keys_are_normalized():
+    assert profile_key("  Tamil Nadu ", "CHENNAI!") == profile_key("tamil nadu", "Chennai")
+
+
+def test_concurrent_misses_trigger_one_generation():
+    cache = CultureProfileCache(path=None)
+    calls = []
+
+    def generate():
+        calls.append(1)
+        time.sleep(0.2)
+        return profile("Warm")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get_or_create("lagos|ikeja", generate)))
+        for _ in range(50)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 50 and all(r["tone"] == "Warm" for r in results)
+    assert cache.stats()["coalesced"] == 49
+
+
+def test_failures_are_shared_but_not_cached():
+    cache = CultureProfileCache(path=None)
+
+    def broken():
+        raise RuntimeError("LLM down")
+
+    try:
+        cache.get_or_create("oslo|oslo", broken)
+        raise AssertionError("expected the factory error")
+    except RuntimeError:
+        pass
+    assert cache.get_or_create("oslo|oslo", lambda: profile("Calm"))["tone"] == "Calm"
+
+
+def test_ttl_and_lru_bounds_with_disk_tier():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profiles.sqlite3")
+        cache = CultureProfileCache(path=path, ttl=60, max_items=2)
+        cache.put("a", profile("A"))
+        cache.put("b", profile("B"))
+        assert cache.get("a")["tone"] == "A"  # "b" is now least recently used
+        cache.put("c", profile("C"))
+
+        assert cache.get("b") is None
+        assert cache.stats()["disk_items"] == 2
+        cache.close()
+
+        reopened = CultureProfileCache(path=path, ttl=60, max_items=2)
+        assert reopened.get("c")["tone"] == "C"
+        reopened.close()
+
+        expired = CultureProfileCache(path=path, ttl=0, max_items=2)
+        assert expired.get("c") is None
+        assert expired.stats()["expired"] == 1
+        expired.close()
+
+
+def test_hits_write_access_times_in_batches():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profiles.sqlite3")
+        cache = CultureProfileCache(path=path, ttl=60, access_flush_interval=3600)
+        cache.put("a", profile("A"))
+
+        def last_access():
+            conn = sqlite3.connect(path)
+            try:
+                return conn.execute("SELECT last_access FROM profiles WHERE key = 'a'").fetchone()[0]
+            finally:
+                conn.close()
+
+        stored = last_access()
+        time.sleep(0.01)
+        for _ in range(5):
+            assert cache.get("a")["tone"] == "A"
+        # Hits stay in memory until a flush
+        assert last_access() == stored
+        cache.close()
+        assert last_access() > stored
+
+        eager = CultureProfileCache(path=path, ttl=60, access_flush_interval=0)
+        before = last_access()
+        time.sleep(0.01)
+        eager.get("a")
+        assert last_access() > before
+        eager.close()
+
+
+def main():
+    test_keys_are_normalized()
+    test_concurrent_misses_trigger_one_generation()
+    test_failures_are_shared_but_not_cached()
+    test_ttl_and_lru_bounds_with_disk_tier()
+    test_hits_write_access_times_in_batches()
+    print("✅ All culture profile cache tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Test embedding backend selection, collection backend checks and the local
+quantized MiniLM backend (onnxruntime session and quantizer are faked).
+Run: python test_embedding_backends.py
+"""
+
+import contextlib
+import math
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+from utils.embedding_backends import (
+    EmbeddingBackend,
+    LocalMiniLMBackend,
+    check_collection_backend,
+    create_embedding_backend,
+)
+
+
+class TinyBackend(EmbeddingBackend):
+    name = "tiny"
+    model_name = "tiny-model"
+    dimension = 2
+
+    def __call__(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+def test_metadata_records_backend_and_dimension():
+    assert TinyBackend().metadata() == {
+        "embedding_backend": "tiny",
+        "embedding_model": "tiny-model",
+        "embedding_dimension": 2,
+    }
+
+
+def test_backends_must_implement_call():
+    class NoEmbeddings(EmbeddingBackend):
+        name = "broken"
+
+    try:
+        NoEmbeddings()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("a backend without __call__ should not instantiate")
+
+
+def test_check_collection_backend():
+    backend = TinyBackend()
+    # Stores created before backends were recorded are accepted
+    check_collection_backend(None, backend)
+    check_collection_backend({"hnsw:space": "l2"}, backend)
+    check_collection_backend(backend.metadata(), backend)
+
+    for recorded in (
+        {"embedding_backend": "openai"},
+        {**backend.metadata(), "embedding_dimension": 1536},
+    ):
+        try:
+            check_collection_backend(recorded, backend)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError(f"{recorded} should not match {backend.metadata()}")
+
+
+def test_unknown_backend_name():
+    try:
+        create_embedding_backend("nope")
+    except ValueError as e:
+        assert "local-minilm" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+class FakeEncoding:
+    def __init__(self, text, length=8):
+        n = min(len(text.split()) + 2, length)
+        self.ids = [101] + [7] * (n - 2) + [102] + [0] * (length - n)
+        self.attention_mask = [1] * n + [0] * (length - n)
+
+
+class FakeTokenizer:
+    def encode(self, text):
+        return FakeEncoding(text)
+
+
+class FakeSession:
+    """Stands in for the onnxruntime session: random hidden states of MiniLM's width."""
+
+    def __init__(self, path, providers=None, sess_options=None):
+        self.path = path
+        self.rng = np.random.default_rng(0)
+
+    def run(self, output_names, inputs):
+        batch, tokens = inputs["input_ids"].shape
+        return [self.rng.normal(size=(batch, tokens, 384)).astype(np.float32)]
+
+
+class FakeOrt:
+    """The parts of the onnxruntime module the local backend touches."""
+
+    GraphOptimizationLevel = types.SimpleNamespace(ORT_ENABLE_ALL=99)
+
+    def __init__(self):
+        self.sessions = []
+
+    def SessionOptions(self):
+        return types.SimpleNamespace()
+
+    def InferenceSession(self, path, providers=None, sess_options=None):
+        self.sessions.append(path)
+        return FakeSession(path, providers, sess_options)
+
+
+@contextlib.contextmanager
+def fake_quantization(calls):
+    """Swap in an onnxruntime.quantization whose quantize_dynamic just writes the output file."""
+
+    def quantize_dynamic(model_input, model_output, weight_type=None):
+        calls.append((model_input, weight_type))
+        with open(model_output, "wb") as f:
+            f.write(b"int8")
+
+    module = types.ModuleType("onnxruntime.quantization")
+    module.quantize_dynamic = quantize_dynamic
+    module.QuantType = types.SimpleNamespace(QInt8="QInt8")
+    original = sys.modules.get("onnxruntime.quantization")
+    sys.modules["onnxruntime.quantization"] = module
+    try:
+        yield
+    finally:
+        if original is None:
+            sys.modules.pop("onnxruntime.quantization", None)
+        else:
+            sys.modules["onnxruntime.quantization"] = original
+
+
+def local_backend(download_path, ort):
+    backend = LocalMiniLMBackend()
+    minilm = backend.embedding_function
+    minilm.DOWNLOAD_PATH = download_path
+    minilm.ort = ort
+    minilm.tokenizer = FakeTokenizer()
+    return backend
+
+
+def test_local_backend_quantizes_once_and_returns_unit_vectors():
+    quantized = []
+    ort = FakeOrt()
+    with tempfile.TemporaryDirectory() as tmp, fake_quantization(quantized):
+        # An already downloaded model, so nothing is fetched
+        folder = os.path.join(tmp, "onnx")
+        os.makedirs(folder)
+        for name in (
+            "config.json",
+            "model.onnx",
+            "special_tokens_map.json",
+            "tokenizer_config.json",
+            "tokenizer.json",
+            "vocab.txt",
+        ):
+            open(os.path.join(folder, name), "wb").close()
+
+        backend = local_backend(tmp, ort)
+        vectors = backend(["Where is the metro?", "Nandri"])
+        backend(["Thank you"])
+        # A new process (fresh backend) reuses the quantized file on disk
+        local_backend(tmp, ort)(["Hello"])
+
+        int8_path = os.path.join(folder, "model.int8.onnx")
+        assert quantized == [(os.path.join(folder, "model.onnx"), "QInt8")]
+        assert os.path.exists(int8_path) and not os.path.exists(int8_path + ".tmp")
+        assert ort.sessions == [int8_path, int8_path]
+
+    assert len(vectors) == 2
+    for vector in vectors:
+        assert len(vector) == backend.dimension == 384
+        assert all(isinstance(x, float) for x in vector)
+        assert math.isclose(math.sqrt(sum(x * x for x in vector)), 1.0, rel_tol=1e-5)
+
+
+def main():
+    test_metadata_records_backend_and_dimension()
+    test_backends_must_implement_call()
+    test_check_collection_backend()
+    test_unknown_backend_name()
+    test_local_backend_quantizes_once_and_returns_unit_vectors()
+    print("✅ All embedding backend tests passed.")
+
+
+if __name__ == "__main__":
+    main()
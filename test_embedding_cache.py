@@ -0,0 +1,60 @@
+"""
+Test the two-tier embedding cache used by memory_agent.py.
+Run: python test_embedding_cache.py
+"""
+
+import os
+import tempfile
+
+from utils.embedding_cache import CachedEmbedder, EmbeddingCache
+
+
+class CountingEmbedder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), 0.25] for t in texts]
+
+
+def test_repeated_text_is_embedded_once():
+    fn = CountingEmbedder()
+    embed = CachedEmbedder(fn, "text-embedding-3-small", EmbeddingCache(path=None))
+
+    first = embed(["Where is the subway?", "Nandri!", "Where is the subway?"])
+    second = embed(["Nandri!"])
+
+    assert fn.calls == [["Where is the subway?", "Nandri!"]]
+    assert first[0] == first[2] == [20.0, 0.25]
+    assert second == [[7.0, 0.25]]
+    assert embed.cache.stats()["memory_hits"] == 1
+
+
+def test_disk_tier_survives_restart_and_is_keyed_by_model():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embedding_cache.sqlite3")
+        fn = CountingEmbedder()
+
+        cache = EmbeddingCache(path=path)
+        CachedEmbedder(fn, "model-a", cache)(["Thank you!"])
+        cache.close()
+
+        reopened = EmbeddingCache(path=path, max_memory_items=1)
+        assert CachedEmbedder(fn, "model-a", reopened)(["Thank you!"]) == [[10.0, 0.25]]
+        assert len(fn.calls) == 1
+        assert reopened.stats()["disk_hits"] == 1
+
+        CachedEmbedder(fn, "model-b", reopened)(["Thank you!"])
+        assert len(fn.calls) == 2
+        reopened.close()
+
+
+def main():
+    test_repeated_text_is_embedded_once()
+    test_disk_tier_survives_restart_and_is_keyed_by_model()
+    print("✅ All embedding cache tests passed.")
+
+
+if __name__ == "__main__":
+    main()
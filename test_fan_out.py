@@ -0,0 +1,73 @@
+"""
+Test the concurrent fan-out helper used by the Ask flow.
+Run: python test_fan_out.py
+"""
+
+import threading
+
+from utils.fan_out import FanOut
+
+
+def meet(barrier, value):
+    # Only returns once every call sharing the barrier has started
+    barrier.wait()
+    return value
+
+
+def blocked(release, value):
+    release.wait(5)
+    return value
+
+
+def fail():
+    raise ValueError("profile service down")
+
+
+def test_calls_run_concurrently():
+    fan_out = FanOut()
+    # Breaks (BrokenBarrierError) if the three calls cannot all be running at once
+    barrier = threading.Barrier(3, timeout=5)
+    fan_out.submit("answer", meet, barrier, "answer")
+    fan_out.submit("profile", meet, barrier, "profile")
+    fan_out.submit("recall", meet, barrier, "recall")
+
+    assert fan_out.result("answer") == "answer"
+    assert fan_out.result("profile") == "profile"
+    assert fan_out.result("recall") == "recall"
+
+
+def test_timeouts_and_errors_are_per_call():
+    fan_out = FanOut()
+    release = threading.Event()
+    fan_out.submit("slow", blocked, release, "late", timeout=0.1)
+    fan_out.submit("fast", lambda: "ok", timeout=5.0)
+    fan_out.submit("broken", fail)
+
+    try:
+        assert "slow" in fan_out and "missing" not in fan_out
+        assert fan_out.result("fast") == "ok"
+
+        # The slow call is still blocked, so it can only miss its own deadline
+        try:
+            fan_out.result("slow")
+            raise AssertionError("expected a timeout")
+        except TimeoutError:
+            pass
+
+        try:
+            fan_out.result("broken")
+            raise AssertionError("expected the call's own error")
+        except ValueError:
+            pass
+    finally:
+        release.set()
+
+
+def main():
+    test_calls_run_concurrently()
+    test_timeouts_and_errors_are_per_call()
+    print("✅ All fan-out tests passed.")
+
+
+if __name__ == "__main__":
+    main()
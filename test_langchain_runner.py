@@ -0,0 +1,218 @@
+"""
+Test the long-lived EchoAtlas runner: its single recall per question, its
+reuse across questions and its streamed answers (no OpenAI call or Chroma
+store needed; the model is a scripted double).
+Run: python test_langchain_runner.py
+"""
+
+import contextlib
+import datetime
+import importlib
+import sys
+import types
+
+from agents.answer_cache import SemanticAnswerCache
+
+
+@contextlib.contextmanager
+def runner_module(recall):
+    """
+    langchain_runner imported against a stub memory agent whose recall_similar
+    is `recall`. The real memory agent needs an API key and a Chroma store; the
+    stub and this copy of the runner are removed from sys.modules afterwards.
+    """
+    names = ("agents.memory_agent", "langchain_runner")
+    saved = {name: sys.modules.pop(name) for name in names if name in sys.modules}
+    stub = types.ModuleType("agents.memory_agent")
+    stub.recall_similar = recall
+    sys.modules["agents.memory_agent"] = stub
+    try:
+        yield importlib.import_module("langchain_runner")
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+class ScriptedAgent:
+    """Stands in for the tool-calling agent: records prompt variables, returns one answer."""
+
+    def __init__(self, answer="Vanakkam!"):
+        self.answer = answer
+        self.calls = []
+
+    def invoke(self, variables):
+        self.calls.append(variables)
+        return types.SimpleNamespace(return_values={"output": self.answer})
+
+
+class ScriptedChain:
+    """Stands in for the prompt | llm chain: records prompt variables, streams fixed chunks."""
+
+    def __init__(self, chunks=("Van", "", "akkam", "", "!")):
+        self.chunks = chunks
+        self.calls = []
+
+    def stream(self, variables):
+        self.calls.append(variables)
+        for content in self.chunks:
+            yield types.SimpleNamespace(content=content)
+
+
+def memory(memory_id, mode="Text", context="default", score=0.5):
+    return {
+        "id": memory_id,
+        "phrase": f"Question {memory_id}",
+        "answer": f"Answer {memory_id}",
+        "gesture": "🙏",
+        "custom": "Greet first.",
+        "tone": "Warm",
+        "mode": mode,
+        "context": context,
+        "score": score,
+    }
+
+
+def test_one_unscoped_recall_feeds_prompt_and_related_panel():
+    calls = []
+    recalled = [
+        memory("mic", mode="Mic"),
+        memory("text-1"),
+        memory("business", context="business"),
+        memory("text-2"),
+    ]
+
+    def recall(region, location, user_input, mode=None, context=None, top_k=5, search=None):
+        calls.append((mode, context, top_k))
+        return list(recalled)
+
+    with runner_module(recall) as langchain_runner:
+        runner = langchain_runner.EchoAtlasRunner(api_key="sk-test", cache=None)
+        runner.agent = ScriptedAgent()
+        try:
+            result = runner.run("Hello?", "Tamil Nadu", "Chennai", mode="Text", context="default")
+        finally:
+            runner.close()
+
+        assert calls == [(None, None, langchain_runner.RUNNER_RECALL_TOP_K)]
+
+    # The prompt only sees this question's mode and context; the panel sees everything
+    assert [m["id"] for m in result["memories"]] == ["text-1", "text-2"]
+    assert [m["id"] for m in result["related"]] == ["mic", "text-1", "business", "text-2"]
+    prompt_memories = runner.agent.calls[0]["memory_context"]
+    assert "Question text-1" in prompt_memories and "Question mic" not in prompt_memories
+
+
+def test_run_agent_reuses_one_runner_client_and_agent():
+    def recall(region, location, user_input, mode=None, context=None, top_k=5, search=None):
+        return [memory("text-1")]
+
+    with runner_module(recall) as langchain_runner:
+        runner_class = langchain_runner.EchoAtlasRunner
+        built = []
+
+        def build_runner():
+            runner = runner_class(api_key="sk-test", cache=None)
+            runner.agent = ScriptedAgent()
+            built.append(runner)
+            return runner
+
+        # get_runner() builds the shared runner through this module global
+        langchain_runner.EchoAtlasRunner = build_runner
+        first = langchain_runner.run_agent("Hello?", "Tamil Nadu", "Chennai", context="default")
+        runner = langchain_runner.get_runner()
+        http_client, agent = runner.http_client, runner.agent
+        second = langchain_runner.run_agent("Thank you?", "Tamil Nadu", "Chennai", context="default")
+
+        assert built == [runner] and langchain_runner.get_runner() is runner
+        assert runner.http_client is http_client and runner.agent is agent
+        # Both questions went through the same agent and its pooled HTTP client
+        assert [call["messages"][-1].content for call in agent.calls] == ["Hello?", "Thank you?"]
+        assert runner.openai_client._client is http_client
+        assert first["phrase"] == second["phrase"] == "Vanakkam!"
+
+        assert not http_client.is_closed
+        runner.close()
+        assert http_client.is_closed
+
+
+def test_stream_accumulates_text_and_drops_empty_chunks():
+    def recall(region, location, user_input, mode=None, context=None, top_k=5, search=None):
+        return [memory("text-1")]
+
+    with runner_module(recall) as langchain_runner:
+        runner = langchain_runner.EchoAtlasRunner(api_key="sk-test", cache=None)
+        runner.chain = ScriptedChain()
+        try:
+            stream = runner.stream("Hello?", "Tamil Nadu", "Chennai", context="default")
+            tokens = iter(stream)
+            assert next(tokens) == "Van"
+            assert stream.text == "Van" and stream.answered_at is None
+
+            # Empty chunks from the model are dropped, not yielded
+            assert list(tokens) == ["akkam", "!"]
+            assert stream.text == "Vanakkam!"
+            result = stream.result()
+        finally:
+            runner.close()
+
+    assert len(runner.chain.calls) == 1
+    assert result["phrase"] == "Vanakkam!"
+    assert set(result) == {"phrase", "memories", "related", "prompt_tokens", "answered_at"}
+    assert [m["id"] for m in result["memories"]] == ["text-1"]
+    assert result["answered_at"]
+
+
+def test_stream_result_drains_remaining_tokens():
+    def recall(region, location, user_input, mode=None, context=None, top_k=5, search=None):
+        return []
+
+    with runner_module(recall) as langchain_runner:
+        runner = langchain_runner.EchoAtlasRunner(api_key="sk-test", cache=None)
+        runner.chain = ScriptedChain()
+        try:
+            stream = runner.stream("Hello?", "Tamil Nadu", "Chennai")
+            next(iter(stream))
+            result = stream.result()
+        finally:
+            runner.close()
+
+    assert result["phrase"] == stream.text == "Vanakkam!"
+    assert "cached" not in result
+
+
+def test_stream_cache_hit_is_one_chunk():
+    answered_at = datetime.datetime.utcnow().isoformat()
+    stored = dict(memory("text-1", score=0.97), answered_at=answered_at)
+
+    def recall(region, location, user_input, mode=None, context=None, top_k=5, search=None):
+        return [dict(stored)]
+
+    with runner_module(recall) as langchain_runner:
+        runner = langchain_runner.EchoAtlasRunner(api_key="sk-test", cache=SemanticAnswerCache(threshold=0.95))
+        runner.chain = ScriptedChain()
+        try:
+            stream = runner.stream("Question text-1", "Tamil Nadu", "Chennai", context="default")
+            assert list(stream) == [stored["answer"]]
+            result = stream.result()
+        finally:
+            runner.close()
+
+    assert runner.chain.calls == []
+    assert stream.cache_score == result["cache_score"] == 0.97
+    assert result["cached"] is True
+    assert result["phrase"] == stored["answer"]
+    assert result["answered_at"] == answered_at
+
+
+def main():
+    test_one_unscoped_recall_feeds_prompt_and_related_panel()
+    test_run_agent_reuses_one_runner_client_and_agent()
+    test_stream_accumulates_text_and_drops_empty_chunks()
+    test_stream_result_drains_remaining_tokens()
+    test_stream_cache_hit_is_one_chunk()
+    print("✅ All langchain runner tests passed.")
+
+
+if __name__ == "__main__":
+    main()
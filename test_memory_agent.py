@@ -0,0 +1,320 @@
+"""
+Test the memory agent's scope filters and store-time dedupe against a
+throwaway Chroma store (a bag-of-words embedding backend stands in for
+OpenAI; no network needed).
+Run: python test_memory_agent.py
+"""
+
+import contextlib
+import hashlib
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+import numpy as np
+from chromadb.api.shared_system_client import SharedSystemClient
+
+from utils import embedding_backends
+from utils.embedding_backends import EmbeddingBackend
+
+
+class WordsBackend(EmbeddingBackend):
+    """Hashed bag of words: the same question always gets the same unit vector."""
+
+    name = "test-words"
+    model_name = "test-words"
+    dimension = 64
+
+    def __call__(self, texts):
+        vectors = []
+        for text in texts:
+            vector = np.zeros(self.dimension, dtype=np.float32)
+            for word in text.lower().split():
+                digest = hashlib.md5(word.strip("?!.,").encode("utf-8")).digest()
+                vector[int.from_bytes(digest[:4], "little") % self.dimension] += 1.0
+            vectors.append((vector / (np.linalg.norm(vector) or 1.0)).tolist())
+        return vectors
+
+
+@contextlib.contextmanager
+def memory_agent_module(partitioning="none", workdir=None):
+    """
+    agents.memory_agent imported in `workdir` (default: a temporary
+    directory; its store lives in ./memory_store) with the words backend and
+    writes committed inline. The module, backend registration, environment
+    and cwd are restored afterwards.
+    """
+    env = {
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY") or "sk-test",
+        "ECHOATLAS_EMBEDDING_BACKEND": WordsBackend.name,
+        "ECHOATLAS_MEMORY_PARTITIONING": partitioning,
+        "ECHOATLAS_WRITE_BEHIND": "0",
+    }
+    saved_env = {name: os.environ.get(name) for name in env}
+    saved_module = sys.modules.pop("agents.memory_agent", None)
+    cwd = os.getcwd()
+    with contextlib.nullcontext(workdir) if workdir else tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ.update(env)
+        embedding_backends.EMBEDDING_BACKENDS[WordsBackend.name] = WordsBackend
+        try:
+            module = importlib.import_module("agents.memory_agent")
+            try:
+                yield module
+            finally:
+                module._index.close()
+                module._embedding_cache.close()
+        finally:
+            sys.modules.pop("agents.memory_agent", None)
+            if saved_module is not None:
+                sys.modules["agents.memory_agent"] = saved_module
+            del embedding_backends.EMBEDDING_BACKENDS[WordsBackend.name]
+            for name, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            # Chroma caches clients by path, and every store here is ./memory_store
+            SharedSystemClient.clear_system_cache()
+            os.chdir(cwd)
+
+
+def record(memory_id, phrase, timestamp, answer="", region="Japan", location="Tokyo", mode="Text", context="default"):
+    """A queued interaction, shaped as store_interaction() journals it."""
+    return {
+        "id": memory_id,
+        "document": phrase,
+        "metadata": {
+            "region": region,
+            "location": location,
+            "mode": mode,
+            "context": context,
+            "field": "phrase",
+            "phrase": phrase,
+            "answer": answer,
+            "answered_at": timestamp if answer else "",
+            "tone": "Warm",
+            "gesture": "🙏",
+            "custom": "",
+            "timestamp": timestamp,
+            "count": 1,
+            "last_seen": timestamp,
+        },
+    }
+
+
+def stored(agent, memory_id):
+    collection = agent._router.for_write("Japan", "Tokyo")
+    raw = collection.get(ids=[memory_id], include=["metadatas"])
+    return raw["metadatas"][0] if raw["ids"] else None
+
+
+def test_every_scope_filters_on_one_precomputed_key():
+    with memory_agent_module() as agent:
+        where = agent._build_where
+        assert where("") == where(None, "Tokyo", "Text") == {}
+        assert where("Japan") == {"scope_region": {"$eq": "Japan"}}
+        assert where("Japan", mode="Mic") == {"scope_region_mode": {"$eq": "Japan|Mic"}}
+        assert where("Japan", context="business") == {"scope_region_context": {"$eq": "Japan|business"}}
+        assert where("Japan", mode="Mic", context="business") == {
+            "scope_region_mode_context": {"$eq": "Japan|Mic|business"}
+        }
+        assert where("Japan", "Tokyo") == {"scope_location": {"$eq": "Japan|Tokyo"}}
+        assert where("Japan", "Tokyo", "Mic") == {"scope_location_mode": {"$eq": "Japan|Tokyo|Mic"}}
+        assert where("Japan", "Tokyo", context="business") == {
+            "scope_location_context": {"$eq": "Japan|Tokyo|business"}
+        }
+        assert where("Japan", "Tokyo", "Mic", "business") == {"scope": {"$eq": "Japan|Tokyo|Mic|business"}}
+
+        # Each key selects exactly the memories of its scope
+        agent._commit_batch(
+            [
+                record("text", "How do I bow?", "2025-01-01T10:00:00"),
+                record("mic", "Should I tip?", "2025-01-01T10:01:00", mode="Mic"),
+                record("business", "Business cards?", "2025-01-01T10:02:00", context="business"),
+                record("osaka-mic", "Where is the station?", "2025-01-01T10:03:00", location="Osaka", mode="Mic"),
+            ]
+        )
+        collection = agent._router.for_write("Japan", "Tokyo")
+
+        def ids(**scope):
+            return sorted(collection.get(where=where("Japan", **scope))["ids"])
+
+        assert ids() == ["business", "mic", "osaka-mic", "text"]
+        assert ids(mode="Mic") == ["mic", "osaka-mic"]
+        assert ids(location="Tokyo", mode="Mic") == ["mic"]
+        assert ids(context="business") == ["business"]
+        assert ids(location="Tokyo", mode="Text", context="default") == ["text"]
+
+
+def test_scope_values_are_nfkc_normalized_and_trimmed():
+    with memory_agent_module() as agent:
+        # Full-width letters and no-break spaces fold to their plain forms
+        assert agent._canonical("\u00a0Ｔｏｋｙｏ ") == "Tokyo"
+        assert agent.canonical_scope(" Japan 🇯🇵", "Tokyo\u00a0") == ("Japan", "Tokyo")
+        assert agent._build_where("Ｊａｐａｎ ", " Tokyo", "Text", "default") == agent._build_where(
+            "Japan", "Tokyo", "Text", "default"
+        )
+
+        agent._commit_batch([record("bow", "How do I bow?", "2025-01-01T10:00:00", region="  Ｊａｐａｎ")])
+        assert [m["id"] for m in agent.list_memories("Japan", "Tokyo")[0]] == ["bow"]
+
+
+def test_memories_without_scope_keys_are_migrated_on_open():
+    with memory_agent_module() as agent:
+        collection = agent._router.for_write("Japan", "Tokyo")
+        # A store written before scope keys: plain metadata, older version stamp
+        legacy = dict(record("old", "How do I bow?", "2025-01-01")["metadata"])
+        legacy["location"] = "Tokyo\u00a0"
+        collection.add(ids=["old"], embeddings=agent._embedder(["How do I bow?"]), metadatas=[legacy])
+        collection.modify(metadata={**collection.metadata, "scope_keys_version": 1})
+        assert collection.get(where=agent._build_where("Japan", "Tokyo"))["ids"] == []
+
+        agent._on_collection_open(collection)
+
+        assert collection.metadata["scope_keys_version"] == agent.SCOPE_KEYS_VERSION
+        for scope in ({}, {"mode": "Text"}, {"location": "Tokyo", "context": "default"}):
+            assert collection.get(where=agent._build_where("Japan", **scope))["ids"] == ["old"]
+        # The index is keyed on the migrated, canonical location
+        assert agent._index.count("Japan", "Tokyo") == 1
+
+
+def test_startup_sync_checks_partitions_against_the_index_lazily():
+    with tempfile.TemporaryDirectory() as workdir:
+        with memory_agent_module("region", workdir) as agent:
+            for region in ("Japan", "France", "Spain"):
+                agent._commit_batch([record(region.lower(), "Hello?", "2025-01-01T10:00:00", region=region)])
+            # Drift while the app was down: the index lost Spain, the store lost
+            # France, and Japan got a memory the index never saw
+            agent._index.remove_scope("Spain")
+            names = {region: agent._router.for_write(region, "").name for region in ("Japan", "France")}
+            agent._client.delete_collection(names["France"])
+            agent._router.for_write("Japan", "").add(
+                ids=["unindexed"],
+                embeddings=agent._embedder(["Konnichiwa?"]),
+                metadatas=[agent._with_scope_keys(record("unindexed", "Konnichiwa?", "2025-01-02")["metadata"])],
+            )
+
+        with memory_agent_module("region", workdir) as agent:
+            # Only the partition the index had never seen was opened at import
+            assert agent._router.stats()["opened"] == 1
+            assert agent.list_all_regions() == ["Japan", "Spain"]
+            assert agent._index.count("Japan") == 1
+
+            # Opening Japan compares its row count with the index and resyncs it
+            agent._router.for_read("Japan")
+            assert agent._index.count("Japan") == 2
+            assert {m["id"] for m in agent.list_memories("Japan", "Tokyo")[0]} == {"japan", "unindexed"}
+
+
+def test_repeats_in_one_batch_fold_into_the_first_occurrence():
+    with memory_agent_module() as agent:
+        agent._commit_batch(
+            [
+                record("bow-1", "How do I bow?", "2025-01-01T10:00:00"),
+                record("bow-2", "How do I bow?", "2025-01-01T10:05:00", answer="Bow from the waist."),
+                record("tip-1", "Should I tip?", "2025-01-01T10:06:00"),
+            ],
+            dedupe=True,
+        )
+
+        bow = stored(agent, "bow-1")
+        assert stored(agent, "bow-2") is None
+        assert (bow["count"], bow["last_seen"], bow["answer"]) == (2, "2025-01-01T10:05:00", "Bow from the waist.")
+        assert agent.count_memories("Japan", "Tokyo") == 2
+        assert agent._dedupe_stats["deduplicated"] == 1
+
+
+def test_repeat_of_a_stored_memory_updates_it_and_its_index_rows():
+    with memory_agent_module() as agent:
+        agent._commit_batch([record("bow-1", "How do I bow?", "2025-01-01T10:00:00", answer="Just nod.")], dedupe=True)
+        [before] = agent.memory_scope_stats("Japan")
+
+        agent._commit_batch(
+            [record("bow-2", "How do I bow?", "2025-01-03T09:00:00", answer="Bow from the waist.")], dedupe=True
+        )
+
+        bow = stored(agent, "bow-1")
+        assert stored(agent, "bow-2") is None
+        assert (bow["count"], bow["last_seen"]) == (2, "2025-01-03T09:00:00")
+        assert (bow["answer"], bow["answered_at"]) == ("Bow from the waist.", "2025-01-03T09:00:00")
+        # The full-text row follows the newest answer
+        assert [i for i, _ in agent._index.search("waist", "Japan")] == ["bow-1"]
+        assert agent._index.search("nod", "Japan") == []
+        # The scope shows the repeat as activity without a new memory
+        [after] = agent.memory_scope_stats("Japan")
+        assert before["last_timestamp"] == "2025-01-01T10:00:00"
+        assert (after["memory_count"], after["occurrences"], after["last_timestamp"]) == (
+            1,
+            2,
+            "2025-01-03T09:00:00",
+        )
+
+
+def test_journal_replays_are_not_counted_twice():
+    with memory_agent_module() as agent:
+        first = record("bow-1", "How do I bow?", "2025-01-01T10:00:00")
+        repeat = record("bow-2", "How do I bow?", "2025-01-02T10:00:00")
+        agent._commit_batch([first], dedupe=True)
+
+        # Replay of an id that was already committed: skipped, not a repeat of itself
+        agent._commit_batch([first], dedupe=True)
+        assert stored(agent, "bow-1")["count"] == 1
+
+        agent._commit_batch([repeat], dedupe=True)
+        # Replay of a repeat that was already folded in: last_seen is already past it
+        agent._commit_batch([repeat], dedupe=True)
+        bow = stored(agent, "bow-1")
+        assert (bow["count"], bow["last_seen"]) == (2, "2025-01-02T10:00:00")
+        assert agent.memory_scope_stats("Japan")[0]["occurrences"] == 2
+
+
+def test_repeats_do_not_merge_across_scope_or_mode():
+    with memory_agent_module() as agent:
+        agent._commit_batch(
+            [
+                record("text", "How do I bow?", "2025-01-01T10:00:00"),
+                record("mic", "How do I bow?", "2025-01-01T10:01:00", mode="Mic"),
+                record("business", "How do I bow?", "2025-01-01T10:02:00", context="business"),
+                record("osaka", "How do I bow?", "2025-01-01T10:03:00", location="Osaka"),
+            ],
+            dedupe=True,
+        )
+        agent._commit_batch([record("mic-2", "How do I bow?", "2025-01-02T10:00:00", mode="Mic")], dedupe=True)
+
+        assert agent.count_memories("Japan") == 4
+        assert stored(agent, "text")["count"] == 1
+        assert stored(agent, "mic")["count"] == 2
+        assert agent._dedupe_stats["deduplicated"] == 1
+
+
+def test_store_and_wait_gives_up_after_a_timeout():
+    with memory_agent_module() as agent:
+        flushes = []
+        agent._writer = types.SimpleNamespace(
+            submit=lambda record: None,
+            flush=lambda timeout=None: flushes.append(timeout) or False,
+        )
+        memory = agent.store_interaction("Japan", "Tokyo", "How do I bow?", "Warm", "🙏", "", wait=True)
+
+        assert flushes == [agent.STORE_WAIT_TIMEOUT]
+        assert memory["phrase"] == "How do I bow?"
+
+
+def main():
+    test_every_scope_filters_on_one_precomputed_key()
+    test_scope_values_are_nfkc_normalized_and_trimmed()
+    test_memories_without_scope_keys_are_migrated_on_open()
+    test_startup_sync_checks_partitions_against_the_index_lazily()
+    test_repeats_in_one_batch_fold_into_the_first_occurrence()
+    test_repeat_of_a_stored_memory_updates_it_and_its_index_rows()
+    test_journal_replays_are_not_counted_twice()
+    test_repeats_do_not_merge_across_scope_or_mode()
+    test_store_and_wait_gives_up_after_a_timeout()
+    print("✅ All memory agent tests passed.")
+
+
+if __name__ == "__main__":
+    main()
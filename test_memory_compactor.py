@@ -0,0 +1,120 @@
+"""
+Test folding old memories into digest records (no store or LLM needed).
+Run: python test_memory_compactor.py
+"""
+
+import datetime
+import threading
+
+from agents.memory_compactor import (
+    CompactionJob,
+    build_digest,
+    compaction_cutoff,
+    compaction_report,
+    digest_id,
+    plan_compaction,
+)
+
+NOW = datetime.datetime(2026, 6, 1)
+
+
+def memory(memory_id, phrase, days_ago, tone="Polite", gesture="🙏", custom="Greet first.", **extra):
+    timestamp = (NOW - datetime.timedelta(days=days_ago)).isoformat()
+    return {
+        "id": memory_id,
+        "region": "Japan",
+        "location": "Tokyo",
+        "mode": "Text",
+        "context": "default",
+        "phrase": phrase,
+        "answer": f"Answer {memory_id}. More detail follows.",
+        "tone": tone,
+        "gesture": gesture,
+        "custom": custom,
+        "timestamp": timestamp,
+        "count": 1,
+        "last_seen": timestamp,
+        **extra,
+    }
+
+
+def test_digest_keeps_main_questions_tones_and_tips():
+    memories = [
+        memory("a", "Where is the subway?", 200, count=3),
+        memory("b", "where is the  subway?", 150),
+        memory("c", "How do I tip?", 120, tone="Formal", custom="Do not tip."),
+        memory("d", "Is bowing expected?", 100),
+    ]
+    digest = build_digest(memories)
+
+    assert digest["kind"] == "digest"
+    # Repeats are merged under their newest wording
+    assert digest["phrase"].splitlines()[0] == "where is the  subway?"
+    assert len(digest["phrase"].splitlines()) == 3
+    assert (digest["tone"], digest["gesture"], digest["custom"]) == ("Polite", "🙏", "Greet first.")
+    assert "Tip: Do not tip." in digest["answer"]
+    assert "where is the  subway? → Answer b." in digest["answer"]
+    assert (digest["count"], digest["digest_of"]) == (6, 4)
+    assert digest["first_seen"] < digest["timestamp"] == memories[-1]["timestamp"]
+
+
+def test_summarizer_replaces_answer_and_failures_fall_back():
+    memories = [memory("a", "Q1", 100), memory("b", "Q2", 100)]
+    assert build_digest(memories, summarize=lambda mems, d: "Short digest.")["answer"] == "Short digest."
+
+    def broken(mems, d):
+        raise RuntimeError("offline")
+
+    assert build_digest(memories, summarize=broken)["answer"].startswith("Digest of 2 conversations")
+
+
+def test_plan_groups_old_memories_per_scope():
+    cutoff = compaction_cutoff(90, now=NOW)
+    memories = [
+        memory("old-1", "Q1", 120),
+        memory("old-2", "Q2", 100),
+        memory("old-3", "Q3", 95),
+        # Stored long ago but asked again recently: stays
+        memory("repeat", "Q4", 300, last_seen=(NOW - datetime.timedelta(days=2)).isoformat()),
+        memory("new", "Q5", 10),
+        # Another scope with too few old memories to be worth a digest
+        memory("mic-1", "Q6", 120, mode="Mic"),
+    ]
+    plans = plan_compaction(memories, cutoff, dimension=16, min_group=3)
+
+    assert len(plans) == 1
+    assert plans[0]["scope"]["mode"] == "Text"
+    assert plans[0]["ids"] == ["old-1", "old-2", "old-3"]
+    assert plans[0]["digest_id"] == digest_id(["old-3", "old-1", "old-2"])
+
+    report = compaction_report(plans, dry_run=True, cutoff=cutoff)
+    assert (report["memories_folded"], report["digests"], report["rows_reclaimed"]) == (3, 1, 2)
+    assert report["bytes_reclaimed"] > 0
+
+
+def test_job_runs_on_its_own_thread_and_records_reports():
+    ran = threading.Event()
+
+    def run():
+        ran.set()
+        return {"dry_run": False, "digests": 1, "scopes": [{}]}
+
+    job = CompactionJob(run, interval_seconds=0.01)
+    job.start()
+    assert ran.wait(2)
+    job.stop(timeout=2)
+    stats = job.stats()
+    assert not stats["running"] and stats["runs"] >= 1
+    assert stats["last_report"] == {"dry_run": False, "digests": 1}
+
+
+def main():
+    test_digest_keeps_main_questions_tones_and_tips()
+    test_summarizer_replaces_answer_and_failures_fall_back()
+    test_plan_groups_old_memories_per_scope()
+    test_job_runs_on_its_own_thread_and_records_reports()
+    print("✅ All memory compactor tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Test the SQLite sidecar index behind list_memories() and friends.
+Run: python test_memory_index.py
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from agents.memory_index import MemoryIndex, reciprocal_rank_fusion
+
+
+def make_index(tmp):
+    return MemoryIndex(os.path.join(tmp, "memory_index.sqlite3"))
+
+
+def record(memory_id, region, location, timestamp, mode="Text", context="default", phrase="", answer=""):
+    return {
+        "id": memory_id,
+        "region": region,
+        "location": location,
+        "mode": mode,
+        "context": context,
+        "timestamp": timestamp,
+        "phrase": phrase,
+        "answer": answer,
+    }
+
+
+def test_pages_are_newest_first_and_scoped():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add(
+            record(f"ny-{i}", "United States", "New York", f"2025-01-0{i}T10:00:00")
+            for i in range(1, 8)
+        )
+        index.add([record("ch-1", "Tamil Nadu", "Chennai", "2025-01-09T10:00:00")])
+
+        seen, cursor = [], None
+        while True:
+            ids, cursor = index.page("United States", "New York", limit=3, cursor=cursor)
+            seen.extend(ids)
+            if cursor is None:
+                break
+
+        assert seen == [f"ny-{i}" for i in range(7, 0, -1)]
+        assert index.page("United States", "New York", limit=2, offset=2)[0] == ["ny-5", "ny-4"]
+        assert index.count("United States") == 7
+        assert index.count("Tamil Nadu", "Chennai") == 1
+        assert index.count() == 8
+        index.close()
+
+
+def test_cursor_breaks_timestamp_ties_by_id():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add(record(f"id-{i}", "Chennai", "", "2025-01-01T00:00:00") for i in range(5))
+
+        first, cursor = index.page("Chennai", limit=2)
+        rest, end = index.page("Chennai", limit=10, cursor=cursor)
+
+        assert first + rest == ["id-4", "id-3", "id-2", "id-1", "id-0"]
+        assert end is None
+        index.close()
+
+
+def test_after_watermark_lists_only_newer_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        assert index.latest_cursor("Japan", "Tokyo") is None
+        index.add(record(f"tk-{i}", "Japan", "Tokyo", f"2025-03-0{i}") for i in range(1, 4))
+        watermark = index.latest_cursor("Japan", "Tokyo")
+        assert watermark == "2025-03-03|tk-3"
+
+        index.add(record(f"tk-{i}", "Japan", "Tokyo", f"2025-03-0{i}") for i in range(4, 6))
+        assert index.page("Japan", "Tokyo", after=watermark)[0] == ["tk-5", "tk-4"]
+        assert index.page("Japan", "Tokyo", after=index.latest_cursor("Japan", "Tokyo"))[0] == []
+        index.close()
+
+
+def test_remove_and_rebuild():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add([record("a", "France", "Paris", "2025-01-01"), record("b", "France", "Lyon", "2025-01-02")])
+        index.remove(["a"])
+        assert index.page("France")[0] == ["b"]
+
+        assert index.rebuild([record("c", "Japan", "Tokyo", "2025-01-03")]) == 1
+        assert index.count("France") == 0
+        assert index.page("Japan", "Tokyo")[0] == ["c"]
+        index.close()
+
+
+def test_scope_counters_follow_writes_and_deletes():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add(record(f"ch-{i}", "Tamil Nadu", "Chennai", f"2025-01-0{i}") for i in range(1, 4))
+        index.add([record("md-1", "Tamil Nadu", "Madurai", "2025-01-05", mode="Mic")])
+        index.add([record("tk-1", "Japan", "Tokyo", "2025-01-06")])
+
+        assert index.regions() == ["Japan", "Tamil Nadu"]
+        assert index.locations("Tamil Nadu") == ["Chennai", "Madurai"]
+        chennai = index.scopes("Tamil Nadu", "Chennai")
+        assert chennai[0]["memory_count"] == 3
+        assert chennai[0]["last_timestamp"] == "2025-01-03"
+
+        # Re-adding an id moves it between scopes instead of double counting
+        index.add([record("ch-3", "Tamil Nadu", "Madurai", "2025-01-07", mode="Mic")])
+        assert index.count("Tamil Nadu", "Chennai") == 2
+        assert index.count("Tamil Nadu", "Madurai", mode="Mic") == 2
+
+        assert index.remove_scope("Tamil Nadu", "Madurai") == 2
+        assert index.locations("Tamil Nadu") == ["Chennai"]
+        index.remove(["ch-1", "ch-2"])
+        assert index.regions() == ["Japan"]
+        assert index.count() == 1
+        index.close()
+
+
+def test_repeats_update_scope_occurrences_and_last_activity():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add([record("bow", "Japan", "Tokyo", "2025-01-01"), record("tip", "Japan", "Tokyo", "2025-01-02")])
+
+        # Store-time dedupe folds a repeat into "bow": count and last_seen move, no new row
+        index.add([{**record("bow", "Japan", "Tokyo", "2025-01-01"), "count": 2, "last_seen": "2025-01-05"}])
+        [tokyo] = index.scopes("Japan", "Tokyo")
+        assert (tokyo["memory_count"], tokyo["occurrences"], tokyo["last_timestamp"]) == (2, 3, "2025-01-05")
+        assert index.occurrences("Japan", "Tokyo") == 3 and index.occurrences("France") == 0
+
+        index.remove(["bow"])
+        [tokyo] = index.scopes("Japan", "Tokyo")
+        assert (tokyo["memory_count"], tokyo["occurrences"]) == (1, 1)
+        index.close()
+
+
+def test_ids_before_lists_old_rows_oldest_first():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add(record(f"pa-{i}", "France", "Paris", f"2025-0{i}-01") for i in range(1, 5))
+        index.add([record("ly-1", "France", "Lyon", "2025-01-01")])
+
+        assert index.ids_before("France", "Paris", before="2025-03-01") == ["pa-1", "pa-2"]
+        assert index.ids_before("France", before="2025-02-01") == ["ly-1", "pa-1"]
+        assert index.ids_before("France", "Paris", mode="Mic", before="2026-01-01") == []
+        index.close()
+
+
+def test_keyword_search_is_scoped_and_follows_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add(
+            [
+                record("sub", "United States", "New York", "2025-01-01", phrase="Where is the subway?"),
+                record("tip", "United States", "New York", "2025-01-02", phrase="How much to tip?",
+                       answer="Tip 20% and take the subway home."),
+                record("bus", "Tamil Nadu", "Chennai", "2025-01-03", phrase="Bus stop enga iruku?"),
+            ]
+        )
+
+        assert [i for i, _ in index.search("subway", "United States", "New York")] == ["sub", "tip"]
+        assert [i for i, _ in index.search("subway", "United States", phrase_only=True)] == ["sub"]
+        assert [i for i, _ in index.search("ENGA", "Tamil Nadu")] == ["bus"]
+        assert index.search("enga", "United States") == []
+        # Words match as prefixes; match_all needs every word
+        assert [i for i, _ in index.search("subw where", "United States", match_all=True)] == ["sub"]
+        assert index.search("?!", "United States") == []
+
+        index.add([record("sub", "United States", "New York", "2025-01-01", phrase="Where is the metro?")])
+        assert [i for i, _ in index.search("subway", "United States", phrase_only=True)] == []
+        index.remove(["tip"])
+        assert index.search("tip", "United States") == []
+        index.rebuild([record("bus", "Tamil Nadu", "Chennai", "2025-01-03", phrase="Bus stop enga iruku?")])
+        assert [i for i, _ in index.search("bus", "Tamil Nadu", "Chennai")] == ["bus"]
+        index.close()
+
+
+def test_text_columns_added_to_older_index_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory_index.sqlite3")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE memories (id TEXT PRIMARY KEY, region TEXT NOT NULL, location TEXT NOT NULL, "
+            "mode TEXT NOT NULL, context TEXT NOT NULL, timestamp TEXT NOT NULL)"
+        )
+        conn.execute("INSERT INTO memories VALUES ('a', 'France', 'Paris', 'Text', 'default', '2025-01-01')")
+        conn.commit()
+        conn.close()
+
+        index = MemoryIndex(path)
+        # Rows without text must be rebuilt from the store before search can see them
+        assert index.stale and index.count("France") == 1
+        index.rebuild([record("a", "France", "Paris", "2025-01-01", phrase="Bonjour?")])
+        assert not index.stale
+        assert [i for i, _ in index.search("bonjour", "France")] == ["a"]
+        index.close()
+        assert not MemoryIndex(path).stale
+
+
+def test_count_columns_added_to_older_index_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add([record("a", "France", "Paris", "2025-01-01")])
+        # Simulate an index written before memories carried count / last_seen
+        index._conn.executescript(
+            """
+            DROP TRIGGER trg_memories_insert;
+            DROP TRIGGER trg_memories_update;
+            DROP TRIGGER trg_memories_delete;
+            ALTER TABLE memories DROP COLUMN count;
+            ALTER TABLE memories DROP COLUMN last_seen;
+            ALTER TABLE scopes DROP COLUMN occurrences;
+            PRAGMA user_version = 2;
+            """
+        )
+        index.close()
+
+        reopened = make_index(tmp)
+        # Counts live in the store: the rows must be rebuilt, but the counters stay usable
+        assert reopened.stale and reopened.scopes("France")[0]["occurrences"] == 1
+        reopened.rebuild([{**record("a", "France", "Paris", "2025-01-01"), "count": 3, "last_seen": "2025-01-04"}])
+        assert not reopened.stale
+        [paris] = reopened.scopes("France")
+        assert (paris["occurrences"], paris["last_timestamp"]) == (3, "2025-01-04")
+        reopened.close()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+    assert sorted(fused, key=fused.get, reverse=True) == ["a", "c", "b"]
+    assert fused["b"] == 1 / 62
+
+
+def test_scope_counters_backfilled_for_older_index_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = make_index(tmp)
+        index.add(record(f"fr-{i}", "France", "Paris", f"2025-02-0{i}") for i in range(1, 3))
+        # Simulate an index written before the scopes table existed
+        index._conn.execute("DELETE FROM scopes")
+        index._conn.execute("PRAGMA user_version = 0")
+        index._conn.commit()
+        index.close()
+
+        reopened = make_index(tmp)
+        assert reopened.count("France", "Paris") == 2
+        assert reopened.regions() == ["France"]
+        reopened.close()
+
+
+def main():
+    test_pages_are_newest_first_and_scoped()
+    test_cursor_breaks_timestamp_ties_by_id()
+    test_after_watermark_lists_only_newer_rows()
+    test_remove_and_rebuild()
+    test_repeats_update_scope_occurrences_and_last_activity()
+    test_ids_before_lists_old_rows_oldest_first()
+    test_keyword_search_is_scoped_and_follows_writes()
+    test_text_columns_added_to_older_index_files()
+    test_count_columns_added_to_older_index_files()
+    test_reciprocal_rank_fusion_rewards_agreement()
+    test_scope_counters_follow_writes_and_deletes()
+    test_scope_counters_backfilled_for_older_index_files()
+    print("✅ All memory index tests passed.")
+
+
+if __name__ == "__main__":
+    main()
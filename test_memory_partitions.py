@@ -0,0 +1,126 @@
+"""
+Test routing memory scopes to partitioned Chroma collections.
+Run: python test_memory_partitions.py
+"""
+
+import tempfile
+
+import chromadb
+
+from agents.memory_partitions import CollectionRouter, partition_key, partition_name
+
+LOCATIONS = {"United States": ["New York", "Seattle"], "Tamil Nadu": ["Chennai"]}
+
+
+def make_router(layout, client=None, **kwargs):
+    client = client or chromadb.PersistentClient(path=tempfile.mkdtemp(prefix="echoatlas-partitions-"))
+    return CollectionRouter(
+        client,
+        "echoatlas_memory__test",
+        layout=layout,
+        locations=lambda region: LOCATIONS.get(region, []),
+        **kwargs,
+    )
+
+
+def add(router, region, location, memory_id):
+    router.for_write(region, location).upsert(
+        ids=[memory_id],
+        documents=[memory_id],
+        embeddings=[[1.0, 0.0]],
+        metadatas=[{"region": region, "location": location}],
+    )
+
+
+def test_partition_names():
+    assert partition_key("none", "Japan", "Tokyo") == ""
+    assert partition_key("region", "Japan", "Tokyo") == "Japan"
+    assert partition_key("location", "Japan", "Tokyo") == "Japan|Tokyo"
+    assert partition_name("echoatlas_memory", "") == "echoatlas_memory"
+    name = partition_name("echoatlas_memory", "Tamil Nadu|Chennai")
+    assert name.startswith("echoatlas_memory.") and " " not in name
+
+
+def test_location_layout_routes_scopes_to_their_own_collections():
+    router = make_router("location")
+    add(router, "United States", "New York", "ny")
+    add(router, "United States", "Seattle", "sea")
+    add(router, "Tamil Nadu", "Chennai", "che")
+
+    ny = router.for_read("United States", "New York")
+    assert [c.get()["ids"] for c in ny] == [["ny"]]
+    region_wide = router.for_read("United States")
+    assert sorted(i for c in region_wide for i in c.get()["ids"]) == ["ny", "sea"]
+
+    # Reads never create partitions
+    assert router.for_read("Japan", "Tokyo") == []
+    assert router.count() == 3
+
+    assert not make_router("region").drop("United States", "Seattle")
+    assert router.drop("United States", "Seattle")
+    assert router.count() == 2
+    router.drop_all()
+    assert router.count() == 0
+
+
+def test_region_layout_and_handle_eviction():
+    router = make_router("region", max_open=1)
+    add(router, "United States", "New York", "ny")
+    add(router, "United States", "Seattle", "sea")
+    add(router, "Tamil Nadu", "Chennai", "che")
+
+    assert len(router.all()) == 2
+    assert sorted(router.for_read("United States", "Seattle")[0].get()["ids"]) == ["ny", "sea"]
+    stats = router.stats()
+    assert stats["open"] == 1
+    assert stats["evicted"] >= 2
+
+
+def test_all_opens_partitions_through_on_open():
+    router = make_router("location")
+    add(router, "United States", "New York", "ny")
+    add(router, "Tamil Nadu", "Chennai", "che")
+
+    # A fresh router (e.g. after a restart) has no handles open yet
+    opened = []
+    restarted = make_router("location", client=router.client, on_open=lambda c: opened.append(c.name))
+    collections = restarted.all()
+
+    assert sorted(c.name for c in collections) == sorted(opened)
+    assert len(opened) == 2
+    assert restarted.stats()["open"] == 2
+    # The handles are cached, so later reads do not open them again
+    restarted.for_read("Tamil Nadu", "Chennai")
+    assert len(opened) == 2
+
+
+def test_names_lists_partitions_without_opening_them():
+    router = make_router("region")
+    add(router, "United States", "New York", "ny")
+    add(router, "Tamil Nadu", "Chennai", "che")
+    # Another store (layout) sharing the client is not listed
+    make_router("none", client=router.client, metadata={"embedding_backend": "test"}).for_write("Japan", "Tokyo")
+
+    opened = []
+    restarted = make_router("region", client=router.client, on_open=lambda c: opened.append(c.name))
+    names = restarted.names()
+
+    assert sorted(names) == sorted(
+        partition_name("echoatlas_memory__test", key) for key in ("United States", "Tamil Nadu")
+    )
+    assert opened == [] and restarted.stats()["open"] == 0
+    assert restarted.open(names[0]).name == names[0] and opened == [names[0]]
+    assert restarted.open("echoatlas_memory__test.0000000000000000") is None
+
+
+def main():
+    test_partition_names()
+    test_location_layout_routes_scopes_to_their_own_collections()
+    test_region_layout_and_handle_eviction()
+    test_all_opens_partitions_through_on_open()
+    test_names_lists_partitions_without_opening_them()
+    print("✅ All memory partition tests passed.")
+
+
+if __name__ == "__main__":
+    main()
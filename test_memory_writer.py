@@ -0,0 +1,160 @@
+"""
+Test the write-behind queue that batches memory ingestion.
+Run: python test_memory_writer.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+from agents.memory_writer import WriteBehindQueue
+
+
+class RecordingStore:
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.fail_times = fail_times
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, batch):
+        self.release.wait()
+        if self.fail_times:
+            self.fail_times -= 1
+            raise RuntimeError("store unavailable")
+        self.batches.append([r["id"] for r in batch])
+
+
+def record(memory_id):
+    return {"id": memory_id, "document": f"phrase {memory_id}", "metadata": {"region": "Chennai"}}
+
+
+def test_submits_are_batched_and_flushed():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore()
+        store.release.clear()
+        writer = WriteBehindQueue(
+            store, os.path.join(tmp, "journal.jsonl"), max_batch_size=4, max_latency=0.2
+        )
+        for i in range(10):
+            writer.submit(record(f"m{i}"))
+        store.release.set()
+
+        assert writer.flush(timeout=5)
+        assert sum(store.batches, []) == [f"m{i}" for i in range(10)]
+        assert all(len(b) <= 4 for b in store.batches)
+        assert len(store.batches) < 10
+        assert writer.stats["committed"] == 10
+        writer.close()
+
+
+def test_failed_batches_are_retried():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore(fail_times=2)
+        writer = WriteBehindQueue(
+            store, os.path.join(tmp, "journal.jsonl"), max_latency=0.05, retry_backoff=0.01
+        )
+        writer.submit(record("a"))
+
+        assert writer.flush(timeout=5)
+        assert store.batches == [["a"]]
+        assert writer.stats["failures"] == 2
+        writer.close()
+
+
+def test_batches_that_keep_failing_are_dead_lettered():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+        dead_letters = os.path.join(tmp, "dead.jsonl")
+        store = RecordingStore(fail_times=10**9)
+        writer = WriteBehindQueue(
+            store,
+            journal,
+            max_latency=0.05,
+            retry_backoff=0.01,
+            max_retries=2,
+            dead_letter_path=dead_letters,
+        )
+        writer.submit(record("a"))
+
+        # The queue drains instead of blocking forever, but stays flagged as failing
+        assert writer.flush(timeout=5)
+        assert writer.failing
+        assert writer.stats["failures"] == 3
+        assert writer.stats["dead_lettered"] == 1
+        assert writer.stats["committed"] == 0
+        with open(dead_letters, encoding="utf-8") as f:
+            assert '"id": "a"' in f.read()
+
+        # A later batch that commits clears the failing state
+        store.fail_times = 0
+        writer.submit(record("b"))
+        assert writer.flush(timeout=5)
+        assert not writer.failing
+        assert store.batches == [["b"]]
+        writer.close()
+
+        # Dead-lettered records are acknowledged, so a restart does not replay them
+        restarted = WriteBehindQueue(RecordingStore(), journal, max_latency=0.05)
+        assert restarted.stats["replayed"] == 0
+        restarted.close()
+
+
+def test_unacknowledged_records_are_replayed_after_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+        # A previous process journaled three writes but only committed one
+        with open(journal, "w", encoding="utf-8") as f:
+            f.write('{"op": "put", "record": {"id": "a", "document": "x", "metadata": {}}}\n')
+            f.write('{"op": "put", "record": {"id": "b", "document": "y", "metadata": {}}}\n')
+            f.write('{"op": "ack", "ids": ["a"]}\n')
+            f.write('{"op": "put", "record": {"id": "c", "document": "z", "metadata": {}}}\n')
+            f.write('{"op": "put", "record": {"id": "d", "docu')
+
+        store = RecordingStore()
+        writer = WriteBehindQueue(store, journal, max_latency=0.05)
+
+        assert writer.flush(timeout=5)
+        assert sum(store.batches, []) == ["b", "c"]
+        assert writer.stats["replayed"] == 2
+        writer.close()
+        assert os.path.getsize(journal) == 0
+
+
+def test_batch_failing_at_shutdown_survives_a_later_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = os.path.join(tmp, "journal.jsonl")
+
+        def store(batch):
+            if any(r["id"] == "poison" for r in batch):
+                raise RuntimeError("store unavailable")
+
+        writer = WriteBehindQueue(store, journal, max_latency=0.01, retry_backoff=60)
+        writer.submit(record("poison"))
+        while not writer.failing:
+            time.sleep(0.01)
+        writer.submit(record("ok"))
+        # Shutdown gives up on "poison", then commits "ok": the journal must keep "poison"
+        writer.close(timeout=0.2)
+        writer._worker.join(timeout=5)
+
+        restarted_store = RecordingStore()
+        restarted = WriteBehindQueue(restarted_store, journal, max_latency=0.01)
+        assert restarted.flush(timeout=5)
+        assert restarted_store.batches == [["poison"]]
+        restarted.close()
+        assert os.path.getsize(journal) == 0
+
+
+def main():
+    test_submits_are_batched_and_flushed()
+    test_failed_batches_are_retried()
+    test_batches_that_keep_failing_are_dead_lettered()
+    test_unacknowledged_records_are_replayed_after_restart()
+    test_batch_failing_at_shutdown_survives_a_later_commit()
+    print("✅ All memory writer tests passed.")
+
+
+if __name__ == "__main__":
+    main()
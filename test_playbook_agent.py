@@ -0,0 +1,187 @@
+"""
+Test that cultural playbooks are reused, updated from new memories only, or
+rebuilt (no OpenAI call or Chroma store needed).
+Run: python test_playbook_agent.py
+"""
+
+import contextlib
+import importlib
+import os
+import sys
+import tempfile
+import types
+
+import agents
+
+FULL_PLAYBOOK = {
+    "communication_style": {"tone_overview": "Warm"},
+    "emerging_patterns_from_memory": {"common_questions": ["Greetings"]},
+}
+PATTERNS = {"common_questions": ["Greetings", "Tipping"], "common_mistakes": [], "recommendations": []}
+
+
+class FakeMemories:
+    """
+    Memory source double: memories per (region, city), cursors in insertion
+    order. Region and city are canonicalized by trimming whitespace.
+    """
+
+    def __init__(self):
+        self.memories: dict[tuple[str, str], list[dict]] = {}
+        self.repeats: dict[tuple[str, str], int] = {}
+        self.cursor = 0
+
+    @staticmethod
+    def canonical(region, city=None):
+        return (region or "").strip(), (city or "").strip()
+
+    def add(self, region, city, phrase):
+        self.cursor += 1
+        self.memories.setdefault((region, city), []).append(
+            {"phrase": phrase, "tone": "Warm", "gesture": "🙏", "custom": "", "cursor": f"{self.cursor:06d}"}
+        )
+
+    def remove(self, region, city):
+        self.memories[(region, city)].pop(0)
+
+    def repeat(self, region, city):
+        """Store-time dedupe folded a repeat into an existing memory."""
+        self.repeats[(region, city)] = self.repeats.get((region, city), 0) + 1
+
+    def watermark(self, region, city):
+        key = self.canonical(region, city)
+        mems = self.memories.get(key, [])
+        return len(mems), mems[-1]["cursor"] if mems else None, len(mems) + self.repeats.get(key, 0)
+
+    def list(self, region, city, limit=50, after=None):
+        mems = [m for m in self.memories.get(self.canonical(region, city), []) if after is None or m["cursor"] > after]
+        return mems[-limit:], None
+
+
+class FakeLLM:
+    """Records which playbook prompt was sent: the full build or the patterns delta."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt, system):
+        if "sections" in system:
+            self.calls.append("delta")
+            return dict(PATTERNS)
+        self.calls.append("full")
+        return dict(FULL_PLAYBOOK)
+
+
+@contextlib.contextmanager
+def playbook_env():
+    """
+    A fresh playbook_agent whose memory agent is an in-memory stub (the real
+    one needs an API key and a Chroma store) and whose LLM and store are
+    doubles. The stub and this copy of playbook_agent are removed afterwards.
+    """
+    memories, llm = FakeMemories(), FakeLLM()
+    names = ("agents.memory_agent", "agents.playbook_agent")
+    saved = {name: sys.modules.pop(name) for name in names if name in sys.modules}
+    stub = types.ModuleType("agents.memory_agent")
+    stub.canonical_scope = memories.canonical
+    stub.list_memories = memories.list
+    stub.memory_watermark = memories.watermark
+    sys.modules["agents.memory_agent"] = stub
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            playbook_agent = importlib.import_module("agents.playbook_agent")
+            store = playbook_agent.PlaybookStore(os.path.join(tmp, "playbooks.sqlite3"))
+            playbook_agent._complete_json = llm
+            playbook_agent.get_culture_profile = lambda region, city: {"tone": "Warm", "gesture": "🙏", "custom": ""}
+            playbook_agent.get_playbook_store = lambda: store
+            try:
+                yield playbook_agent.get_cultural_playbook, memories, llm
+            finally:
+                store.close()
+        finally:
+            for name in names:
+                sys.modules.pop(name, None)
+                # The package attribute would otherwise keep pointing at the stub
+                attr = name.rpartition(".")[2]
+                if name in saved:
+                    setattr(agents, attr, saved[name])
+                elif hasattr(agents, attr):
+                    delattr(agents, attr)
+            sys.modules.update(saved)
+
+
+def test_unchanged_memories_return_the_stored_playbook():
+    with playbook_env() as (get_cultural_playbook, memories, llm):
+        memories.add("Japan", "Tokyo", "How do I bow?")
+        assert get_cultural_playbook("Japan", "Tokyo") == (FULL_PLAYBOOK, "full")
+
+        playbook, how = get_cultural_playbook("Japan", "Tokyo")
+        assert (playbook, how) == (FULL_PLAYBOOK, "cached")
+        assert llm.calls == ["full"]
+
+
+def test_new_memory_only_updates_emerging_patterns():
+    with playbook_env() as (get_cultural_playbook, memories, llm):
+        memories.add("Japan", "Tokyo", "How do I bow?")
+        get_cultural_playbook("Japan", "Tokyo")
+        memories.add("Japan", "Tokyo", "Should I tip?")
+
+        playbook, how = get_cultural_playbook("Japan", "Tokyo")
+        assert how == "delta"
+        assert llm.calls == ["full", "delta"]
+        assert playbook["emerging_patterns_from_memory"] == PATTERNS
+        assert playbook["communication_style"] == FULL_PLAYBOOK["communication_style"]
+        # The merged playbook is stored as current
+        assert get_cultural_playbook("Japan", "Tokyo")[1] == "cached"
+        assert llm.calls == ["full", "delta"]
+
+
+def test_changed_scope_forces_a_full_rebuild():
+    with playbook_env() as (get_cultural_playbook, memories, llm):
+        memories.add("Japan", "Tokyo", "How do I bow?")
+        memories.add("Japan", "Tokyo", "Should I tip?")
+        get_cultural_playbook("Japan", "Tokyo")
+
+        # A memory was deleted and another added: not a pure append, so no delta
+        memories.remove("Japan", "Tokyo")
+        memories.add("Japan", "Tokyo", "Is it rude to eat on the train?")
+        assert get_cultural_playbook("Japan", "Tokyo")[1] == "full"
+        # Another city of the region has its own playbook
+        memories.add("Japan", "Osaka", "How do I greet shop owners?")
+        assert get_cultural_playbook("Japan", "Osaka")[1] == "full"
+        # force ignores the stored playbook
+        assert get_cultural_playbook("Japan", "Tokyo", force=True)[1] == "full"
+        assert llm.calls == ["full", "full", "full", "full"]
+
+
+def test_repeats_invalidate_the_playbook():
+    with playbook_env() as (get_cultural_playbook, memories, llm):
+        memories.add("Japan", "Tokyo", "How do I bow?")
+        get_cultural_playbook("Japan", "Tokyo")
+
+        # Dedupe folded a repeat into the memory: no new memory, but not current either
+        memories.repeat("Japan", "Tokyo")
+        assert get_cultural_playbook("Japan", "Tokyo")[1] == "full"
+        assert get_cultural_playbook("Japan", "Tokyo")[1] == "cached"
+
+
+def test_playbooks_are_keyed_on_the_canonical_scope():
+    with playbook_env() as (get_cultural_playbook, memories, llm):
+        memories.add("Japan", "Tokyo", "How do I bow?")
+        get_cultural_playbook("Japan", "Tokyo")
+
+        assert get_cultural_playbook(" Japan", "Tokyo ")[1] == "cached"
+        assert llm.calls == ["full"]
+
+
+def main():
+    test_unchanged_memories_return_the_stored_playbook()
+    test_new_memory_only_updates_emerging_patterns()
+    test_changed_scope_forces_a_full_rebuild()
+    test_repeats_invalidate_the_playbook()
+    test_playbooks_are_keyed_on_the_canonical_scope()
+    print("✅ All playbook agent tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Test the FAQ prompt library data and its precomputed artifact helpers.
+Run: python test_prompt_library.py
+"""
+
+import datetime
+import json
+import os
+import tempfile
+
+from utils.prompt_library import (
+    ARTIFACT_FORMAT_VERSION,
+    decode_vector,
+    encode_vector,
+    entry_expired,
+    entry_fingerprint,
+    iter_prompts,
+    load_artifact,
+    save_artifact,
+)
+
+
+def test_library_keys_are_unique():
+    keys = [prompt["key"] for _, prompt in iter_prompts()]
+    assert len(keys) == len(set(keys)) > 0
+
+
+def test_fingerprint_tracks_text_scope_and_models():
+    group = {"region": "Tamil Nadu", "city": "Chennai"}
+    prompt = {"prompt": "How do I greet elders?"}
+    base = entry_fingerprint(group, prompt, "emb-a", "llm-a")
+
+    assert entry_fingerprint(group, dict(prompt), "emb-a", "llm-a") == base
+    assert entry_fingerprint(group, {"prompt": "How do I greet elders"}, "emb-a", "llm-a") != base
+    assert entry_fingerprint({**group, "city": "Madurai"}, prompt, "emb-a", "llm-a") != base
+    assert entry_fingerprint(group, prompt, "emb-b", "llm-a") != base
+
+
+def test_entries_expire_with_the_answer_cache_ttl():
+    now = datetime.datetime(2026, 6, 10)
+    day = 24 * 3600
+    built_at = "2026-06-01T00:00:00"
+
+    assert not entry_expired({"answered_at": "2026-06-08T00:00:00"}, built_at, 7 * day, now=now)
+    assert entry_expired({"answered_at": "2026-06-02T00:00:00"}, built_at, 7 * day, now=now)
+    # Entries from older builds count from the artifact's build time
+    assert entry_expired({}, built_at, 7 * day, now=now)
+    assert not entry_expired({}, built_at, 30 * day, now=now)
+
+
+def test_artifact_round_trip_and_version_check():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "artifact.json")
+        vector = [0.25, -1.5, 3.0]
+        save_artifact(
+            {"format_version": ARTIFACT_FORMAT_VERSION, "entries": {"k": {"embedding": encode_vector(vector)}}},
+            path,
+        )
+        artifact = load_artifact(path)
+        assert decode_vector(artifact["entries"]["k"]["embedding"]) == vector
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"format_version": ARTIFACT_FORMAT_VERSION + 1, "entries": {}}, f)
+        assert load_artifact(path) is None
+        assert load_artifact(os.path.join(tmp, "missing.json")) is None
+
+
+def main():
+    test_library_keys_are_unique()
+    test_fingerprint_tracks_text_scope_and_models()
+    test_entries_expire_with_the_answer_cache_ttl()
+    test_artifact_round_trip_and_version_check()
+    print("✅ All prompt library tests passed.")
+
+
+if __name__ == "__main__":
+    main()
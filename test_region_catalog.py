@@ -0,0 +1,96 @@
+"""
+Test the indexed RegionCatalog lookups and mtime-based reloads.
+Run: python test_region_catalog.py
+"""
+
+import json
+import os
+import tempfile
+import time
+
+from utils.region_loader import RegionCatalog, get_region_info
+
+SAMPLE = {
+    "Indian States": {
+        "Tamil Nadu": {
+            "emoji": "🇮🇳",
+            "locations": {
+                "Chennai": {"phrase": "Enakku oru dosa kudunga", "tone": "Respectful and warm"},
+            },
+        },
+    },
+    "International": {
+        "United States (New York)": {
+            "location": "New York, USA",
+            "phrase": "Could I grab a coffee?",
+            "tone": "Direct",
+        },
+    },
+}
+
+
+def write_regions(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def test_lookups_by_key_location_and_alias():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "regions.json")
+        write_regions(path, SAMPLE)
+        catalog = RegionCatalog(path)
+
+        assert catalog.get("Tamil Nadu")["emoji"] == "🇮🇳"
+        assert catalog.get("New York, USA")["tone"] == "Direct"
+        assert catalog.get("Chennai")["phrase"] == "Enakku oru dosa kudunga"
+        assert catalog.get("Chennai")["region"] == "Tamil Nadu"
+        assert catalog.get("  chennai ")["location"] == "Chennai"
+        assert catalog.get("CHENNAI,tamil   nadu")["location"] == "Chennai"
+        assert catalog.get("🇮🇳 tamil nadu")["emoji"] == "🇮🇳"
+        assert catalog.get("Atlantis") is None
+        assert catalog.get("") is None
+        assert len(catalog) == 2
+
+
+def test_reloads_only_when_mtime_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "regions.json")
+        write_regions(path, SAMPLE)
+        catalog = RegionCatalog(path, check_interval=0)
+        first = catalog.get("Chennai")
+
+        # Unchanged file → same indexed objects, no re-parse
+        assert catalog.get("Chennai") is first
+
+        updated = json.loads(json.dumps(SAMPLE))
+        updated["Indian States"]["Tamil Nadu"]["locations"]["Madurai"] = {"phrase": "Vanakkam"}
+        write_regions(path, updated)
+        future = time.time() + 5
+        os.utime(path, (future, future))
+
+        assert catalog.get("Madurai")["phrase"] == "Vanakkam"
+
+
+def test_get_region_info_missing_file_returns_none():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            import utils.region_loader as loader
+
+            loader._catalog = None
+            assert get_region_info("Chennai") is None
+        finally:
+            loader._catalog = None
+            os.chdir(cwd)
+
+
+def main():
+    test_lookups_by_key_location_and_alias()
+    test_reloads_only_when_mtime_changes()
+    test_get_region_info_missing_file_returns_none()
+    print("✅ All region catalog tests passed.")
+
+
+if __name__ == "__main__":
+    main()
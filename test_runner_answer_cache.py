@@ -0,0 +1,85 @@
+"""
+Test that the runner's own recall keeps the semantic answer cache working
+for short questions (no OpenAI call or Chroma store needed).
+Run: python test_runner_answer_cache.py
+"""
+
+import contextlib
+import datetime
+import importlib
+import sys
+import types
+
+from agents.answer_cache import SemanticAnswerCache
+
+STORED = {
+    "id": "m1",
+    "phrase": "Nandri!",
+    "answer": "You're welcome! (Paravaillai)",
+    "gesture": "🙏",
+    "custom": "Tamil for thank you",
+    "tone": "Warm",
+    "mode": "Text",
+    "context": "default",
+    "timestamp": datetime.datetime.utcnow().isoformat(),
+}
+
+
+@contextlib.contextmanager
+def runner_module(recall):
+    """
+    langchain_runner imported against a stub memory agent whose recall_similar
+    is `recall` (the real one needs an API key and a Chroma store). The stub
+    and this copy of the runner are removed from sys.modules afterwards.
+    """
+    names = ("agents.memory_agent", "langchain_runner")
+    saved = {name: sys.modules.pop(name) for name in names if name in sys.modules}
+    stub = types.ModuleType("agents.memory_agent")
+    stub.recall_similar = recall
+    sys.modules["agents.memory_agent"] = stub
+    try:
+        yield importlib.import_module("langchain_runner")
+    finally:
+        for name in names:
+            sys.modules.pop(name, None)
+        sys.modules.update(saved)
+
+
+def scripted_recall(calls):
+    """Recall double: like memory_agent, only vector/hybrid results carry a cosine score."""
+
+    def recall(region, location, user_input, mode=None, context=None, top_k=5, search=None):
+        calls.append(search)
+        memory = dict(STORED, lexical_score=1.2)
+        if search in ("vector", "hybrid"):
+            memory["score"] = 0.97
+        return [memory]
+
+    return recall
+
+
+def test_short_near_identical_question_hits_answer_cache():
+    calls = []
+    with runner_module(scripted_recall(calls)) as langchain_runner:
+        runner = langchain_runner.EchoAtlasRunner(api_key="sk-test", cache=SemanticAnswerCache(threshold=0.95))
+        try:
+            result = runner.run("nandri", "Tamil Nadu", "Chennai", context="default")
+        finally:
+            runner.close()
+
+        assert calls == [langchain_runner.RUNNER_RECALL_SEARCH] == ["hybrid"]
+
+    assert result["cached"] is True
+    assert result["phrase"] == STORED["answer"]
+    assert result["cache_score"] == 0.97
+    # The cached answer keeps the time it was generated
+    assert result["answered_at"] == STORED["timestamp"]
+
+
+def main():
+    test_short_near_identical_question_hits_answer_cache()
+    print("✅ All runner answer cache tests passed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Test lazy model loading, cached candidate matrices and batched matching
+in semantic_phrase_agent.
+Run: python test_semantic_phrase_agent.py
+"""
+
+import numpy as np
+
+import agents.semantic_phrase_agent as spa
+
+
+class KeywordModel:
+    """Tiny stand-in encoder: one dimension per keyword, counts the encoded texts."""
+
+    KEYWORDS = ["noodles", "dish", "stall", "traditional", "tea"]
+
+    def __init__(self):
+        self.encoded: list[str] = []
+        self.calls = 0
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, normalize_embeddings=False):
+        self.encoded.extend(texts)
+        self.calls += 1
+        rows = np.array(
+            [[float(k in t.lower()) for k in self.KEYWORDS] + [0.1] for t in texts],
+            dtype=np.float32,
+        )
+        if normalize_embeddings:
+            rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+        return rows
+
+
+def reset_agent():
+    spa._model = KeywordModel()
+    spa._region_data = {
+        "Kyoto": {"phrase": "May I have some green tea?"},
+        "Hanoi": {"phrase": "One bowl of pho, please."},
+    }
+    spa._candidates.clear()
+
+
+def test_candidates_encoded_once_and_only_input_per_call():
+    reset_agent()
+    model = spa._model
+
+    assert spa.semantic_translate("Kyoto", "is there any tea here") == "May I have some green tea?"
+    assert spa.semantic_translate("Kyoto", "street food stall?") == "Is there a food stall nearby?"
+
+    candidates = len(spa.ALT_PHRASES) + 1
+    assert len(model.encoded) == candidates + 2
+    assert model.encoded[-1] == "street food stall?"
+
+    phrases, matrix = spa.candidate_matrix("Kyoto")
+    assert matrix.shape == (candidates, len(KeywordModel.KEYWORDS) + 1)
+    assert matrix.dtype == np.float32
+    assert np.allclose(np.linalg.norm(matrix, axis=1), 1.0)
+
+
+def test_unknown_location():
+    reset_agent()
+    assert spa.semantic_translate("Atlantis", "hello") == "Location not supported"
+    assert spa._model.encoded == []
+
+
+def test_batch_matches_single_calls_with_one_encode():
+    reset_agent()
+    pairs = [
+        ("Kyoto", "some tea please"),
+        ("Atlantis", "hello"),
+        ("Hanoi", "noodles?"),
+        ("Kyoto", "any traditional food"),
+    ]
+    expected = [spa.semantic_translate(location, text) for location, text in pairs]
+
+    calls = spa._model.calls
+    results = spa.semantic_translate_batch(pairs, top_k=2, batch_size=8)
+    # Candidate matrices are cached: the whole batch is one encode call
+    assert spa._model.calls == calls + 1
+
+    assert results[1] == []
+    for result, phrase in zip(results, expected):
+        if result:
+            assert len(result) == 2
+            assert result[0]["phrase"] == phrase
+            assert result[0]["score"] >= result[1]["score"]
+
+    assert spa.semantic_translate_batch([("Atlantis", "hello")]) == [[]]
+
+
+def main():
+    test_candidates_encoded_once_and_only_input_per_call()
+    test_unknown_location()
+    test_batch_matches_single_calls_with_one_encode()
+    print("✅ All semantic phrase tests passed.")
+
+
+if __name__ == "__main__":
+    main()
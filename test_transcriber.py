@@ -0,0 +1,99 @@
+"""
+Test the background speech recognition thread and the recognizer pool
+(no microphone or Vosk model needed).
+Run: python test_transcriber.py
+"""
+
+import json
+import threading
+
+from agents.transcriber import RecognizerPool, Transcriber
+
+
+class ScriptedRecognizer:
+    """Recognizer double: b"." ends an utterance, other blocks are words in progress."""
+
+    def __init__(self):
+        self.words: list[str] = []
+        self.final = ""
+        self.thread_names: set[str] = set()
+        self.resets = 0
+
+    def AcceptWaveform(self, data):
+        self.thread_names.add(threading.current_thread().name)
+        if data == b".":
+            self.final, self.words = " ".join(self.words), []
+            return True
+        self.words.append(data.decode())
+        return False
+
+    def Result(self):
+        return json.dumps({"text": self.final})
+
+    def PartialResult(self):
+        return json.dumps({"partial": " ".join(self.words)})
+
+    def Reset(self):
+        self.resets += 1
+        self.words = []
+
+    def FinalResult(self):
+        final, self.words = " ".join(self.words), []
+        return json.dumps({"text": final})
+
+
+def test_partials_and_finals_published_from_worker():
+    recognizer = ScriptedRecognizer()
+    transcriber = Transcriber(recognizer, use_microphone=False)
+    transcriber.start()
+
+    version, text, partial = transcriber.snapshot()
+    transcriber.feed(b"where")
+    version, text, partial = transcriber.wait(version, timeout=2)
+    assert (text, partial) == ("", "where")
+
+    transcriber.feed(b"is")
+    transcriber.feed(b".")
+    while text != "where is":
+        version, text, partial = transcriber.wait(version, timeout=2)
+    assert partial == ""
+
+    # Words still being decoded at stop() are flushed into the final transcript
+    transcriber.feed(b"metro")
+    assert transcriber.stop() == "where is metro"
+    assert not transcriber.running
+    assert recognizer.thread_names == {"echoatlas-transcriber"}
+
+
+def test_wait_times_out_without_audio():
+    transcriber = Transcriber(ScriptedRecognizer(), use_microphone=False)
+    transcriber.start()
+    version = transcriber.snapshot()[0]
+    assert transcriber.wait(version, timeout=0.05)[0] == version
+    assert transcriber.stop() == ""
+
+
+def test_pool_isolates_sessions_and_reuses_reset_recognizers():
+    pool = RecognizerPool(ScriptedRecognizer, max_idle=1)
+    first, second = pool.checkout(), pool.checkout()
+    assert first is not second
+
+    first.AcceptWaveform(b"half")
+    pool.checkin(first)
+    pool.checkin(second)
+    assert (first.resets, first.words) == (1, [])
+
+    # Only max_idle recognizers are kept; the next session reuses one of them
+    assert pool.checkout() is first
+    assert pool.stats() == {"created": 2, "reused": 1, "in_use": 1, "idle": 0}
+
+
+def main():
+    test_partials_and_finals_published_from_worker()
+    test_wait_times_out_without_audio()
+    test_pool_isolates_sessions_and_reuses_reset_recognizers()
+    print("✅ All transcriber tests passed.")
+
+
+if __name__ == "__main__":
+    main()
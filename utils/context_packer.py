@@ -0,0 +1,179 @@
+import datetime
+import difflib
+import math
+import threading
+import unicodedata
+from typing import Callable, Iterable
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is in requirements.txt
+    tiktoken = None
+
+DEFAULT_TOKEN_MODEL = "gpt-4o-mini"
+
+_encodings: dict[str, object] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    """tiktoken encoding for `model`, or None if tiktoken cannot load one (e.g. offline)."""
+    with _encodings_lock:
+        if model not in _encodings:
+            encoding = None
+            if tiktoken is not None:
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    print(f"⚠️ tiktoken unavailable for {model}, estimating tokens: {e}")
+            _encodings[model] = encoding
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str = DEFAULT_TOKEN_MODEL) -> int:
+    """Token count of `text` (about 4 characters per token if tiktoken is unavailable)."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text))
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = DEFAULT_TOKEN_MODEL) -> str:
+    """Cut `text` to at most `max_tokens` tokens, marking the cut with an ellipsis."""
+    if not text or count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[: max_tokens * 4].rstrip() + "…"
+    return encoding.decode(encoding.encode(text)[:max_tokens]).rstrip() + "…"
+
+
+def section_tokens(sections: dict[str, str], model: str = DEFAULT_TOKEN_MODEL) -> dict[str, int]:
+    """Token usage per named prompt section, plus a "total"."""
+    usage = {name: count_tokens(text, model) for name, text in sections.items()}
+    usage["total"] = sum(usage.values())
+    return usage
+
+
+def _normalize_phrase(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    kept = "".join(ch if ch.isalnum() else " " for ch in text)
+    return " ".join(kept.split())
+
+
+def _age_days(timestamp: str, now: datetime.datetime) -> float | None:
+    try:
+        then = datetime.datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if then.tzinfo is not None:
+        then = then.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return max((now - then).total_seconds() / 86400.0, 0.0)
+
+
+class ContextPacker:
+    """
+    Fit recalled memories into a prompt section of at most `budget_tokens`.
+
+    Memories are ranked by a blend of similarity (`score`, when the memory
+    came from a semantic recall) and recency (exponential decay with
+    `half_life_days`), near-duplicate phrases are dropped, and long text
+    fields are cut to `max_field_tokens` before a memory is rendered. The
+    highest-ranked memories are added until the next one would not fit.
+    """
+
+    def __init__(
+        self,
+        budget_tokens: int,
+        model: str = DEFAULT_TOKEN_MODEL,
+        max_field_tokens: int = 80,
+        recency_weight: float = 0.3,
+        half_life_days: float = 30.0,
+        duplicate_ratio: float = 0.9,
+        text_fields: Iterable[str] = ("phrase", "answer", "custom", "gesture", "tone"),
+    ):
+        self.budget_tokens = budget_tokens
+        self.model = model
+        self.max_field_tokens = max_field_tokens
+        self.recency_weight = recency_weight
+        self.half_life_days = half_life_days
+        self.duplicate_ratio = duplicate_ratio
+        self.text_fields = tuple(text_fields)
+
+    def rank(self, memories: list[dict]) -> list[dict]:
+        """Memories ordered best-first by similarity/recency blend."""
+        # Memory timestamps are naive UTC (see store_interaction)
+        now = datetime.datetime.utcnow()
+
+        def priority(memory: dict) -> float:
+            similarity = memory.get("score")
+            similarity = 0.5 if similarity is None else similarity
+            age = _age_days(memory.get("last_seen") or memory.get("timestamp", ""), now)
+            recency = 0.0 if age is None else 0.5 ** (age / self.half_life_days)
+            return (1 - self.recency_weight) * similarity + self.recency_weight * recency
+
+        return sorted(memories, key=priority, reverse=True)
+
+    def dedupe(self, memories: list[dict]) -> list[dict]:
+        """Keep the first of any group of memories with near-identical phrases."""
+        kept: list[dict] = []
+        seen: list[str] = []
+        for memory in memories:
+            phrase = _normalize_phrase(memory.get("phrase", ""))
+            if any(
+                phrase == other
+                or difflib.SequenceMatcher(None, phrase, other).ratio() >= self.duplicate_ratio
+                for other in seen
+            ):
+                continue
+            seen.append(phrase)
+            kept.append(memory)
+        return kept
+
+    def _trim(self, memory: dict) -> dict:
+        trimmed = dict(memory)
+        for field in self.text_fields:
+            value = trimmed.get(field)
+            if isinstance(value, str):
+                trimmed[field] = truncate_tokens(value, self.max_field_tokens, self.model)
+        return trimmed
+
+    def pack(
+        self,
+        memories: list[dict],
+        render: Callable[[dict], str],
+        separator: str = "\n",
+        empty_text: str = "",
+    ) -> dict:
+        """
+        Render the best memories that fit the budget.
+
+        Returns {"text", "memories" (the ones included, in rank order),
+        "tokens" (used by the text), "dropped" (ranked out or over budget)}.
+        """
+        candidates = self.dedupe(self.rank(memories))
+        separator_tokens = count_tokens(separator, self.model)
+
+        parts: list[str] = []
+        included: list[dict] = []
+        used = 0
+        for memory in candidates:
+            text = render(self._trim(memory))
+            cost = count_tokens(text, self.model) + (separator_tokens if parts else 0)
+            if used + cost > self.budget_tokens:
+                break
+            parts.append(text)
+            included.append(memory)
+            used += cost
+
+        text = separator.join(parts) if parts else empty_text
+        return {
+            "text": text,
+            "memories": included,
+            "tokens": count_tokens(text, self.model),
+            "dropped": len(memories) - len(included),
+        }
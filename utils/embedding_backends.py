@@ -0,0 +1,147 @@
+import abc
+import os
+import threading
+from functools import cached_property
+from typing import Sequence
+
+from chromadb.utils.embedding_functions import ONNXMiniLM_L6_V2, OpenAIEmbeddingFunction
+
+DEFAULT_EMBEDDING_BACKEND = "openai"
+# onnxruntime intra-op threads for the local backend (0 = onnxruntime default)
+LOCAL_EMBEDDING_THREADS = int(os.getenv("ECHOATLAS_EMBEDDING_THREADS", "0"))
+
+
+class EmbeddingBackend(abc.ABC):
+    """
+    One way of turning texts into memory embeddings.
+
+    - `name` identifies the backend in collection metadata and store names.
+    - `model_name` keys the embedding cache, so vectors from different
+      backends never mix.
+    - `dimension` is the length of every vector it returns.
+    - `embedding_function` is the Chroma embedding function collections are
+      opened with (vectors are always passed in precomputed).
+
+    Backends return unit-length vectors, so similarity scores are comparable
+    across backends. Calling a backend embeds a batch of texts; subclasses
+    must implement __call__.
+    """
+
+    name = ""
+    model_name = ""
+    dimension = 0
+    embedding_function = None
+
+    @abc.abstractmethod
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        """Embed a batch of texts into unit-length vectors of length `dimension`."""
+
+    def metadata(self) -> dict:
+        """Collection metadata recording what the collection was built with."""
+        return {
+            "embedding_backend": self.name,
+            "embedding_model": self.model_name,
+            "embedding_dimension": self.dimension,
+        }
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    """OpenAI embeddings API (network; needs OPENAI_API_KEY)."""
+
+    name = "openai"
+
+    def __init__(self, model_name: str = "text-embedding-3-small", dimension: int = 1536):
+        self.model_name = model_name
+        self.dimension = dimension
+        self.embedding_function = OpenAIEmbeddingFunction(model_name=model_name)
+
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        return [[float(x) for x in v] for v in self.embedding_function(list(texts))]
+
+
+class _QuantizedMiniLM(ONNXMiniLM_L6_V2):
+    """Chroma's bundled all-MiniLM-L6-v2 ONNX model, run as a dynamic int8 quantized copy."""
+
+    QUANTIZED_FILENAME = "model.int8.onnx"
+
+    def __init__(self, num_threads: int = 0):
+        super().__init__(preferred_providers=["CPUExecutionProvider"])
+        self._num_threads = num_threads
+
+    def _quantized_path(self) -> str:
+        folder = os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        path = os.path.join(folder, self.QUANTIZED_FILENAME)
+        if not os.path.exists(path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            self._download_model_if_not_exists()
+            print(f"🧮 Quantizing {self.MODEL_NAME} to int8 ({path})...")
+            tmp_path = path + ".tmp"
+            quantize_dynamic(
+                os.path.join(folder, "model.onnx"), tmp_path, weight_type=QuantType.QInt8
+            )
+            os.replace(tmp_path, path)
+        return path
+
+    @cached_property
+    def model(self):
+        options = self.ort.SessionOptions()
+        options.log_severity_level = 3
+        options.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self._num_threads > 0:
+            options.intra_op_num_threads = self._num_threads
+        return self.ort.InferenceSession(
+            self._quantized_path(),
+            providers=["CPUExecutionProvider"],
+            sess_options=options,
+        )
+
+
+class LocalMiniLMBackend(EmbeddingBackend):
+    """
+    all-MiniLM-L6-v2 on CPU through onnxruntime, int8 quantized (offline
+    after the one-time model download). Same model as semantic_phrase_agent.
+    """
+
+    name = "local-minilm"
+    model_name = "all-MiniLM-L6-v2-int8"
+    dimension = 384
+
+    def __init__(self, num_threads: int = LOCAL_EMBEDDING_THREADS):
+        self.embedding_function = _QuantizedMiniLM(num_threads=num_threads)
+        self._lock = threading.Lock()
+
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        # One shared session; onnxruntime parallelizes inside a call
+        with self._lock:
+            return [[float(x) for x in v] for v in self.embedding_function(list(texts))]
+
+
+EMBEDDING_BACKENDS = {
+    OpenAIEmbeddingBackend.name: OpenAIEmbeddingBackend,
+    LocalMiniLMBackend.name: LocalMiniLMBackend,
+}
+
+
+def create_embedding_backend(name: str = DEFAULT_EMBEDDING_BACKEND, **kwargs) -> EmbeddingBackend:
+    """Instantiate a backend by name (see EMBEDDING_BACKENDS)."""
+    try:
+        backend_cls = EMBEDDING_BACKENDS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown embedding backend '{name}' (expected one of: {', '.join(EMBEDDING_BACKENDS)})"
+        ) from None
+    return backend_cls(**kwargs)
+
+
+def check_collection_backend(metadata: dict | None, backend: EmbeddingBackend) -> None:
+    """Raise if a collection was built with a different backend or dimension."""
+    recorded = {k: v for k, v in (metadata or {}).items() if k.startswith("embedding_")}
+    if not recorded:
+        return
+    expected = backend.metadata()
+    mismatched = {k: v for k, v in recorded.items() if k in expected and expected[k] != v}
+    if mismatched:
+        raise RuntimeError(
+            f"Collection was built with {recorded}, but the configured backend is {expected}."
+        )
@@ -0,0 +1,177 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Callable, Sequence
+
+
+def embedding_key(model_name: str, text: str) -> str:
+    """Content address for one embedding: sha256 over model name + text."""
+    digest = hashlib.sha256()
+    digest.update(model_name.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier, content-addressed embedding cache.
+
+    - Tier 1: bounded in-memory LRU of float32 arrays.
+    - Tier 2: optional SQLite file with float32 BLOBs that survives restarts.
+
+    Keys are `embedding_key(model_name, text)`, so the same text embedded by a
+    different model never collides. Hit/miss counters are exposed via stats().
+    """
+
+    def __init__(self, path: str | None = None, max_memory_items: int = 2048):
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[str, array] = OrderedDict()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        self._conn: sqlite3.Connection | None = None
+
+        if path:
+            parent = os.path.dirname(path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key     TEXT PRIMARY KEY,
+                    model   TEXT NOT NULL,
+                    dim     INTEGER NOT NULL,
+                    vector  BLOB NOT NULL,
+                    created REAL NOT NULL
+                )
+                """
+            )
+            self._conn.commit()
+
+    # ---------------------------------
+    # Internal helpers
+    # ---------------------------------
+    def _remember(self, key: str, vec: array) -> None:
+        self._lru[key] = vec
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_memory_items:
+            self._lru.popitem(last=False)
+
+    # ---------------------------------
+    # Public API
+    # ---------------------------------
+    def get_many(self, model_name: str, texts: Sequence[str]) -> list[list[float] | None]:
+        """Return cached vectors in input order, with None for misses."""
+        keys = [embedding_key(model_name, t) for t in texts]
+        found: dict[str, array] = {}
+
+        with self._lock:
+            for key in keys:
+                vec = self._lru.get(key)
+                if vec is not None:
+                    self._lru.move_to_end(key)
+                    found[key] = vec
+                    self._stats["memory_hits"] += 1
+
+            missing = [k for k in dict.fromkeys(keys) if k not in found]
+            if missing and self._conn is not None:
+                placeholders = ",".join("?" * len(missing))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    missing,
+                ).fetchall()
+                for key, blob in rows:
+                    vec = array("f")
+                    vec.frombytes(blob)
+                    found[key] = vec
+                    self._remember(key, vec)
+                    self._stats["disk_hits"] += 1
+
+            self._stats["misses"] += sum(1 for k in keys if k not in found)
+
+        return [found[k].tolist() if k in found else None for k in keys]
+
+    def put_many(
+        self,
+        model_name: str,
+        texts: Sequence[str],
+        vectors: Sequence[Sequence[float]],
+    ) -> None:
+        """Store vectors for texts in both tiers."""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = embedding_key(model_name, text)
+                vec = array("f", vector)
+                self._remember(key, vec)
+                rows.append((key, model_name, len(vec), vec.tobytes(), now))
+            self._stats["writes"] += len(rows)
+
+            if rows and self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, model, dim, vector, created) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters plus current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_items"] = len(self._lru)
+            if self._conn is not None:
+                stats["disk_items"] = self._conn.execute(
+                    "SELECT COUNT(*) FROM embeddings"
+                ).fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        )
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class CachedEmbedder:
+    """
+    Callable that embeds a list of texts through an EmbeddingCache.
+
+    Only cache misses (deduplicated) are sent to the wrapped embedding
+    function, in a single batched call.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[list[str]], Sequence[Sequence[float]]],
+        model_name: str,
+        cache: EmbeddingCache,
+    ):
+        self.embed_fn = embed_fn
+        self.model_name = model_name
+        self.cache = cache
+
+    def __call__(self, texts: Sequence[str]) -> list[list[float]]:
+        texts = list(texts)
+        vectors = self.cache.get_many(self.model_name, texts)
+
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            fresh = self.embed_fn(missing)
+            self.cache.put_many(self.model_name, missing, fresh)
+            by_text = {t: [float(x) for x in v] for t, v in zip(missing, fresh)}
+            vectors = [v if v is not None else by_text[t] for t, v in zip(texts, vectors)]
+
+        return vectors
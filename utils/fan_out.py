@@ -0,0 +1,54 @@
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable
+
+# Shared by all sessions: fan-out calls are network-bound, so a small pool is plenty
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="echoatlas-fanout")
+
+
+class FanOut:
+    """
+    Run independent calls (LLM requests, memory recall, ...) concurrently.
+
+    submit() starts a call on the shared thread pool and returns immediately;
+    result() waits for it, bounded by the call's own timeout measured from
+    submission. A call that misses its deadline is cancelled if it has not
+    started yet, otherwise its result is discarded, and result() raises
+    TimeoutError. Exceptions raised by the call are re-raised by result().
+
+    Functions submitted here run outside the Streamlit script thread, so they
+    must not touch `st` (session_state, widgets, messages).
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor | None = None):
+        self._executor = executor or _executor
+        self._calls: dict[str, tuple[Future, float | None]] = {}
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        *args,
+        timeout: float | None = None,
+        **kwargs,
+    ) -> None:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self._calls[name] = (self._executor.submit(fn, *args, **kwargs), deadline)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._calls
+
+    def result(self, name: str) -> Any:
+        future, deadline = self._calls[name]
+        remaining = None if deadline is None else max(deadline - time.monotonic(), 0.0)
+        try:
+            return future.result(timeout=remaining)
+        except FutureTimeoutError:
+            future.cancel()
+            raise TimeoutError(f"{name} did not finish in time") from None
+
+    def cancel_all(self) -> None:
+        """Cancel every call that has not started yet (e.g. when the request is abandoned)."""
+        for future, _ in self._calls.values():
+            future.cancel()
@@ -0,0 +1,422 @@
+import base64
+import datetime
+import hashlib
+import json
+import os
+from array import array
+
+# Artifact written by build_prompt_library.py and loaded by the app at startup
+PROMPT_LIBRARY_ARTIFACT_PATH = "prompt_library.artifact.json"
+# Bump when the artifact layout changes; older files are then ignored
+ARTIFACT_FORMAT_VERSION = 1
+
+# Conversation context canonical answers are generated for (and served in)
+PROMPT_LIBRARY_CONTEXT = "default"
+
+# FAQ & Sample Prompts. Each group's region/city is the scope its canonical
+# answers are generated for (and served in, see build_prompt_library.py).
+PROMPT_LIBRARY: list[dict] = [
+    {
+        "title": "🌍 United States (New York, Seattle, Chicago)",
+        "section": "international",
+        "region": "United States",
+        "city": "New York",
+        "prompts": [
+            {
+                "key": "us_ask_help",
+                "label": "Ask a stranger for help without sounding intrusive",
+                "prompt": "How do I politely ask a stranger for help in New York without sounding intrusive?",
+            },
+            {
+                "key": "us_smalltalk",
+                "label": "Small talk at a US tech company",
+                "prompt": "What is a natural way to start small talk with coworkers at a US tech company?",
+            },
+            {
+                "key": "us_busy",
+                "label": "Talking to someone who seems busy",
+                "prompt": "How do I approach someone who looks busy without appearing rude?",
+            },
+            {
+                "key": "us_decline",
+                "label": "Declining an invite politely",
+                "prompt": "How do I politely decline a social invitation in the US without offending the person?",
+            },
+            {
+                "key": "us_direct",
+                "label": "Handling direct feedback",
+                "prompt": "How should I respond when an American coworker gives very direct feedback?",
+            },
+        ],
+    },
+    {
+        "title": "🇨🇦 Canada (Toronto, Vancouver)",
+        "section": "international",
+        "region": "Canada",
+        "city": "Toronto",
+        "prompts": [
+            {
+                "key": "ca_apology",
+                "label": "Apologizing in a Canadian way",
+                "prompt": "What is the most Canadian way to apologize after bumping into someone?",
+            },
+            {
+                "key": "ca_friendly",
+                "label": "Being friendly but not intrusive",
+                "prompt": "How do I engage in friendly small talk with Canadians without crossing boundaries?",
+            },
+            {
+                "key": "ca_repeat",
+                "label": "Asking someone to repeat themselves",
+                "prompt": "What’s a polite way to ask someone to repeat themselves in Canada?",
+            },
+            {
+                "key": "ca_dinner",
+                "label": "Making dinner plans politely",
+                "prompt": "How do Canadians usually phrase dinner invitations politely?",
+            },
+        ],
+    },
+    {
+        "title": "🇬🇧 United Kingdom (London, Manchester)",
+        "section": "international",
+        "region": "United Kingdom",
+        "city": "London",
+        "prompts": [
+            {
+                "key": "uk_directions",
+                "label": "Asking for directions in London",
+                "prompt": "How do I ask for directions in London without sounding abrupt?",
+            },
+            {
+                "key": "uk_queue",
+                "label": "Joining a queue properly",
+                "prompt": "What should I know about queue etiquette in the UK?",
+            },
+            {
+                "key": "uk_disagree",
+                "label": "Polite disagreement in a meeting",
+                "prompt": "How should I express disagreement politely in a UK business meeting?",
+            },
+            {
+                "key": "uk_smalltalk",
+                "label": "Small talk that British people enjoy",
+                "prompt": "What are some safe and enjoyable small talk topics for people in the UK?",
+            },
+        ],
+    },
+    {
+        "title": "🇦🇺 Australia (Sydney, Melbourne)",
+        "section": "international",
+        "region": "Australia",
+        "city": "Sydney",
+        "prompts": [
+            {
+                "key": "au_banter",
+                "label": "Friendly teasing (“banter”)",
+                "prompt": "How should I respond to friendly teasing or ‘banter’ in Australian culture?",
+            },
+            {
+                "key": "au_coffee",
+                "label": "Ordering coffee in a busy Aussie café",
+                "prompt": "What’s the polite and quick way to order coffee in a busy Melbourne café?",
+            },
+            {
+                "key": "au_humor",
+                "label": "Understanding Aussie humor",
+                "prompt": "How do I understand and react to Australian humor without misunderstanding it?",
+            },
+            {
+                "key": "au_no",
+                "label": "Saying no without sounding rude",
+                "prompt": "How can I say ‘no’ politely in Australian social situations?",
+            },
+        ],
+    },
+    {
+        "title": "🇸🇬 Singapore (Singapore City)",
+        "section": "international",
+        "region": "Singapore",
+        "city": "Singapore City",
+        "prompts": [
+            {
+                "key": "sg_hawker",
+                "label": "Hawker centre etiquette",
+                "prompt": "What’s the polite way to ask for customization at a hawker centre in Singapore?",
+            },
+            {
+                "key": "sg_greeting",
+                "label": "Business greeting etiquette",
+                "prompt": "How formal should I be when greeting someone in a Singapore business meeting?",
+            },
+            {
+                "key": "sg_jokes",
+                "label": "When not to joke",
+                "prompt": "What kind of jokes or comments should I avoid in Singapore?",
+            },
+            {
+                "key": "sg_elder",
+                "label": "Talking to older Singaporeans respectfully",
+                "prompt": "How do I address and speak to an older person respectfully in Singapore?",
+            },
+        ],
+    },
+    {
+        "title": "🇩🇪 Germany (Berlin, Munich)",
+        "section": "international",
+        "region": "Germany",
+        "city": "Berlin",
+        "prompts": [
+            {
+                "key": "de_punctual",
+                "label": "Being on time (very important!)",
+                "prompt": "Why is punctuality so important in Germany and how do I show respect?",
+            },
+            {
+                "key": "de_direct",
+                "label": "Direct but respectful communication",
+                "prompt": "How do I communicate in a direct but respectful manner in Germany?",
+            },
+            {
+                "key": "de_split",
+                "label": "Splitting the bill",
+                "prompt": "How do I politely ask to split the bill in Germany?",
+            },
+            {
+                "key": "de_boundaries",
+                "label": "Discussing work-life boundaries",
+                "prompt": "How do Germans perceive work-life boundaries and how should I respect them?",
+            },
+        ],
+    },
+    {
+        "title": "🇫🇷 France (Paris, Lyon)",
+        "section": "international",
+        "region": "France",
+        "city": "Paris",
+        "prompts": [
+            {
+                "key": "fr_bonjour",
+                "label": "Start with ‘bonjour’ — always!",
+                "prompt": "Why is saying ‘bonjour’ before any question so important in France?",
+            },
+            {
+                "key": "fr_server",
+                "label": "Restaurant etiquette",
+                "prompt": "How do I politely call a server in a French restaurant?",
+            },
+            {
+                "key": "fr_complaint",
+                "label": "Polite complaints",
+                "prompt": "What is a polite way to raise a complaint at a hotel or restaurant in France?",
+            },
+            {
+                "key": "fr_tone",
+                "label": "Talking to Parisians politely",
+                "prompt": "What tone do Parisians appreciate in short interactions?",
+            },
+        ],
+    },
+    {
+        "title": "🇮🇳 Tamil Nadu (Chennai, Coimbatore)",
+        "section": "india",
+        "region": "Tamil Nadu",
+        "city": "Chennai",
+        "prompts": [
+            {
+                "key": "tn_elder",
+                "label": "Respecting elders in Chennai",
+                "prompt": "How should I address an elder respectfully in Chennai?",
+            },
+            {
+                "key": "tn_temple",
+                "label": "Temple etiquette in Tamil Nadu",
+                "prompt": "What should I know about temple etiquette and dress code in Tamil Nadu?",
+            },
+            {
+                "key": "tn_auto",
+                "label": "Auto-rickshaw negotiation",
+                "prompt": "How can I ask an auto driver in Chennai to go by meter politely?",
+            },
+            {
+                "key": "tn_spice",
+                "label": "Ordering food politely",
+                "prompt": "How do I ask for less spicy food in Tamil Nadu without sounding rude?",
+            },
+        ],
+    },
+    {
+        "title": "🇮🇳 Karnataka (Bengaluru, Mysuru)",
+        "section": "india",
+        "region": "Karnataka",
+        "city": "Bengaluru",
+        "prompts": [
+            {
+                "key": "ka_it",
+                "label": "Talking to IT coworkers in Bengaluru",
+                "prompt": "How should I greet or start conversations in a Bengaluru IT company?",
+            },
+            {
+                "key": "ka_meter",
+                "label": "Meter request for auto",
+                "prompt": "What is the polite way to ask a Bengaluru auto driver to use the meter?",
+            },
+            {
+                "key": "ka_ice",
+                "label": "Breaking the ice in Bengaluru",
+                "prompt": "What are natural ice-breakers when talking to locals in Bengaluru?",
+            },
+            {
+                "key": "ka_elder",
+                "label": "Respectful tone with elders in Karnataka",
+                "prompt": "How should I speak to an elder respectfully in Karnataka?",
+            },
+        ],
+    },
+    {
+        "title": "🇮🇳 Kerala (Kochi, Thiruvananthapuram)",
+        "section": "india",
+        "region": "Kerala",
+        "city": "Kochi",
+        "prompts": [
+            {
+                "key": "kl_backwater",
+                "label": "Backwater recommendations",
+                "prompt": "How do I politely ask a local in Kochi for backwater tourism suggestions?",
+            },
+            {
+                "key": "kl_temple",
+                "label": "Temple etiquette",
+                "prompt": "What should I know before visiting temples in Kerala?",
+            },
+            {
+                "key": "kl_seafood",
+                "label": "Seafood preferences",
+                "prompt": "How do I ask for mild-spice seafood dishes in Kerala?",
+            },
+            {
+                "key": "kl_behavior",
+                "label": "Public behavior norms",
+                "prompt": "What are general social behavior expectations in Kerala?",
+            },
+        ],
+    },
+    {
+        "title": "🇮🇳 Telangana (Hyderabad, Warangal)",
+        "section": "india",
+        "region": "Telangana",
+        "city": "Hyderabad",
+        "prompts": [
+            {
+                "key": "ts_elder",
+                "label": "Talking to elders in Hyderabad",
+                "prompt": "How do I speak respectfully to elders in Hyderabad?",
+            },
+            {
+                "key": "ts_vendor",
+                "label": "Asking a vendor for lower price",
+                "prompt": "What is a polite way to ask a street vendor for a lower price in Hyderabad?",
+            },
+            {
+                "key": "ts_office",
+                "label": "Office behavior in Hyderabad",
+                "prompt": "How formal or informal should I be in Hyderabad workplaces?",
+            },
+            {
+                "key": "ts_spice",
+                "label": "Handling spicy dishes politely",
+                "prompt": "What is a polite way to request less spicy food in Telangana?",
+            },
+        ],
+    },
+    {
+        "title": "🇮🇳 Maharashtra (Mumbai, Pune)",
+        "section": "india",
+        "region": "Maharashtra",
+        "city": "Mumbai",
+        "prompts": [
+            {
+                "key": "mh_train",
+                "label": "Crowded train etiquette",
+                "prompt": "How do I ask for help inside a crowded Mumbai local train?",
+            },
+            {
+                "key": "mh_smalltalk",
+                "label": "Small talk in Mumbai offices",
+                "prompt": "How do I start casual conversations with coworkers in Mumbai?",
+            },
+            {
+                "key": "mh_noise",
+                "label": "Housing society manners",
+                "prompt": "What’s a polite way to complain about noise to a neighbor in Maharashtra?",
+            },
+            {
+                "key": "mh_staff",
+                "label": "Talking to service staff respectfully",
+                "prompt": "How do I politely talk to security guards and drivers in Mumbai?",
+            },
+        ],
+    },
+]
+
+
+def iter_prompts():
+    """Yield (group, prompt) for every entry of the library."""
+    for group in PROMPT_LIBRARY:
+        for prompt in group["prompts"]:
+            yield group, prompt
+
+
+def entry_fingerprint(group: dict, prompt: dict, embedding_model: str, answer_model: str) -> str:
+    """Changes whenever the entry's text, scope or the models it is built with change."""
+    digest = hashlib.sha256()
+    for part in (prompt["prompt"], group["region"], group["city"], embedding_model, answer_model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def entry_expired(entry: dict, built_at: str, ttl: float, now: datetime.datetime | None = None) -> bool:
+    """
+    True once an entry's answer is older than `ttl` seconds (the answer cache
+    then stops serving it). Entries from builds that did not record
+    answered_at count from the artifact's built_at.
+    """
+    now = now or datetime.datetime.utcnow()
+    answered_at = entry.get("answered_at") or built_at
+    return answered_at < (now - datetime.timedelta(seconds=ttl)).isoformat()
+
+
+def encode_vector(vector) -> str:
+    """float32 + base64, about a third of the size of a JSON float list."""
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def decode_vector(data: str) -> list[float]:
+    vec = array("f")
+    vec.frombytes(base64.b64decode(data))
+    return vec.tolist()
+
+
+def load_artifact(path: str = PROMPT_LIBRARY_ARTIFACT_PATH) -> dict | None:
+    """Load the prompt library artifact, or None if it is missing or outdated."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read prompt library artifact: {e}")
+        return None
+    if artifact.get("format_version") != ARTIFACT_FORMAT_VERSION:
+        print("⚠️ Prompt library artifact has an old format; run build_prompt_library.py.")
+        return None
+    return artifact
+
+
+def save_artifact(artifact: dict, path: str = PROMPT_LIBRARY_ARTIFACT_PATH) -> None:
+    """Write the artifact atomically (readers never see a half-written file)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(artifact, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
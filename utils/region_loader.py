@@ -1,10 +1,173 @@
 import json
+import os
+import threading
+import time
+import unicodedata
+
+REGIONS_PATH = "regions.json"
+
+
+def normalize_key(text: str) -> str:
+    """
+    Normalize a region/location string for alias lookups:
+    NFKC, case-folded, emojis/punctuation dropped, whitespace collapsed.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    kept = "".join(ch if (ch.isalnum() or ch in " ,") else " " for ch in text)
+    parts = [p.strip() for p in kept.split(",")]
+    return ", ".join(" ".join(p.split()) for p in parts if p.strip())
+
+
+class RegionCatalog:
+    """
+    In-process, indexed view of regions.json.
+
+    The file is parsed once and flattened into hash indexes:
+    - by region key          (e.g. "Tamil Nadu")
+    - by location string     (e.g. "Chennai", or a legacy "location" field)
+    - by normalized aliases  (case-folded / NFKC, plus "City, Region" forms)
+
+    Lookups are O(1) dict hits. The file is only re-read when its mtime
+    changes, and the mtime itself is checked at most every `check_interval`
+    seconds so the hot path does no disk I/O.
+    """
+
+    def __init__(self, path: str = REGIONS_PATH, check_interval: float | None = 1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._mtime: float | None = None
+        self._last_check = 0.0
+        self._data: dict = {}
+        self._by_region: dict[str, dict] = {}
+        self._by_location: dict[str, dict] = {}
+        self._by_alias: dict[str, dict] = {}
+
+    # ---------------------------------
+    # Loading
+    # ---------------------------------
+    def reload(self) -> None:
+        """Force a re-read of the backing file and rebuild all indexes."""
+        with self._lock:
+            self._load_locked()
+
+    def _load_locked(self) -> None:
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        by_region: dict[str, dict] = {}
+        by_location: dict[str, dict] = {}
+        by_alias: dict[str, dict] = {}
+
+        for category in data.values():
+            for region, info in category.items():
+                by_region[region] = info
+                by_alias.setdefault(normalize_key(region), info)
+
+                # Legacy flat schema: {"location": "New York, USA", ...}
+                flat_location = info.get("location")
+                if flat_location:
+                    by_location.setdefault(flat_location, info)
+                    by_alias.setdefault(normalize_key(flat_location), info)
+
+                # Nested schema: {"locations": {"Chennai": {...}, ...}}
+                for city, city_info in (info.get("locations") or {}).items():
+                    entry = {
+                        **city_info,
+                        "region": region,
+                        "location": city,
+                        "emoji": city_info.get("emoji", info.get("emoji", "")),
+                    }
+                    by_location.setdefault(city, entry)
+                    by_location.setdefault(f"{city}, {region}", entry)
+                    by_alias.setdefault(normalize_key(city), entry)
+                    by_alias.setdefault(normalize_key(f"{city}, {region}"), entry)
+
+        # Swap indexes in one go so readers never see a half-built catalog
+        self._data = data
+        self._by_region, self._by_location, self._by_alias = by_region, by_location, by_alias
+        self._mtime = mtime
+        self._last_check = time.monotonic()
+
+    def _ensure_fresh(self) -> None:
+        if self._mtime is not None:
+            if self.check_interval is None:
+                return
+            if time.monotonic() - self._last_check < self.check_interval:
+                return
+
+        with self._lock:
+            now = time.monotonic()
+            if self._mtime is not None:
+                if now - self._last_check < (self.check_interval or 0):
+                    return
+                self._last_check = now
+                if os.stat(self.path).st_mtime == self._mtime:
+                    return
+                print(f"🔄 {self.path} changed on disk, reloading region catalog.")
+            self._load_locked()
+
+    # ---------------------------------
+    # Lookups
+    # ---------------------------------
+    @property
+    def data(self) -> dict:
+        """The raw regions.json structure (category -> region -> info)."""
+        self._ensure_fresh()
+        return self._data
+
+    def get(self, region_or_location: str) -> dict | None:
+        """
+        Resolve a region key, location string or alias to its metadata dict.
+        Exact region keys win, then exact locations, then normalized aliases.
+        """
+        self._ensure_fresh()
+        if not region_or_location:
+            return None
+
+        info = self._by_region.get(region_or_location)
+        if info is not None:
+            return info
+        info = self._by_location.get(region_or_location)
+        if info is not None:
+            return info
+        return self._by_alias.get(normalize_key(region_or_location))
+
+    def __len__(self) -> int:
+        self._ensure_fresh()
+        return len(self._by_region)
+
+
+_catalog: RegionCatalog | None = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> RegionCatalog:
+    """Process-wide catalog shared by all agents."""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = RegionCatalog()
+    return _catalog
+
+
+def load_regions() -> dict:
+    """Return the parsed regions.json structure from the shared catalog."""
+    return get_catalog().data
+
 
 def get_region_info(region_or_location: str):
     """
     Look up region information by either its clean key (e.g., "United States (New York)")
     or by its location string (e.g., "New York, USA").
-    
+
+    Backed by the shared RegionCatalog, so no file is read on the hot path.
+    Case/emoji variations such as "new york" or "🇮🇳 Kerala" also resolve.
+
     Returns the full metadata dictionary for the region:
     {
         "location": "...",
@@ -17,25 +180,7 @@ def get_region_info(region_or_location: str):
     }
     """
     try:
-        with open("regions.json", "r", encoding="utf-8") as f:
-            all_regions = json.load(f)
-
-        # Flatten all regions into one dict
-        flat_regions = {
-            region: info
-            for category in all_regions.values()
-            for region, info in category.items()
-        }
-
-        # Try direct region key match
-        if region_or_location in flat_regions:
-            return flat_regions[region_or_location]
-
-        # Try location match
-        for info in flat_regions.values():
-            if info.get("location") == region_or_location:
-                return info
-
+        return get_catalog().get(region_or_location)
     except Exception as e:
         print(f"Region loader failed: {e}")
 